@@ -0,0 +1,157 @@
+import argparse
+import os
+import pickle
+import time
+
+import cleaned_data
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+# Only needed when summaries are rebuilt, so cached ones never import matplotlib
+cbook = lazy_import("matplotlib.cbook")
+
+AGGREGATES = "ecommerce_data_cleaned.aggregates.pkl"
+
+# Thresholds and sizes the pages use
+GOOD_RATING = 4.0
+BUDGET_PRICE = 800
+PRICE_BINS = 15
+RATING_BINS = 10
+PREVIEW_COLUMNS = ["Product Name", "Price", "Rating", "Brand"]
+
+# Outliers kept for the box plot; a skewed price column can have tens of thousands
+MAX_FLIERS = 1_000
+
+
+def histogram(values, bins):
+    # Counts + edges, drawn later with ax.hist(edges[:-1], edges, weights=counts) to look the same
+    values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.histogram(values[~np.isnan(values)], bins=bins)
+
+
+def box_stats(values):
+    # Box plot statistics with fliers thinned to evenly spaced ranks, keeping both extremes
+    stats = cbook.boxplot_stats(values)
+    for item in stats:
+        fliers = np.sort(item["fliers"])
+        if len(fliers) > MAX_FLIERS:
+            item["fliers"] = fliers[np.linspace(0, len(fliers) - 1, MAX_FLIERS).astype(int)]
+    return stats
+
+
+def sidebar(df):
+    return {"total": len(df), "brands": df["Brand"].nunique()}
+
+
+def overview(df):
+    price, rating = df["Price"], df["Rating"]
+    return {
+        "preview": df[PREVIEW_COLUMNS].head(10),
+        "describe": df[["Price", "Rating"]].describe(),
+        "price_mean": price.mean(),
+        "price_min": price.min(),
+        "price_max": price.max(),
+        "rating_mean": rating.mean(),
+        "rating_max": rating.max(),
+        "good_count": int((rating >= GOOD_RATING).sum()),
+        "budget_count": int(((price < BUDGET_PRICE) & (rating >= GOOD_RATING)).sum()),
+    }
+
+
+def price_analysis(df):
+    price = df["Price"]
+    return {
+        "describe": price.describe(),
+        "min": price.min(),
+        "max": price.max(),
+        "median": price.median(),
+        "std": price.std(),
+        "histogram": histogram(price, PRICE_BINS),
+        "box": box_stats(price.dropna().to_numpy()),
+    }
+
+
+def rating_analysis(df):
+    rating = df["Rating"]
+    return {
+        "describe": rating.describe(),
+        "min": rating.min(),
+        "max": rating.max(),
+        "median": rating.median(),
+        "good_count": int((rating >= GOOD_RATING).sum()),
+        "histogram": histogram(rating, RATING_BINS),
+        "bands": df["Rating Band"].value_counts(),
+    }
+
+
+def price_vs_rating(df):
+    price, rating = df["Price"], df["Rating"]
+    good = rating >= GOOD_RATING
+    return {
+        "correlation": price.corr(rating),
+        "high_value_count": int(((price < price.median()) & good).sum()),
+        "premium_good_count": int(((price > price.quantile(0.75)) & good).sum()),
+    }
+
+
+def brand_analysis(df):
+    brands = df.groupby("Brand", observed=True)
+    return {
+        "rating": brands["Rating"].mean().sort_values(ascending=False),
+        "price": brands["Price"].mean().sort_values(ascending=False),
+        "count": df["Brand"].value_counts(),
+    }
+
+
+PAGES = {
+    "sidebar": sidebar,
+    "overview": overview,
+    "price": price_analysis,
+    "rating": rating_analysis,
+    "price_vs_rating": price_vs_rating,
+    "brand": brand_analysis,
+}
+
+
+def compute(df):
+    return {name: page(df) for name, page in PAGES.items()}
+
+
+def load(df, version, path=AGGREGATES):
+    # Summaries from disk if they were computed for this data version, otherwise compute and keep them
+    try:
+        with open(path, "rb") as file:
+            cached = pickle.load(file)
+        if cached["version"] == version:
+            return cached["pages"]
+    except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+        pass
+
+    pages = compute(df)
+    try:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump({"version": version, "pages": pages}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return pages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the dashboard's per-page summaries")
+    parser.add_argument("--src", default=cleaned_data.CLEANED_CSV)
+    parser.add_argument("--out", default=AGGREGATES)
+    args = parser.parse_args()
+
+    df = cleaned_data.load(args.src, os.path.splitext(args.src)[0] + ".arrow")
+    for name, page in PAGES.items():
+        started = time.perf_counter()
+        page(df)
+        print(f"{name:>16}: {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    version = cleaned_data.data_version(args.src)
+    if os.path.exists(args.out):
+        os.remove(args.out)
+    load(df, version, args.out)
+    print(f"✅ Summaries for data version {version} saved to {args.out}")
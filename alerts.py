@@ -0,0 +1,336 @@
+import argparse
+import json
+import math
+import os
+import sqlite3
+import time
+from bisect import bisect_right
+from collections import namedtuple
+
+from entity_resolution import BrandMatcher
+from history_store import HISTORY_DIR, state_path, to_observations
+from lazy import lazy_import
+
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
+
+RULES_FILE = "alert_rules.json"
+ALERTS_FILE = "alerts.jsonl"
+ALERTS_DB = "alerts.sqlite"
+
+STATE_FILE = "alert_state.parquet"
+
+# Rules without a brand watch every brand
+ANY_BRAND = "*"
+
+Rule = namedtuple("Rule", ["rule_id", "brand", "min_price", "max_price", "min_rating", "label"])
+Alert = namedtuple("Alert", ["rule_id", "label", "product_id", "name", "brand", "price", "rating",
+                             "previous_price", "ts"])
+
+
+def make_rule(rule_id, brand=None, max_price=math.inf, min_price=0.0, min_rating=0.0, label=None):
+    # "boAt under ₹800 with rating >= 4.0" -> make_rule(1, "boAt", 800, min_rating=4.0). min_rating 0
+    # means no rating constraint, so the rule also matches products without a rating
+    if label is None:
+        label = f"{brand or 'Any brand'} ₹{min_price:.0f}-{'' if math.isinf(max_price) else f'{max_price:.0f}'}" \
+                + (f" ≥{min_rating:.1f}⭐" if min_rating > 0 else "")
+    return Rule(int(rule_id), brand or None, float(min_price), float(max_price), float(min_rating), label)
+
+
+def load_rules(path=RULES_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        return [make_rule(**rule) for rule in json.load(file)]
+
+
+def save_rules(rules, path=RULES_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump([{key: value for key, value in rule._asdict().items() if value != math.inf} for rule in rules],
+                  file, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+class IntervalTree:
+    # Static centred interval tree over closed [low, high] intervals. stab(x) returns the ids of the
+    # intervals containing x in O(log n + matches); each node keeps its intervals sorted both ways
+
+    def __init__(self, lows, highs, ids):
+        self.nodes = []
+        self.root = self._build(list(zip(lows, highs, ids)))
+
+    def __len__(self):
+        return sum(len(node[3]) for node in self.nodes)
+
+    def _build(self, intervals):
+        if not intervals:
+            return -1
+        ends = sorted(value for low, high, _ in intervals for value in (low, high) if not math.isinf(value))
+        center = ends[len(ends) // 2] if ends else 0.0
+        here = [item for item in intervals if item[0] <= center <= item[1]]
+        by_low = sorted(here, key=lambda item: item[0])
+        by_high = sorted(here, key=lambda item: -item[1])
+        index = len(self.nodes)
+        self.nodes.append(None)
+        left = self._build([item for item in intervals if item[1] < center])
+        right = self._build([item for item in intervals if item[0] > center])
+        self.nodes[index] = (center, left, right,
+                             [low for low, _, _ in by_low], [item[2] for item in by_low],
+                             [-high for _, high, _ in by_high], [item[2] for item in by_high])
+        return index
+
+    def stab(self, x):
+        found = []
+        node = self.root
+        while node != -1:
+            center, left, right, lows, low_ids, neg_highs, high_ids = self.nodes[node]
+            if x < center:
+                found.extend(low_ids[:bisect_right(lows, x)])
+                node = left
+            elif x > center:
+                found.extend(high_ids[:bisect_right(neg_highs, -x)])
+                node = right
+            else:
+                found.extend(low_ids)
+                break
+        return found
+
+
+class RuleIndex:
+    # Rules grouped by canonical brand, each group an interval tree over [min_price, max_price];
+    # a product only meets the rules of its own brand (plus any-brand rules) whose range holds its price
+
+    def __init__(self, rules, matcher=None):
+        self.rules = list(rules)
+        self.matcher = matcher or BrandMatcher()
+        brands = self.canonical([rule.brand or ANY_BRAND for rule in self.rules])
+        # Unrated products compare as -inf, which only a rule without a rating floor accepts
+        self.min_rating = [rule.min_rating if rule.min_rating > 0 else -math.inf for rule in self.rules]
+        groups = {}
+        for i, (rule, brand) in enumerate(zip(self.rules, brands)):
+            groups.setdefault(ANY_BRAND if rule.brand is None else brand, []).append(i)
+        self.trees = {
+            brand: IntervalTree([self.rules[i].min_price for i in members],
+                                [self.rules[i].max_price for i in members], members)
+            for brand, members in groups.items()
+        }
+
+    def __len__(self):
+        return len(self.rules)
+
+    def canonical(self, brands):
+        # Same brand spelling the entity index uses for products, compared case-insensitively
+        matched = self.matcher.match(list(brands)).to_pylist()
+        return [(brand or "").casefold() for brand in matched]
+
+    def match(self, brand, price, rating):
+        # Positions in self.rules of the rules this product meets
+        if price is None or math.isnan(price):
+            return []
+        rating = -math.inf if rating is None or math.isnan(rating) else rating
+        found = []
+        for key in (brand, ANY_BRAND):
+            tree = self.trees.get(key)
+            if tree is not None:
+                found.extend(i for i in tree.stab(price) if self.min_rating[i] <= rating)
+        return found
+
+
+class AlertEvaluator:
+    # Checks changed products against the rule index. A (rule, product) pair alerts when the product
+    # first meets the rule, and again only if its price falls below the last alerted price
+
+    def __init__(self, rules, sinks=(), state_path=state_path(HISTORY_DIR, STATE_FILE), matcher=None):
+        self.index = rules if isinstance(rules, RuleIndex) else RuleIndex(rules, matcher)
+        self.sinks = list(sinks)
+        self.state_path = state_path
+        self.state = {}
+        if state_path and os.path.exists(state_path):
+            saved = pd.read_parquet(state_path)
+            for product_id, rule_id, price in zip(saved["product_id"], saved["rule_id"], saved["price"]):
+                self.state.setdefault(product_id, {})[int(rule_id)] = float(price)
+        self.totals = {"products": 0, "candidates": 0, "alerts": 0, "seconds": 0.0}
+
+    def evaluate(self, observations):
+        # observations: history rows (product_id, ts, price, rating, name) of new or changed products
+        started = time.perf_counter()
+        obs = observations.drop_duplicates("product_id", keep="last")
+        brands = self.index.canonical(obs["name"].tolist()) if len(obs) else []
+        rules = self.index.rules
+
+        alerts, candidates = [], 0
+        for product_id, name, brand, price, rating, ts in zip(
+                obs["product_id"], obs["name"], brands, obs["price"].tolist(), obs["rating"].tolist(), obs["ts"]):
+            matched = self.index.match(brand, price, rating)
+            candidates += len(matched)
+            previous = self.state.get(product_id, {})
+            current = {}
+            for i in matched:
+                rule = rules[i]
+                last = previous.get(rule.rule_id)
+                if last is None or price < last:
+                    alerts.append(Alert(rule.rule_id, rule.label, product_id, name, brand, price, rating, last,
+                                        pd.Timestamp(ts).isoformat()))
+                    current[rule.rule_id] = price
+                else:
+                    current[rule.rule_id] = last
+            # Pairs that stopped matching are forgotten, so a product coming back into range alerts again
+            if current:
+                self.state[product_id] = current
+            else:
+                self.state.pop(product_id, None)
+
+        for sink in self.sinks:
+            sink.emit(alerts)
+        counts = {"products": len(obs), "candidates": candidates, "alerts": len(alerts),
+                  "seconds": time.perf_counter() - started}
+        for key, value in counts.items():
+            self.totals[key] += value
+        return alerts
+
+    def save(self):
+        rows = [(product_id, rule_id, price)
+                for product_id, rules in self.state.items() for rule_id, price in rules.items()]
+        state = pd.DataFrame(rows, columns=["product_id", "rule_id", "price"])
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        state.to_parquet(tmp_path)
+        os.replace(tmp_path, self.state_path)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+# ==================== SINKS ====================
+
+def _record(alert):
+    # JSON has no NaN; a missing rating or previous price is written as null
+    return {key: (None if isinstance(value, float) and math.isnan(value) else value)
+            for key, value in alert._asdict().items()}
+
+
+class JsonlSink:
+    # One JSON object per alert, appended to a local file
+
+    def __init__(self, path=ALERTS_FILE):
+        self.path = path
+
+    def emit(self, alerts):
+        if alerts:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.writelines(json.dumps(_record(alert), ensure_ascii=False) + "\n" for alert in alerts)
+
+    def close(self):
+        pass
+
+
+class SqliteSink:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS alerts (
+        rule_id INTEGER NOT NULL,
+        label TEXT,
+        product_id TEXT NOT NULL,
+        name TEXT,
+        brand TEXT,
+        price REAL,
+        rating REAL,
+        previous_price REAL,
+        ts TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS alerts_rule ON alerts (rule_id, ts);
+    """
+
+    def __init__(self, path=ALERTS_DB):
+        self._db = sqlite3.connect(path)
+        self._db.executescript(self.SCHEMA)
+
+    def emit(self, alerts):
+        if alerts:
+            with self._db:
+                self._db.executemany("INSERT INTO alerts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                     [tuple(_record(alert).values()) for alert in alerts])
+
+    def close(self):
+        self._db.close()
+
+
+class WebhookSink:
+    # POSTs each batch as {"alerts": [...]}. Without a URL it is a stub that only keeps the payloads
+
+    def __init__(self, url=None, timeout=10, session=None):
+        self.url = url
+        self.timeout = timeout
+        self.session = session or (requests.Session() if url else None)
+        self.sent = []
+
+    def emit(self, alerts):
+        if not alerts:
+            return
+        payload = {"alerts": [_record(alert) for alert in alerts]}
+        if self.url is None:
+            self.sent.append(payload)
+            return
+        self.session.post(self.url, json=payload, timeout=self.timeout).raise_for_status()
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+
+
+def sinks_from_args(args):
+    sinks = []
+    if args.jsonl:
+        sinks.append(JsonlSink(args.jsonl))
+    if args.sqlite:
+        sinks.append(SqliteSink(args.sqlite))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    return sinks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Price-drop watch rules and alerts")
+    parser.add_argument("--rules", default=RULES_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="watch e.g. a brand under a price with a minimum rating")
+    add.add_argument("--brand", default=None)
+    add.add_argument("--max-price", type=float, default=math.inf)
+    add.add_argument("--min-price", type=float, default=0.0)
+    add.add_argument("--min-rating", type=float, default=0.0)
+    add.add_argument("--label", default=None)
+
+    commands.add_parser("list")
+    remove = commands.add_parser("remove")
+    remove.add_argument("rule_id", type=int)
+
+    check = commands.add_parser("check", help="evaluate a task3.py CSV against the rules")
+    check.add_argument("csv", nargs="?", default="ecommerce_data.csv")
+    check.add_argument("--root", default=HISTORY_DIR)
+    check.add_argument("--jsonl", default=ALERTS_FILE)
+    check.add_argument("--sqlite", default=None)
+    check.add_argument("--webhook", default=None)
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules)
+    if args.command == "add":
+        rule = make_rule(max((r.rule_id for r in rules), default=0) + 1, args.brand, args.max_price,
+                         args.min_price, args.min_rating, args.label)
+        save_rules(rules + [rule], args.rules)
+        print(f"✅ Added rule {rule.rule_id}: {rule.label}")
+    elif args.command == "list":
+        for rule in rules:
+            print(f"{rule.rule_id:>5}  {rule.label}")
+    elif args.command == "remove":
+        save_rules([rule for rule in rules if rule.rule_id != args.rule_id], args.rules)
+        print(f"✅ Removed rule {args.rule_id}")
+    elif args.command == "check":
+        evaluator = AlertEvaluator(rules, sinks_from_args(args), state_path(args.root, STATE_FILE))
+        alerts = evaluator.evaluate(to_observations(pd.read_csv(args.csv, dtype=str)))
+        evaluator.save()
+        evaluator.close()
+        for alert in alerts[:20]:
+            print(f"🔔 [{alert.label}] {alert.name[:60]} ₹{alert.price:.0f}")
+        print(f"✅ {len(alerts)} alerts from {len(rules)} rules")
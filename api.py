@@ -0,0 +1,419 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import time
+from collections import OrderedDict, namedtuple
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import aggregates
+import cleaned_data
+import instrument
+import value_score
+from catalogue import CATALOGUE_DIR, DEFAULT_SITE, Catalogue
+from lazy import lazy_import
+from product_index import ProductIndex
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+HOST = "127.0.0.1"
+PORT = 8600
+
+# Encoded responses kept per (source, data version, route, parameters); a new version never hits old entries
+CACHE_ENTRIES = 4096
+CACHE_BYTES = 256 * 1024 * 1024
+
+# How often the loaded sources are checked for new data; requests in between are answered from memory
+RELOAD_SECONDS = 5.0
+
+# Largest product list one request can return
+MAX_LIMIT = 1_000
+
+# Floats are encoded with this many significant digits; Price and Rating are float32 in the artifact,
+# so further digits are only conversion noise (4.4 would otherwise read 4.400000095367432)
+FLOAT_DIGITS = 7
+
+PRODUCT_COLUMNS = ["Product ID", "Product Name", "Brand", "Price", "Rating", value_score.COLUMN]
+
+# One loaded source: the frame, the dashboard's page summaries, the Best Budget / Top Rated index
+# and the rows ranked by value score
+Dataset = namedtuple("Dataset", ["version", "df", "pages", "index", "ranking"])
+
+
+def _jsonable(value):
+    # pandas/numpy results -> plain JSON values; NaN becomes null. A DataFrame keeps its index as
+    # column -> {label: value}, so describe() still says which row is the mean
+    if isinstance(value, pd.DataFrame):
+        return {str(column): _jsonable(series) for column, series in value.items()}
+    if isinstance(value, pd.Series):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return float(f"{value:.{FLOAT_DIGITS}g}") if math.isfinite(value) else None
+    return value
+
+
+def _records(df):
+    # One object per row, for product and brand lists
+    return [_jsonable(row) for row in df.to_dict("records")]
+
+
+def _products(df):
+    return _records(df[PRODUCT_COLUMNS])
+
+
+# ==================== ROUTES ====================
+# Each takes (dataset, *parameters) and returns a JSON-able payload
+
+def route_health(data):
+    return {"version": data.version, "products": len(data.df)}
+
+
+def route_summary(data):
+    overview = {key: value for key, value in data.pages["overview"].items() if key != "preview"}
+    return {**data.pages["sidebar"], **overview, "price_vs_rating": data.pages["price_vs_rating"]}
+
+
+def route_price(data):
+    price = data.pages["price"]
+    counts, edges = price["histogram"]
+    return {**{key: price[key] for key in ("describe", "min", "max", "median", "std")},
+            "histogram": {"counts": counts, "edges": edges}}
+
+
+def route_rating(data):
+    rating = data.pages["rating"]
+    counts, edges = rating["histogram"]
+    return {**{key: rating[key] for key in ("describe", "min", "max", "median", "good_count", "bands")},
+            "histogram": {"counts": counts, "edges": edges}}
+
+
+def route_brands(data, sort, limit):
+    brand = data.pages["brand"]
+    table = pd.DataFrame({"products": brand["count"], "avg_rating": brand["rating"], "avg_price": brand["price"]})
+    table = table.sort_values(sort, ascending=False, kind="stable").head(limit)
+    return {"brands": _records(table.rename_axis("brand").reset_index())}
+
+
+def route_top_rated(data, n):
+    return {"products": _products(data.index.top_rated(n))}
+
+
+def route_best_budget(data, max_price, min_rating, limit, offset):
+    return {"total": data.index.count_budget(max_price, min_rating),
+            "products": _products(data.index.best_budget(max_price, min_rating, limit, offset))}
+
+
+def route_best_value(data, limit, offset):
+    return {"total": len(data.ranking), "products": _products(data.df.iloc[data.ranking[offset:offset + limit]])}
+
+
+# path -> (route, {parameter: (type, default, low, high)}); strings list their allowed values instead
+ROUTES = {
+    "/health": (route_health, {}),
+    "/summary": (route_summary, {}),
+    "/price": (route_price, {}),
+    "/rating": (route_rating, {}),
+    "/brands": (route_brands, {"sort": (str, "avg_rating", ["avg_rating", "avg_price", "products"]),
+                               "limit": (int, MAX_LIMIT, 1, MAX_LIMIT)}),
+    "/top-rated": (route_top_rated, {"n": (int, 10, 1, MAX_LIMIT)}),
+    "/best-budget": (route_best_budget, {"max_price": (float, aggregates.BUDGET_PRICE, 0, math.inf),
+                                         "min_rating": (float, aggregates.GOOD_RATING, 0, 5),
+                                         "limit": (int, 50, 1, MAX_LIMIT),
+                                         "offset": (int, 0, 0, math.inf)}),
+    "/best-value": (route_best_value, {"limit": (int, 50, 1, MAX_LIMIT), "offset": (int, 0, 0, math.inf)}),
+}
+
+
+def parse_args(spec, params):
+    # Query string values -> the route's parameters in order; ValueError names the bad one
+    args = []
+    for name, (kind, default, *allowed) in spec.items():
+        if name not in params:
+            args.append(default)
+            continue
+        try:
+            value = kind(params[name])
+        except ValueError:
+            raise ValueError(f"{name} must be a {kind.__name__}") from None
+        if kind is str and value not in allowed[0]:
+            raise ValueError(f"{name} must be one of {', '.join(allowed[0])}")
+        if kind is not str and not allowed[0] <= value <= allowed[1]:
+            raise ValueError(f"{name} must be between {allowed[0]} and {allowed[1]}")
+        args.append(value)
+    return tuple(args)
+
+
+class QueryService:
+    # Cleaned data held in memory per source: the flat cleaned CSV, or one catalogue shard per
+    # (site, category). Loading and reloading are blocking and meant to run off the event loop
+
+    def __init__(self, src=cleaned_data.CLEANED_CSV, artifact=cleaned_data.ARTIFACT, catalogue=CATALOGUE_DIR):
+        self.src = src
+        self.artifact = artifact
+        self.catalogue = Catalogue(catalogue)
+        self.datasets = {}
+
+    def version(self, source):
+        site, category = source
+        if category is None:
+            return cleaned_data.data_version(self.src, self.artifact)
+        return self.catalogue.version(site, category)
+
+    def load(self, source):
+        site, category = source
+        version = self.version(source)
+        with instrument.timer("api.load"):
+            if category is None:
+                df = cleaned_data.load(self.src, self.artifact)
+                summaries = os.path.splitext(self.artifact)[0] + ".aggregates.pkl"
+                scores = value_score.state_path(self.artifact)
+            else:
+                df = self.catalogue.load(site, category)
+                summaries = self.catalogue.summaries_path(site, category)
+                scores = self.catalogue.scores_path(site, category)
+            df[value_score.COLUMN] = value_score.load(df, version, scores)
+            data = Dataset(version, df, aggregates.load(df, version, summaries), ProductIndex(df),
+                           value_score.ranking(df[value_score.COLUMN].to_numpy()))
+        self.datasets[source] = data
+        return data
+
+    def refresh(self):
+        # Reloads every source whose data changed; until a reload finishes the old version keeps serving.
+        # A failed reload (a file caught mid-write, say) keeps the old version too and is retried on
+        # the next call
+        reloaded = []
+        for source, data in list(self.datasets.items()):
+            try:
+                if self.version(source) != data.version:
+                    self.load(source)
+                    reloaded.append(source)
+            except FileNotFoundError:
+                continue
+            except Exception as error:
+                site, category = source
+                print(f"⚠️ Reload of {site or ''}/{category or self.src} failed, still serving "
+                      f"{data.version}: {error!r}")
+        return reloaded
+
+    def render(self, route, data, args):
+        return json.dumps(_jsonable(route(data, *args)), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ResponseCache:
+    # LRU of encoded responses and their ETags, touched only from the event loop thread
+
+    def __init__(self, max_entries=CACHE_ENTRIES, max_bytes=CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry
+
+    def put(self, key, body):
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.max_entries and len(body) <= self.max_bytes:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key)[0])
+            self._entries[key] = (body, etag)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.stats["evictions"] += 1
+        return body, etag
+
+
+class ApiServer:
+    # Read-only JSON API on asyncio streams (HTTP/1.1, keep-alive, GET only). Answers come from the
+    # response cache; misses and data loads run in the default thread pool so the loop keeps serving
+
+    def __init__(self, service, host=HOST, port=PORT, reload_seconds=RELOAD_SECONDS, cache=None):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.reload_seconds = reload_seconds
+        self.cache = cache or ResponseCache()
+        self._loading = {}
+        self._server = None
+        self._refresher = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.reload_seconds:
+            self._refresher = asyncio.create_task(self._refresh())
+
+    async def close(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _refresh(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_seconds)
+            for site, category in await loop.run_in_executor(None, self.service.refresh):
+                print(f"Reloaded {site or ''}/{category or self.service.src}")
+
+    async def _dataset(self, source):
+        # Concurrent first requests for a source share one load
+        data = self.service.datasets.get(source)
+        if data is not None:
+            return data
+        if source not in self._loading:
+            self._loading[source] = asyncio.get_running_loop().run_in_executor(None, self.service.load, source)
+        try:
+            return await asyncio.shield(self._loading[source])
+        finally:
+            self._loading.pop(source, None)
+
+    async def respond(self, target, headers):
+        # (status, body, extra headers) for one GET
+        parts = urlsplit(target)
+        if parts.path not in ROUTES:
+            return 404, _error(f"unknown path {parts.path}; try {', '.join(ROUTES)}"), {}
+        route, spec = ROUTES[parts.path]
+        params = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        category = params.get("category")
+        source = (params.get("site", DEFAULT_SITE), category) if category else (None, None)
+        try:
+            args = parse_args(spec, params)
+        except ValueError as error:
+            return 400, _error(str(error)), {}
+        try:
+            data = await self._dataset(source)
+        except FileNotFoundError:
+            return 404, _error(f"no data for {params.get('site', DEFAULT_SITE)}/{category}"
+                               if category else "no cleaned data; run task4.py first"), {}
+
+        key = (source, data.version, parts.path, args)
+        cached = self.cache.get(key)
+        if cached is None:
+            body = await asyncio.get_running_loop().run_in_executor(None, self.service.render, route, data, args)
+            cached = self.cache.put(key, body)
+        body, etag = cached
+        extra = {"ETag": etag, "X-Data-Version": data.version, "Cache-Control": f"max-age={int(self.reload_seconds)}"}
+        if headers.get("if-none-match") == etag:
+            return 304, b"", extra
+        return 200, body, extra
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as error:
+                    writer.write(_response(400, _error(f"malformed request: {error}"), {}, False))
+                    break
+                if request is None:
+                    break
+                method, target, protocol, headers = request
+
+                started = time.perf_counter()
+                if method != "GET":
+                    status, body, extra = 405, _error("read-only API: GET only"), {"Allow": "GET"}
+                else:
+                    try:
+                        status, body, extra = await self.respond(target, headers)
+                    except Exception as error:
+                        print(f"⚠️ GET {target} failed: {error!r}")
+                        status, body, extra = 500, _error(f"internal error: {type(error).__name__}"), {}
+                keep_alive = protocol == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(_response(status, body, extra, keep_alive))
+                await writer.drain()
+                instrument.observe("api.request", time.perf_counter() - started,
+                                   path=urlsplit(target).path, status=status)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_request(reader):
+    # (method, target, protocol, headers) of the next request, None at end of stream; ValueError
+    # when the request line, a header or the body length cannot be parsed
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if int(headers.get("content-length") or 0):
+        await reader.readexactly(int(headers["content-length"]))
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError("expected 'METHOD target HTTP/version'")
+    method, target, protocol = parts
+    return method, target, protocol, headers
+
+
+def _error(message):
+    return json.dumps({"error": message}).encode("utf-8")
+
+
+def _response(status, body, headers, keep_alive):
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", "Content-Type: application/json; charset=utf-8",
+             f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read-only JSON API over the cleaned data: summary, price, "
+                                                 "rating, brands, top rated and best budget")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--src", default=cleaned_data.CLEANED_CSV)
+    parser.add_argument("--artifact", default=cleaned_data.ARTIFACT)
+    parser.add_argument("--catalogue", default=CATALOGUE_DIR, help="serves ?category=... from this catalogue")
+    parser.add_argument("--reload", type=float, default=RELOAD_SECONDS, help="seconds between data version checks")
+    args = parser.parse_args()
+
+    service = QueryService(args.src, args.artifact, args.catalogue)
+    if os.path.exists(args.src) or os.path.exists(args.artifact):
+        started = time.perf_counter()
+        rows = len(service.load((None, None)).df)
+        print(f"✅ Loaded {rows:,} products in {time.perf_counter() - started:.2f}s")
+    server = ApiServer(service, args.host, args.port, args.reload)
+    print(f"Serving {', '.join(ROUTES)} at http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -1,7 +1,18 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import os
+import time
+
 import streamlit as st
-import seaborn as sns
+
+import aggregates
+import charts
+import cleaned_data
+import instrument
+import listing
+from history_store import HISTORY_DIR
+from lazy import lazy_import
+from product_index import ProductIndex
+
+pd = lazy_import("pandas")
 
 # Page Configuration
 st.set_page_config(
@@ -53,45 +64,160 @@ st.title("🎧 Flipkart Earbuds Analysis Dashboard")
 st.markdown("### Interactive analysis of your web-scraped earbud data")
 st.markdown("---")
 
-# Load Data
-@st.cache_data
-def load_data():
-    df = pd.read_csv("ecommerce_data_cleaned.csv")
-    df['Brand'] = df['Product Name'].str.split().str[0]
-    return df
+# Load Data (memory-mapped Arrow artifact with Brand and other derived columns precomputed,
+# rebuilt from ecommerce_data_cleaned.csv when missing or stale). cache_resource shares the
+# read-only frame instead of unpickling a copy on every rerun. With a catalogue category selected,
+# only that shard is read. value_score and the catalogue (with cleaning and entity resolution behind it)
+# are imported by the functions and pages that use them, so a rerun served from the caches skips them
+@st.cache_resource(max_entries=4)
+def load_data(version, site=None, category=None):
+    import value_score
+    with instrument.timer("app.load_data"):
+        if category is not None:
+            from catalogue import Catalogue
+            df = Catalogue().load(site, category)
+            df[value_score.COLUMN] = value_score.load(df, version, Catalogue().scores_path(site, category))
+        else:
+            df = cleaned_data.load()
+            df[value_score.COLUMN] = value_score.load(df, version)
+        return df
+
+# Per-page summaries, computed once per data version instead of on every rerun
+@st.cache_resource(max_entries=4)
+def load_summaries(version, site=None, category=None):
+    with instrument.timer("app.load_summaries"):
+        df = load_data(version, site, category)
+        if category is not None:
+            from catalogue import Catalogue
+            return aggregates.load(df, version, Catalogue().summaries_path(site, category))
+        return aggregates.load(df, version)
+
+# Price/rating index behind the Top Rated and Best Budget filters
+@st.cache_resource(max_entries=4)
+def load_index(version, site=None, category=None):
+    with instrument.timer("app.load_index"):
+        return ProductIndex(load_data(version, site, category))
+
+# Rows ranked by value score for the Best Value page
+@st.cache_resource(max_entries=4)
+def load_ranking(version, site=None, category=None):
+    import value_score
+    return value_score.ranking(load_data(version, site, category)[value_score.COLUMN].to_numpy())
+
+# Shards of the catalogue, if scraper.py --catalogue or the scheduler has published any
+@st.cache_resource(ttl=60)
+def load_shards():
+    from catalogue import Catalogue
+    return Catalogue().shards()
+
+# Per-product price trends over the scrape history, reloaded whenever the trend state is saved.
+# trends and history_store are imported on the Price Trends page only, like matplotlib in charts
+@st.cache_resource(max_entries=1)
+def load_trends(version):
+    import trends
+    engine = trends.TrendEngine()
+    engine.summary()
+    return engine
+
+# Price/rating sketches of the whole scrape history, reloaded whenever an ingest saves them
+@st.cache_resource(max_entries=1)
+def load_sketches(version):
+    import sketches
+    return sketches.SketchStore()
+
+def history_statistics(store, chart_cache, version, metric, bins, color, xlabel):
+    # Price or rating statistics over the price history, merged from per-day sketches instead of
+    # scanning every stored row; quantiles come with the sketch's error bound
+    import sketches
+    first, last = store.days()
+    selected = st.date_input("History range:", (first.date(), last.date()), min_value=first.date(),
+                             max_value=last.date(), key=f"{metric}_history_range")
+    if len(selected) != 2:
+        return
+    start, end = selected
+    started = time.perf_counter()
+    stats = store.summary(metric, start, end, bins=bins)
+    elapsed = time.perf_counter() - started
+    error = f"±{stats['error']:.0%}" if stats['error_kind'] == "relative" else f"±{stats['error']:g}"
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        charts.show(chart_cache, (f"{metric}_history_histogram", str(start), str(end), version), charts.histogram,
+                    *stats['histogram'], color, xlabel, f"{xlabel} across the Price History")
+    with col2:
+        st.metric("Observations", f"{stats['count']:,}")
+        st.metric("Distinct Products", f"~{stats['distinct_products']:,.0f}",
+                  help=f"HyperLogLog estimate, ±{stats['distinct_error']:.1%} standard error")
+        st.metric("Mean", sketches.format_value(metric, stats['mean']))
+        for q, value in stats['quantiles'].items():
+            st.metric(f"{q:.0%} Quantile", f"{sketches.format_value(metric, value)} {error}")
+    st.caption(f"Merged {len(store):,} day/brand sketches in {elapsed * 1000:.1f}ms. Count, mean, min and max "
+               f"are exact; quantiles are interpolated like the pandas ones above and within {error} of the exact "
+               f"value, and histogram bin edges are within one sketch bucket.")
+
+# Rendered charts, reused across reruns and sessions until the data changes
+@st.cache_resource
+def load_chart_cache():
+    return charts.ChartCache()
 
 try:
-    df = load_data()
+    chart_cache = load_chart_cache()
     
     # Sidebar Navigation
     st.sidebar.title("📊 Navigation")
     st.sidebar.markdown("---")
     
+    site = category = None
+    shards = load_shards()
+    if shards:
+        sites = sorted({s for s, _ in shards})
+        site = st.sidebar.selectbox("Site:", sites)
+        category = st.sidebar.selectbox("Category:", [c for s, c in shards if s == site])
+        from catalogue import Catalogue
+        version = Catalogue().version(site, category)
+    else:
+        version = cleaned_data.data_version()
+    df = load_data(version, site, category)
+    summary = load_summaries(version, site, category)
+    index = load_index(version, site, category)
+    
     page = st.sidebar.radio(
         "Select Analysis:",
         ["🏠 Overview", "💰 Price Analysis", "⭐ Rating Analysis", 
-         "📈 Price vs Rating", "🏆 Top Rated", "💸 Best Budget", "🏢 Brand Analysis"]
+         "📈 Price vs Rating", "🏆 Top Rated", "💸 Best Budget", "💎 Best Value", "🏢 Brand Analysis", "📉 Price Trends",
+         "⏱️ Performance"]
     )
+    page_started = time.perf_counter()
     
     st.sidebar.markdown("---")
-    st.sidebar.info(f"**Total Products:** {len(df)}")
-    st.sidebar.success(f"**Brands:** {df['Brand'].nunique()}")
+    st.sidebar.info(f"**Total Products:** {summary['sidebar']['total']}")
+    st.sidebar.success(f"**Brands:** {summary['sidebar']['brands']}")
+    
+    # Sketches are saved inside the price history, so without one the sketch module is not even imported
+    sketch_version = None
+    if os.path.isdir(HISTORY_DIR):
+        import sketches
+        sketch_version = sketches.state_version()
+    history_mode = sketch_version is not None and st.sidebar.checkbox(
+        "📐 Price history statistics", help="Add statistics over every scrape in the price history, "
+                                           "approximated from per-day sketches")
     
     # ==================== OVERVIEW PAGE ====================
     if page == "🏠 Overview":
         st.header("📊 Dashboard Overview")
+        overview = summary['overview']
         
         # Key Metrics
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Products", len(df))
+            st.metric("Total Products", summary['sidebar']['total'])
         with col2:
-            st.metric("Avg Price", f"₹{df['Price'].mean():.0f}")
+            st.metric("Avg Price", f"₹{overview['price_mean']:.0f}")
         with col3:
-            st.metric("Avg Rating", f"{df['Rating'].mean():.2f} ⭐")
+            st.metric("Avg Rating", f"{overview['rating_mean']:.2f} ⭐")
         with col4:
-            st.metric("Top Rating", f"{df['Rating'].max():.1f} ⭐")
+            st.metric("Top Rating", f"{overview['rating_max']:.1f} ⭐")
         
         st.markdown("---")
         
@@ -100,82 +226,72 @@ try:
         
         with col1:
             st.subheader("📦 Dataset Preview")
-            st.dataframe(df.head(10), use_container_width=True, height=400)
+            st.dataframe(overview['preview'], use_container_width=True, height=400)
         
         with col2:
             st.subheader("📈 Quick Statistics")
-            stats_df = df[['Price', 'Rating']].describe()
-            st.dataframe(stats_df, use_container_width=True)
+            st.dataframe(overview['describe'], use_container_width=True)
             
             st.markdown("### 🎯 Key Insights")
-            st.info(f"💰 **Price Range:** ₹{df['Price'].min():.0f} - ₹{df['Price'].max():.0f}")
-            st.success(f"⭐ **Products with 4+ Rating:** {len(df[df['Rating'] >= 4.0])}")
-            st.warning(f"💸 **Budget Options (<₹800, Rating ≥4.0):** {len(df[(df['Price'] < 800) & (df['Rating'] >= 4.0)])}")
+            st.info(f"💰 **Price Range:** ₹{overview['price_min']:.0f} - ₹{overview['price_max']:.0f}")
+            st.success(f"⭐ **Products with 4+ Rating:** {overview['good_count']}")
+            st.warning(f"💸 **Budget Options (<₹800, Rating ≥4.0):** {overview['budget_count']}")
     
     # ==================== PRICE ANALYSIS ====================
     elif page == "💰 Price Analysis":
         st.header("💰 Price Distribution Analysis")
+        price = summary['price']
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("📊 Price Distribution")
-            fig, ax = plt.subplots(figsize=(8, 6))
-            ax.hist(df['Price'], bins=15, color='#667eea', edgecolor='black', alpha=0.7)
-            ax.set_xlabel("Price (₹)", fontsize=12, fontweight='bold')
-            ax.set_ylabel("Number of Products", fontsize=12, fontweight='bold')
-            ax.set_title("Price Distribution of Flipkart Earbuds", fontsize=14, fontweight='bold')
-            ax.grid(axis='y', alpha=0.3)
-            st.pyplot(fig)
+            charts.show(chart_cache, ("price_histogram", version), charts.histogram, *price['histogram'],
+                        '#667eea', "Price (₹)", "Price Distribution of Flipkart Earbuds")
         
         with col2:
             st.subheader("📈 Price Statistics")
-            st.dataframe(df['Price'].describe(), use_container_width=True)
+            st.dataframe(price['describe'], use_container_width=True)
             
             st.markdown("### 💡 Price Insights")
-            st.metric("Minimum Price", f"₹{df['Price'].min():.0f}")
-            st.metric("Maximum Price", f"₹{df['Price'].max():.0f}")
-            st.metric("Median Price", f"₹{df['Price'].median():.0f}")
-            st.metric("Standard Deviation", f"₹{df['Price'].std():.0f}")
+            st.metric("Minimum Price", f"₹{price['min']:.0f}")
+            st.metric("Maximum Price", f"₹{price['max']:.0f}")
+            st.metric("Median Price", f"₹{price['median']:.0f}")
+            st.metric("Standard Deviation", f"₹{price['std']:.0f}")
         
         st.markdown("---")
         
         # Box Plot
         st.subheader("📦 Price Distribution Box Plot")
-        fig, ax = plt.subplots(figsize=(12, 4))
-        ax.boxplot(df['Price'], vert=False, patch_artist=True,
-                   boxprops=dict(facecolor='#667eea', alpha=0.7),
-                   medianprops=dict(color='red', linewidth=2))
-        ax.set_xlabel("Price (₹)", fontsize=12, fontweight='bold')
-        ax.set_title("Price Distribution Box Plot", fontsize=14, fontweight='bold')
-        ax.grid(axis='x', alpha=0.3)
-        st.pyplot(fig)
+        charts.show(chart_cache, ("price_boxplot", version), charts.price_boxplot, price['box'])
+        
+        if history_mode:
+            st.markdown("---")
+            st.subheader("📐 Price History Statistics")
+            history_statistics(load_sketches(sketch_version), chart_cache, sketch_version, "price",
+                               aggregates.PRICE_BINS, '#667eea', "Price (₹)")
     
     # ==================== RATING ANALYSIS ====================
     elif page == "⭐ Rating Analysis":
         st.header("⭐ Rating Distribution Analysis")
+        rating = summary['rating']
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("📊 Rating Distribution")
-            fig, ax = plt.subplots(figsize=(8, 6))
-            ax.hist(df['Rating'], bins=10, color='#f6ad55', edgecolor='black', alpha=0.7)
-            ax.set_xlabel("Rating", fontsize=12, fontweight='bold')
-            ax.set_ylabel("Number of Products", fontsize=12, fontweight='bold')
-            ax.set_title("Rating Distribution of Flipkart Earbuds", fontsize=14, fontweight='bold')
-            ax.grid(axis='y', alpha=0.3)
-            st.pyplot(fig)
+            charts.show(chart_cache, ("rating_histogram", version), charts.histogram, *rating['histogram'],
+                        '#f6ad55', "Rating", "Rating Distribution of Flipkart Earbuds")
         
         with col2:
             st.subheader("📈 Rating Statistics")
-            st.dataframe(df['Rating'].describe(), use_container_width=True)
+            st.dataframe(rating['describe'], use_container_width=True)
             
             st.markdown("### 💡 Rating Insights")
-            st.metric("Minimum Rating", f"{df['Rating'].min():.1f} ⭐")
-            st.metric("Maximum Rating", f"{df['Rating'].max():.1f} ⭐")
-            st.metric("Median Rating", f"{df['Rating'].median():.1f} ⭐")
-            st.metric("Products with 4+ Rating", len(df[df['Rating'] >= 4.0]))
+            st.metric("Minimum Rating", f"{rating['min']:.1f} ⭐")
+            st.metric("Maximum Rating", f"{rating['max']:.1f} ⭐")
+            st.metric("Median Rating", f"{rating['median']:.1f} ⭐")
+            st.metric("Products with 4+ Rating", rating['good_count'])
         
         st.markdown("---")
         
@@ -183,30 +299,28 @@ try:
         st.subheader("🎯 Rating Categories")
         col1, col2, col3 = st.columns(3)
         
+        bands = rating['bands']
         with col1:
-            excellent = len(df[df['Rating'] >= 4.5])
-            st.info(f"**Excellent (≥4.5):** {excellent} products")
+            st.info(f"**Excellent (≥4.5):** {bands['Excellent']} products")
         with col2:
-            good = len(df[(df['Rating'] >= 4.0) & (df['Rating'] < 4.5)])
-            st.success(f"**Good (4.0-4.5):** {good} products")
+            st.success(f"**Good (4.0-4.5):** {bands['Good']} products")
         with col3:
-            average = len(df[df['Rating'] < 4.0])
-            st.warning(f"**Average (<4.0):** {average} products")
+            st.warning(f"**Average (<4.0):** {bands['Average']} products")
+        
+        if history_mode:
+            st.markdown("---")
+            st.subheader("📐 Rating History Statistics")
+            history_statistics(load_sketches(sketch_version), chart_cache, sketch_version, "rating",
+                               aggregates.RATING_BINS, '#f6ad55', "Rating")
     
     # ==================== PRICE VS RATING ====================
     elif page == "📈 Price vs Rating":
         st.header("📈 Price vs Rating Analysis")
         
-        fig, ax = plt.subplots(figsize=(12, 6))
-        scatter = ax.scatter(df['Price'], df['Rating'], 
-                           c=df['Price'], cmap='viridis', 
-                           s=100, alpha=0.6, edgecolors='black')
-        ax.set_xlabel("Price (₹)", fontsize=12, fontweight='bold')
-        ax.set_ylabel("Rating", fontsize=12, fontweight='bold')
-        ax.set_title("Price vs Rating Scatter Plot", fontsize=14, fontweight='bold')
-        ax.grid(True, alpha=0.3)
-        plt.colorbar(scatter, ax=ax, label='Price (₹)')
-        st.pyplot(fig)
+        charts.show(chart_cache, ("price_rating_scatter", version), charts.price_rating_scatter,
+                    df['Price'].to_numpy(), df['Rating'].to_numpy())
+        if len(df) > charts.MAX_SCATTER_POINTS:
+            st.caption(f"Showing a random sample of {charts.MAX_SCATTER_POINTS:,} of {len(df):,} products")
         
         st.markdown("---")
         
@@ -214,7 +328,7 @@ try:
         
         with col1:
             st.subheader("📊 Correlation Analysis")
-            correlation = df['Price'].corr(df['Rating'])
+            correlation = summary['price_vs_rating']['correlation']
             st.metric("Correlation Coefficient", f"{correlation:.3f}")
             
             if correlation > 0.5:
@@ -228,11 +342,11 @@ try:
         
         with col2:
             st.subheader("💡 Key Insights")
-            high_value = df[(df['Price'] < df['Price'].median()) & (df['Rating'] >= 4.0)]
-            st.success(f"**High Value Products:** {len(high_value)} products with below-median price and 4+ rating")
+            high_value = summary['price_vs_rating']['high_value_count']
+            st.success(f"**High Value Products:** {high_value} products with below-median price and 4+ rating")
             
-            premium_good = df[(df['Price'] > df['Price'].quantile(0.75)) & (df['Rating'] >= 4.0)]
-            st.info(f"**Premium Quality:** {len(premium_good)} high-priced products with 4+ rating")
+            premium_good = summary['price_vs_rating']['premium_good_count']
+            st.info(f"**Premium Quality:** {premium_good} high-priced products with 4+ rating")
     
     # ==================== TOP RATED ====================
     elif page == "🏆 Top Rated":
@@ -240,31 +354,14 @@ try:
         
         top_n = st.slider("Select number of top products to display:", 5, 20, 10)
         
-        top_rated = df.sort_values(by="Rating", ascending=False).head(top_n)
+        top_rated = index.top_rated(top_n)
         
         st.subheader(f"🌟 Top {top_n} Rated Products")
-        
-        # Display with custom styling
-        for idx, row in top_rated.iterrows():
-            col1, col2, col3 = st.columns([3, 1, 1])
-            with col1:
-                st.markdown(f"**{row['Product Name']}**")
-            with col2:
-                st.markdown(f"**₹{row['Price']:.0f}**")
-            with col3:
-                st.markdown(f"**{row['Rating']} ⭐**")
-            st.markdown("---")
+        listing.product_table(top_rated)
         
         # Visualization
         st.subheader("📊 Top Rated Products Visualization")
-        fig, ax = plt.subplots(figsize=(12, 6))
-        bars = ax.barh(top_rated['Product Name'].str[:30], top_rated['Rating'], 
-                       color='#48bb78', edgecolor='black', alpha=0.7)
-        ax.set_xlabel("Rating", fontsize=12, fontweight='bold')
-        ax.set_ylabel("Product Name", fontsize=12, fontweight='bold')
-        ax.set_title(f"Top {top_n} Rated Products", fontsize=14, fontweight='bold')
-        ax.grid(axis='x', alpha=0.3)
-        st.pyplot(fig)
+        charts.show(chart_cache, ("top_rated_bars", top_n, version), charts.top_rated_bars, top_rated)
     
     # ==================== BEST BUDGET ====================
     elif page == "💸 Best Budget":
@@ -276,36 +373,39 @@ try:
         with col2:
             min_rating = st.slider("Minimum Rating:", 3.0, 5.0, 4.0, step=0.1)
         
-        best_budget = df[(df['Price'] <= max_price) & (df['Rating'] >= min_rating)]
-        best_budget = best_budget.sort_values(by="Rating", ascending=False)
-        
-        st.subheader(f"🎯 Found {len(best_budget)} products matching your criteria")
-        
-        if len(best_budget) > 0:
-            # Display products
-            for idx, row in best_budget.iterrows():
-                col1, col2, col3 = st.columns([3, 1, 1])
-                with col1:
-                    st.markdown(f"**{row['Product Name']}**")
-                with col2:
-                    st.markdown(f"**₹{row['Price']:.0f}**")
-                with col3:
-                    st.markdown(f"**{row['Rating']} ⭐**")
-                st.markdown("---")
+        total = index.count_budget(max_price, min_rating)
+        
+        st.subheader(f"🎯 Found {total} products matching your criteria")
+        
+        if total > 0:
+            # Display products, one page at a time
+            listing.paginated_listing(
+                lambda offset, limit: index.best_budget(max_price, min_rating, limit=limit, offset=offset),
+                total, key="best_budget")
             
             # Visualization
             st.subheader("📊 Budget Products Distribution")
-            fig, ax = plt.subplots(figsize=(12, 6))
-            ax.scatter(best_budget['Price'], best_budget['Rating'], 
-                      s=150, alpha=0.6, c='#38b2ac', edgecolors='black')
-            ax.set_xlabel("Price (₹)", fontsize=12, fontweight='bold')
-            ax.set_ylabel("Rating", fontsize=12, fontweight='bold')
-            ax.set_title("Best Budget Products - Price vs Rating", fontsize=14, fontweight='bold')
-            ax.grid(True, alpha=0.3)
-            st.pyplot(fig)
+            charts.show(chart_cache, ("budget_scatter", max_price, min_rating, version), charts.budget_scatter,
+                        *index.budget_points(max_price, min_rating))
+            if total > charts.MAX_SCATTER_POINTS:
+                st.caption(f"Showing a random sample of {charts.MAX_SCATTER_POINTS:,} of {total:,} products")
         else:
             st.warning("No products found matching your criteria. Try adjusting the filters.")
     
+    # ==================== BEST VALUE ====================
+    elif page == "💎 Best Value":
+        st.header("💎 Best Value Products")
+        import value_score
+        st.markdown(f"Value score (0-100): how a product's rating and price rank within its own brand. "
+                    f"Brands with fewer than {value_score.MIN_GROUP} products are ranked together.")
+        
+        ranked = load_ranking(version, site, category)
+        if len(ranked) > 0:
+            listing.paginated_listing(
+                lambda offset, limit: df.iloc[ranked[offset:offset + limit]], len(ranked), key="best_value")
+        else:
+            st.warning("No products with both a price and a rating to score.")
+    
     # ==================== BRAND ANALYSIS ====================
     elif page == "🏢 Brand Analysis":
         st.header("🏢 Brand-wise Analysis")
@@ -314,46 +414,140 @@ try:
         
         with col1:
             st.subheader("⭐ Average Rating per Brand")
-            brand_rating = df.groupby('Brand')['Rating'].mean().sort_values(ascending=False)
+            brand_rating = summary['brand']['rating']
             st.dataframe(brand_rating, use_container_width=True)
             
             # Visualization
-            fig, ax = plt.subplots(figsize=(8, 6))
-            brand_rating.plot(kind='barh', ax=ax, color='#f6ad55', edgecolor='black', alpha=0.7)
-            ax.set_xlabel("Average Rating", fontsize=12, fontweight='bold')
-            ax.set_ylabel("Brand", fontsize=12, fontweight='bold')
-            ax.set_title("Average Rating by Brand", fontsize=14, fontweight='bold')
-            ax.grid(axis='x', alpha=0.3)
-            st.pyplot(fig)
+            charts.show(chart_cache, ("brand_rating_bars", version), charts.brand_bars, brand_rating,
+                        '#f6ad55', "Average Rating", "Average Rating by Brand")
         
         with col2:
             st.subheader("💰 Average Price per Brand")
-            brand_price = df.groupby('Brand')['Price'].mean().sort_values(ascending=False)
+            brand_price = summary['brand']['price']
             st.dataframe(brand_price, use_container_width=True)
             
             # Visualization
-            fig, ax = plt.subplots(figsize=(8, 6))
-            brand_price.plot(kind='barh', ax=ax, color='#667eea', edgecolor='black', alpha=0.7)
-            ax.set_xlabel("Average Price (₹)", fontsize=12, fontweight='bold')
-            ax.set_ylabel("Brand", fontsize=12, fontweight='bold')
-            ax.set_title("Average Price by Brand", fontsize=14, fontweight='bold')
-            ax.grid(axis='x', alpha=0.3)
-            st.pyplot(fig)
+            charts.show(chart_cache, ("brand_price_bars", version), charts.brand_bars, brand_price,
+                        '#667eea', "Average Price (₹)", "Average Price by Brand")
         
         st.markdown("---")
         
         # Product count by brand
         st.subheader("📦 Product Count by Brand")
-        brand_count = df['Brand'].value_counts()
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
-        brand_count.plot(kind='bar', ax=ax, color='#48bb78', edgecolor='black', alpha=0.7)
-        ax.set_xlabel("Brand", fontsize=12, fontweight='bold')
-        ax.set_ylabel("Number of Products", fontsize=12, fontweight='bold')
-        ax.set_title("Product Count by Brand", fontsize=14, fontweight='bold')
-        ax.grid(axis='y', alpha=0.3)
-        plt.xticks(rotation=45, ha='right')
-        st.pyplot(fig)
+        brand_count = summary['brand']['count']
+        charts.show(chart_cache, ("brand_count_bars", version), charts.brand_count_bars, brand_count)
+    
+    # ==================== PRICE TRENDS ====================
+    elif page == "📉 Price Trends":
+        st.header("📉 Price Trends")
+        import trends
+        from history_store import HistoryStore
+        
+        trend_version = trends.state_version()
+        if trend_version is None:
+            st.info("No price history yet. Run `task3.py` to start tracking prices, or "
+                    "`python trends.py rebuild` for an existing `price_history/` folder.")
+        else:
+            engine = load_trends(trend_version)
+            trend_summary = engine.summary()
+            window = engine.window
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Products Tracked", f"{len(engine):,}")
+            with col2:
+                st.metric("Price Drops", f"{int((trend_summary['change_pct'] < 0).sum()):,}")
+            with col3:
+                st.metric("At All-Time Low", f"{len(engine.all_time_lows()):,}")
+            with col4:
+                st.metric(f"Avg vs {window}-day Mean", f"{trend_summary['vs_mean_pct'].mean():+.1f}%")
+            
+            st.markdown("---")
+            
+            trend_columns = ["name", "price", "previous_price", "change_pct", f"min_{window}d",
+                             f"mean_{window}d", "all_time_low", "last_seen"]
+            trend_config = {
+                "name": st.column_config.TextColumn("Product Name", width="large"),
+                "price": st.column_config.NumberColumn("Price", format="₹%.0f"),
+                "previous_price": st.column_config.NumberColumn("Previous", format="₹%.0f"),
+                "change_pct": st.column_config.NumberColumn("Change", format="%.1f%%"),
+                f"min_{window}d": st.column_config.NumberColumn(f"{window}d Min", format="₹%.0f"),
+                f"mean_{window}d": st.column_config.NumberColumn(f"{window}d Mean", format="₹%.0f"),
+                "all_time_low": st.column_config.NumberColumn("All-Time Low", format="₹%.0f"),
+                "last_seen": st.column_config.DatetimeColumn("Last Seen", format="D MMM YYYY, HH:mm"),
+            }
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                min_drop = st.slider("Minimum drop (%):", 0, 50, 5)
+            with col2:
+                top_n = st.slider("Products to show:", 5, 50, 10)
+            
+            drops = engine.drops(min_drop, limit=top_n)
+            st.subheader(f"🔻 Biggest Price Drops (≥{min_drop}%)")
+            if len(drops):
+                st.dataframe(drops[trend_columns], column_config=trend_config, hide_index=True,
+                             use_container_width=True)
+            else:
+                st.warning("No price drops that large in the latest scrapes.")
+            
+            lows = engine.all_time_lows(limit=top_n)
+            st.subheader("🏷️ Just Dropped to an All-Time Low")
+            if len(lows):
+                st.dataframe(lows[trend_columns], column_config=trend_config, hide_index=True,
+                             use_container_width=True)
+            else:
+                st.info("No product is currently at a new all-time low.")
+            
+            # Price history of one of the products above
+            st.subheader("📈 Price History")
+            picks = pd.concat([drops, lows]).drop_duplicates("product_id")
+            if len(picks):
+                names = dict(zip(picks["product_id"], picks["name"].fillna(picks["product_id"])))
+                product_id = st.selectbox("Product:", list(names), format_func=names.get)
+                history = HistoryStore().product_history(product_id)
+                charts.show(chart_cache, ("price_history", product_id, trend_version), charts.price_history,
+                            history["ts"].to_numpy(), history["price"].to_numpy(),
+                            engine.product(product_id)["all_time_low"], names[product_id])
+    
+    # ==================== PERFORMANCE ====================
+    elif page == "⏱️ Performance":
+        st.header("⏱️ Performance")
+        
+        metrics_path = instrument.REGISTRY.path
+        sources = ["This dashboard"]
+        if metrics_path and not metrics_path.endswith(".prom") and os.path.exists(metrics_path):
+            sources.append(f"Metrics file ({metrics_path})")
+        source = st.radio("Timings from:", sources, horizontal=True)
+        if source == "This dashboard":
+            samples = instrument.REGISTRY.samples
+        else:
+            samples = instrument.read_events(metrics_path)
+        
+        rows = pd.DataFrame(instrument.percentiles(samples))
+        if len(rows):
+            st.subheader("📊 Latency per Stage")
+            st.dataframe(rows, hide_index=True, use_container_width=True, column_config={
+                "series": st.column_config.TextColumn("Stage", width="large"),
+                **{column: st.column_config.NumberColumn(column, format="%.1f")
+                   for column in ["p50 ms", "p95 ms", "p99 ms", "max ms"]},
+                "total s": st.column_config.NumberColumn("total s", format="%.2f"),
+            })
+            st.subheader("⏳ p95 Latency (ms)")
+            st.bar_chart(rows.set_index("series")["p95 ms"])
+        else:
+            st.info("No timings recorded yet. Open a few pages, or run the pipeline with "
+                    f"`{instrument.METRICS_ENV}=metrics.jsonl` to collect scraper and cleaning timings.")
+        
+        counters = {**instrument.REGISTRY.counters, **instrument.REGISTRY.gauges}
+        if counters:
+            st.subheader("🔢 Counters")
+            st.dataframe(pd.DataFrame({"series": list(counters), "value": list(counters.values())}),
+                         hide_index=True, use_container_width=True)
+    
+    # Time of this page's render, shown on the Performance page from the next rerun on
+    instrument.observe("app.page", time.perf_counter() - page_started, page=page)
+    instrument.flush()
 
 except FileNotFoundError:
     st.error("❌ **Error:** `ecommerce_data_cleaned.csv` file not found!")
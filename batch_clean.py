@@ -0,0 +1,151 @@
+import argparse
+import glob
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cleaning import (RunningMean, SeenHashes, clean_schema, name_hashes, parse_price, parse_rating,
+                      read_raw, record_offsets)
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+pq = lazy_import("pyarrow.parquet")
+
+# Each input file is cut into ranges of about this many bytes, one task per range
+CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def plan(sources, chunk_size=CHUNK_SIZE):
+    # (source label, path, start, end) per task, in input order so "first occurrence" stays well defined
+    tasks = []
+    for path in sources:
+        label = os.path.splitext(os.path.basename(path))[0]
+        offsets = record_offsets(path, chunk_size)
+        tasks.extend((label, path, start, end) for start, end in zip(offsets, offsets[1:]))
+    return tasks
+
+
+def _clean_range(task, spill_path):
+    # Worker pass 1: parse one range, dedup within it and spill the survivors (missing prices
+    # kept, since the original drops duplicates before it drops unpriced rows)
+    label, path, start, end = task
+    mean = RunningMean()
+    tables, hashes = [], []
+    rows_in = 0
+    seen = SeenHashes()
+
+    for block in read_raw(path, start=start, end=end):
+        rows_in += block.num_rows
+        price = parse_price(block.column("Price"))
+        rating = parse_rating(block.column("Rating"))
+        mean.update(rating)
+
+        block_hashes = name_hashes(block.column("Product Name"))
+        keep = seen.first_seen(block_hashes)
+        mask = pa.array(keep)
+        tables.append(pa.table([block.column("Product Name").filter(mask), price.filter(mask), rating.filter(mask)],
+                               schema=clean_schema()))
+        hashes.append(block_hashes[keep])
+
+    table = pa.concat_tables(tables) if tables else clean_schema().empty_table()
+    with pa.ipc.new_file(spill_path, clean_schema()) as writer:
+        writer.write_table(table)
+    hashes = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+    return {"rows_in": rows_in, "duplicates": rows_in - table.num_rows, "hashes": hashes, "mean": mean}
+
+
+def _finish_range(spill_path, keep, fill, out_path):
+    # Worker pass 2: apply the global dedup mask, drop unpriced rows, fill ratings and write a part
+    table = pa.ipc.open_file(pa.OSFile(spill_path)).read_all().filter(pa.array(keep))
+    priced = table.column("Price").is_valid()
+    missing_price = table.num_rows - pc.sum(priced).as_py() if table.num_rows else 0
+    table = table.filter(priced)
+    imputed = table.column("Rating").null_count
+    table = table.set_column(2, "Rating", pc.fill_null(table.column("Rating"), pa.scalar(fill, pa.float32())))
+    table = table.take(pc.sort_indices(table, sort_keys=[("Rating", "descending")]))
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    pq.write_table(table, out_path)
+    os.remove(spill_path)
+    return {"rows_out": table.num_rows, "missing_price": missing_price, "imputed": imputed}
+
+
+def clean_files(sources, dst, workers=None, chunk_size=CHUNK_SIZE, spill_dir=None):
+    # Cleans many raw CSVs (or one large one) in parallel into a Parquet dataset partitioned by
+    # source file (dst/source=<name>/part-NNNNN.parquet), with one dedup across all of them
+    started = time.perf_counter()
+    stats = {"files": len(sources), "tasks": 0, "rows_in": 0, "rows_out": 0, "duplicates": 0,
+             "missing_price": 0, "imputed": 0}
+    tasks = plan(sources, chunk_size)
+    stats["tasks"] = len(tasks)
+
+    staging = f"{dst.rstrip(os.sep)}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+
+    with tempfile.TemporaryDirectory(prefix="batch_clean_", dir=spill_dir) as tmp, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        spills = [os.path.join(tmp, f"range-{i:05d}.arrow") for i in range(len(tasks))]
+
+        # Pass 1 in parallel; results are consumed in task order, so the global dedup keeps the
+        # first occurrence in input order exactly like a single sequential pass
+        seen = SeenHashes()
+        mean = RunningMean()
+        keeps = []
+        for partial in pool.map(_clean_range, tasks, spills):
+            stats["rows_in"] += partial["rows_in"]
+            stats["duplicates"] += partial["duplicates"]
+            keep = ~seen.contains(partial["hashes"])
+            seen.add(partial["hashes"][keep])
+            stats["duplicates"] += int((~keep).sum())
+            keeps.append(keep)
+            mean.merge(partial["mean"])
+
+        # Pass 2 in parallel: the mean is final, every range can be finished independently
+        fill = mean.value
+        outs = [os.path.join(staging, f"source={label}", f"part-{i:05d}.parquet")
+                for i, (label, *_) in enumerate(tasks)]
+        for counts in pool.map(_finish_range, spills, keeps, [fill] * len(tasks), outs):
+            for key, value in counts.items():
+                stats[key] += value
+
+    shutil.rmtree(dst, ignore_errors=True)
+    if os.path.exists(staging):
+        os.replace(staging, dst)
+    else:
+        os.makedirs(dst, exist_ok=True)
+
+    stats["mean_rating"] = fill
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_sec"] = stats["rows_in"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def read_cleaned(dst, sources=None):
+    # The partitioned output as one frame; parts are rating-sorted, so re-sort after combining
+    filters = [("source", "in", list(sources))] if sources else None
+    df = pd.read_parquet(dst, filters=filters)
+    return df.sort_values("Rating", ascending=False, kind="stable", ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean many scraped CSVs in parallel into one partitioned dataset")
+    parser.add_argument("sources", nargs="+", help="raw CSV files or glob patterns")
+    parser.add_argument("--out", default="ecommerce_data_cleaned")
+    parser.add_argument("--workers", type=int, default=None, help="processes (defaults to the CPU count)")
+    parser.add_argument("--chunk-mb", type=int, default=CHUNK_SIZE // (1024 * 1024),
+                        help="split large files into ranges of this size")
+    parser.add_argument("--spill-dir", default=None)
+    args = parser.parse_args()
+
+    sources = [path for pattern in args.sources for path in sorted(glob.glob(pattern)) or [pattern]]
+    stats = clean_files(sources, args.out, args.workers, args.chunk_mb * 1024 * 1024, args.spill_dir)
+    print(f"✅ Cleaned {stats['rows_in']:,} rows from {stats['files']} files ({stats['tasks']} tasks) into "
+          f"{stats['rows_out']:,} in {stats['seconds']:.1f}s ({stats['rows_per_sec']:,.0f} rows/s)")
+    print(f"   {stats['duplicates']:,} duplicates, {stats['missing_price']:,} without price, "
+          f"{stats['imputed']:,} ratings imputed with {stats['mean_rating']:.2f}")
+    print(f"✅ Dataset written to {args.out}/")
@@ -0,0 +1,92 @@
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+import alerts
+from benchmarks.synthetic import BRANDS, make_titles
+
+
+def synthetic_rules(count, rng):
+    # Mostly "brand X under ₹N with rating >= r", some with a price floor, some for any brand
+    brands = rng.choice(BRANDS, count)
+    any_brand = rng.random(count) < 0.1
+    max_price = np.round(rng.lognormal(6.8, 0.6, count), -1)
+    min_price = np.where(rng.random(count) < 0.3, np.round(max_price * rng.uniform(0.3, 0.9, count), -1), 0.0)
+    min_rating = rng.choice([0.0, 3.5, 4.0, 4.2, 4.5], count)
+    return [alerts.make_rule(i + 1, None if any_brand[i] else brands[i], max_price[i], min_price[i], min_rating[i])
+            for i in range(count)]
+
+
+def synthetic_changes(count, rng):
+    return pd.DataFrame({
+        "product_id": [f"P{i:09d}" for i in range(count)],
+        "ts": pd.Timestamp("2026-01-01", tz="UTC"),
+        "price": rng.lognormal(6.8, 0.5, count).astype("float32"),
+        "rating": rng.uniform(3.0, 5.0, count).round(1).astype("float32"),
+        "name": make_titles(count, rng),
+    })
+
+
+def naive_matches(index, brands, prices, ratings):
+    # Baseline: every rule checked against every changed product
+    rules = index.rules
+    rule_brands = np.array(index.canonical([rule.brand or alerts.ANY_BRAND for rule in rules]), dtype=object)
+    any_brand = np.array([rule.brand is None for rule in rules])
+    low = np.array([rule.min_price for rule in rules])
+    high = np.array([rule.max_price for rule in rules])
+    min_rating = np.array([rule.min_rating if rule.min_rating > 0 else -math.inf for rule in rules])
+    return [
+        np.flatnonzero(((rule_brands == brand) | any_brand) & (low <= price) & (price <= high)
+                       & (min_rating <= rating)).tolist()
+        for brand, price, rating in zip(brands, prices, ratings)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alert evaluation throughput: indexed rules vs scanning every rule")
+    parser.add_argument("--rules", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--products", type=int, default=100_000, help="changed products per scrape")
+    parser.add_argument("--naive-sample", type=int, default=2_000,
+                        help="products timed with the full scan (its rate is extrapolated)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    changes = synthetic_changes(args.products, rng)
+    print(f"{'rules':>8} {'build s':>8} {'indexed prod/s':>15} {'naive prod/s':>13} {'speedup':>8} "
+          f"{'candidates':>11} {'alerts':>8} {'rescan alerts':>14}")
+    for count in args.rules:
+        rules = synthetic_rules(count, rng)
+        started = time.perf_counter()
+        index = alerts.RuleIndex(rules)
+        build = time.perf_counter() - started
+
+        evaluator = alerts.AlertEvaluator(index, state_path=None)
+        fired = evaluator.evaluate(changes)
+        indexed = evaluator.totals["products"] / evaluator.totals["seconds"]
+        # Same prices again: every pair is already alerted, nothing new fires
+        repeat = evaluator.evaluate(changes)
+
+        sample = changes.head(args.naive_sample)
+        brands = index.canonical(sample["name"].tolist())
+        started = time.perf_counter()
+        expected = naive_matches(index, brands, sample["price"].tolist(), sample["rating"].tolist())
+        naive = len(sample) / (time.perf_counter() - started)
+        got = [sorted(index.match(b, p, r)) for b, p, r in
+               zip(brands, sample["price"].tolist(), sample["rating"].tolist())]
+        assert got == expected, "indexed matches differ from the full scan"
+
+        print(f"{count:>8,} {build:>8.2f} {indexed:>15,.0f} {naive:>13,.0f} {indexed / naive:>7.1f}x "
+              f"{evaluator.totals['candidates'] // 2:>11,} {len(fired):>8,} {len(repeat):>14,}")
+
+    # One rule over the open price range is still matched like any other
+    tree = alerts.IntervalTree([0.0, 500.0], [math.inf, 800.0], ["a", "b"])
+    assert sorted(tree.stab(600.0)) == ["a", "b"] and tree.stab(900.0) == ["a"]
+
+    # A price-only rule also alerts for products without a rating; a rating floor still excludes them
+    index = alerts.RuleIndex([alerts.make_rule(1, max_price=800), alerts.make_rule(2, max_price=800, min_rating=4.0)])
+    assert index.match("", 700.0, None) == [0] and index.match("", 700.0, float("nan")) == [0]
+    assert sorted(index.match("", 700.0, 4.5)) == [0, 1]
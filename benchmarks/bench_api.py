@@ -0,0 +1,134 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from benchmarks.synthetic import cached_cleaned_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dashboard-like traffic: a handful of pages and slider positions, so nearly every request is a cache hit
+HOT_PATHS = ["/summary", "/price", "/rating", "/brands?limit=20", "/top-rated?n=10", "/best-budget",
+             "/best-budget?max_price=500&min_rating=4.5", "/top-rated?n=20"]
+
+
+def cold_path(rng):
+    # Ad-hoc queries that almost never repeat, so the server renders each one
+    return (f"/best-budget?max_price={rng.randint(100, 5000)}&min_rating={rng.randint(30, 50) / 10}"
+            f"&limit={rng.choice([10, 50, 200])}&offset={rng.randint(0, 500)}")
+
+
+async def fetch(reader, writer, host, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    body = await reader.readexactly(length)
+    return status, body
+
+
+async def client(base_url, paths, latencies):
+    # One keep-alive connection sending its share of requests back to back
+    parts = urlsplit(base_url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    try:
+        for path in paths:
+            started = time.perf_counter()
+            status, body = await fetch(reader, writer, parts.netloc, path)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                raise RuntimeError(f"{path}: {status} {body[:200]!r}")
+    finally:
+        writer.close()
+
+
+async def load_test(base_url, paths, concurrency):
+    # (requests/s, latencies in ms) for paths spread over concurrent connections
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(base_url, paths[i::concurrency], latencies) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return len(paths) / elapsed, np.array(latencies) * 1000
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_instance(rows, workdir):
+    # api.py in its own process on a synthetic cleaned CSV, ready once /health answers
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "api.py"), "--port", str(port), "--src", cached_cleaned_csv(rows),
+         "--artifact", os.path.join(workdir, "cleaned.arrow"), "--catalogue", os.path.join(workdir, "catalogue")],
+        cwd=workdir, stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        started = time.perf_counter()
+        while True:
+            try:
+                with urllib.request.urlopen(base_url + "/health", timeout=1) as response:
+                    health = json.load(response)
+                break
+            except OSError:
+                if process.poll() is not None:
+                    raise RuntimeError("api.py exited during startup")
+                time.sleep(0.2)
+        print(f"{health['products']:,} products loaded in {time.perf_counter() - started:.1f}s")
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test of the JSON API: requests/s and p50/p99 latency "
+                                                 "per concurrency level, for cached and uncached queries")
+    parser.add_argument("--url", default=None, help="running instance to test (default: start one on --rows)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=5_000, help="requests per run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    workloads = {
+        "cached": lambda: [HOT_PATHS[i % len(HOT_PATHS)] for i in range(args.requests)],
+        "uncached": lambda: [cold_path(rng) for _ in range(args.requests)],
+    }
+
+    workdir = tempfile.mkdtemp(prefix="bench_api_")
+    try:
+        with (local_instance(args.rows, workdir) if args.url is None else nullcontext(args.url)) as base_url:
+            # Warm up: the first request per path renders it
+            asyncio.run(load_test(base_url, HOT_PATHS, 1))
+            print(f"{'workload':>10} {'clients':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+            for name, make_paths in workloads.items():
+                for concurrency in args.concurrency:
+                    rate, latencies = asyncio.run(load_test(base_url, make_paths(), concurrency))
+                    p50, p99 = np.percentile(latencies, [50, 99])
+                    print(f"{name:>10} {concurrency:>8} {rate:>10,.0f} {p50:>9.2f} {p99:>9.2f} {latencies.max():>9.2f}")
+    finally:
+        shutil.rmtree(workdir)
@@ -0,0 +1,42 @@
+import argparse
+import os
+import shutil
+import tempfile
+
+from batch_clean import CHUNK_SIZE, clean_files
+from benchmarks.synthetic import cached_raw_csv
+
+
+def worker_counts(limit):
+    # 1, 2, 4, ... up to and including limit
+    counts = [1]
+    while counts[-1] * 2 < limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch cleaning throughput from 1 to N worker processes")
+    parser.add_argument("--files", type=int, default=8, help="synthetic category files per batch")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per file")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-mb", type=int, default=CHUNK_SIZE // (1024 * 1024))
+    args = parser.parse_args()
+
+    # Different seeds give overlapping title pools, so the global dedup has real work to do
+    sources = [cached_raw_csv(args.rows, seed=seed) for seed in range(args.files)]
+    total = args.files * args.rows
+    print(f"{args.files} files x {args.rows:,} rows, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'tasks':>6} {'seconds':>8} {'rows/s':>11} {'rows out':>11} {'speedup':>8} {'efficiency':>11}")
+
+    baseline = None
+    for workers in worker_counts(args.max_workers):
+        dst = tempfile.mkdtemp(prefix="bench_batch_clean_")
+        stats = clean_files(sources, dst, workers, args.chunk_mb * 1024 * 1024)
+        shutil.rmtree(dst)
+        baseline = baseline or stats["seconds"]
+        speedup = baseline / stats["seconds"]
+        print(f"{workers:>8} {stats['tasks']:>6} {stats['seconds']:>8.1f} {total / stats['seconds']:>11,.0f} "
+              f"{stats['rows_out']:>11,} {speedup:>7.2f}x {speedup / workers:>10.0%}")
@@ -0,0 +1,61 @@
+import argparse
+import time
+
+from selenium.webdriver.common.by import By
+
+from benchmarks.fixture_server import serve
+from browser_pool import BrowserPool, make_driver, open_search_page
+
+
+def count_cards(driver):
+    return len(driver.find_elements(By.XPATH, "//div[@data-id]"))
+
+
+def run_cold(urls):
+    # What task3.py used to do: a fresh browser for every page
+    started = time.perf_counter()
+    for url in urls:
+        driver = make_driver()
+        try:
+            open_search_page(driver, url)
+            count_cards(driver)
+        finally:
+            driver.quit()
+    return time.perf_counter() - started
+
+
+def run_pooled(urls, size, max_pages):
+    with BrowserPool(size=size, max_pages=max_pages) as pool:
+        warm_started = time.perf_counter()
+        pool.warm_up()
+        warm_up = time.perf_counter() - warm_started
+
+        started = time.perf_counter()
+        cards = sum(pool.map(urls, count_cards))
+        elapsed = time.perf_counter() - started
+        stats = pool.stats()
+    return warm_up, elapsed, cards, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold browser per page vs a warm browser pool")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--max-pages", type=int, default=10, help="recycle a browser after this many pages")
+    parser.add_argument("--skip-cold", action="store_true")
+    args = parser.parse_args()
+
+    with serve() as server:
+        urls = [f"{server.base_url}?q=earbuds&page={i + 1}" for i in range(args.pages)]
+
+        if not args.skip_cold:
+            cold = run_cold(urls)
+            print(f"cold start per page: {cold:.2f}s ({args.pages / cold:.2f} pages/s)\n")
+
+        for size in args.sizes:
+            warm_up, elapsed, cards, stats = run_pooled(urls, size, args.max_pages)
+            print(f"pool size {size}: warm-up {warm_up:.2f}s, {args.pages} pages in {elapsed:.2f}s "
+                  f"({args.pages / elapsed:.2f} pages/s, {cards} cards, {stats['recycled']} recycled)")
+            for session in sorted(stats["sessions"], key=lambda s: s["session"]):
+                print(f"    session {session['session']:>3}: {session['pages']:>3} pages, "
+                      f"mean {session['mean_latency'] * 1000:.0f}ms, max {session['max_latency'] * 1000:.0f}ms")
@@ -0,0 +1,38 @@
+import argparse
+import shutil
+import tempfile
+import time
+
+from benchmarks.bench_history import synthetic_scrapes
+from change_detect import STATE_FILE, ChangeDetector
+from history_store import HistoryStore, state_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Change-detection dedup ratio and ingest throughput")
+    parser.add_argument("--products", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--scrapes-per-day", type=int, default=4)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="change_detect_")
+    try:
+        store = HistoryStore(root)
+        detector = ChangeDetector(state_path(root, STATE_FILE))
+        print(f"{'scrape':>20} {'observed':>9} {'new':>8} {'changed':>8} {'heartbeat':>10} {'stored':>8} {'rows/s':>11}")
+
+        started = time.perf_counter()
+        for ts, table in synthetic_scrapes(args.products, args.days, args.scrapes_per_day):
+            _, counts = detector.ingest(store, table.to_pandas())
+            report = detector.report(counts)
+            print(f"{ts.strftime('%Y-%m-%d %H:%M'):>20} {report['observed']:>9,} {report['new']:>8,} "
+                  f"{report['changed']:>8,} {report['heartbeat']:>10,} {report['stored']:>8,} "
+                  f"{report['rows_per_sec']:>11,.0f}")
+        elapsed = time.perf_counter() - started
+
+        total = detector.report()
+        print(f"\ndetect: {total['observed']:,} rows at {total['rows_per_sec']:,.0f} rows/s "
+              f"(end to end with writes: {total['observed'] / elapsed:,.0f} rows/s)")
+        print(f"stored {total['stored']:,} of {total['observed']:,} rows, dedup ratio {total['dedup_ratio']:.1f}x")
+        print(f"history on disk: {store.stats()}")
+    finally:
+        shutil.rmtree(root)
@@ -0,0 +1,91 @@
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+import charts
+import cleaned_data
+from benchmarks.synthetic import cached_cleaned_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = ["🏠 Overview", "💰 Price Analysis", "⭐ Rating Analysis", "📈 Price vs Rating",
+         "🏆 Top Rated", "💸 Best Budget", "🏢 Brand Analysis"]
+
+# Slider positions a user would plausibly visit (sliders move in steps, so values repeat)
+TOP_N = list(range(5, 21))
+MAX_PRICE = list(range(300, 2001, 50))
+MIN_RATING = [round(3.0 + step / 10, 1) for step in range(21)]
+
+
+def rss_mib():
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def interact(at, rng):
+    # Switch page, or move a slider on the current page, then rerun
+    if rng.random() < 0.4 or not at.slider:
+        at.sidebar.radio[0].set_value(rng.choice(PAGES))
+    else:
+        page = at.sidebar.radio[0].value
+        if page == "🏆 Top Rated":
+            at.slider[0].set_value(rng.choice(TOP_N))
+        elif page == "💸 Best Budget":
+            at.slider[0].set_value(rng.choice(MAX_PRICE))
+            at.slider[1].set_value(rng.choice(MIN_RATING))
+    started = time.perf_counter()
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return time.perf_counter() - started
+
+
+def simulate(interactions, seed):
+    rng = random.Random(seed)
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=600)
+    at.run()
+    start_rss = rss_mib()
+    latencies, samples = [], []
+    for i in range(interactions):
+        latencies.append(interact(at, rng))
+        if (i + 1) % max(1, interactions // 10) == 0:
+            samples.append(rss_mib())
+    return np.array(latencies) * 1000, start_rss, samples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rerun latency and RSS over simulated dashboard interactions")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--interactions", type=int, default=1_000)
+    parser.add_argument("--no-cache", action="store_true", help="re-render every chart (cache of 0 entries)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    if args.no_cache:
+        charts.CACHE_ENTRIES = 0
+
+    workdir = tempfile.mkdtemp(prefix="bench_charts_")
+    os.symlink(cached_cleaned_csv(args.rows), os.path.join(workdir, cleaned_data.CLEANED_CSV))
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+
+    latencies, start_rss, samples = simulate(args.interactions, args.seed)
+    os.chdir(ROOT)
+    shutil.rmtree(workdir)
+
+    print(f"{args.rows:,} products, {args.interactions:,} interactions, chart cache "
+          f"{'off' if args.no_cache else f'{charts.CACHE_ENTRIES} entries'}")
+    print(f"rerun latency ms: p50 {np.percentile(latencies, 50):.1f}  p95 {np.percentile(latencies, 95):.1f}  "
+          f"p99 {np.percentile(latencies, 99):.1f}  mean {latencies.mean():.1f}")
+    print(f"RSS MiB: start {start_rss:.0f}  " + "  ".join(f"{rss:.0f}" for rss in samples))
+    print(f"open matplotlib figures at the end: {len(plt.get_fignums())}")
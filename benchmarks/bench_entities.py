@@ -0,0 +1,105 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import entity_resolution
+from benchmarks.synthetic import make_titles
+
+
+def perturb(titles, rng, rate=0.5):
+    # Relisted-SKU variants: brand casing, reordered features, repeated/dropped words, punctuation
+    out = titles.copy()
+    for i in np.flatnonzero(rng.random(len(titles)) < rate):
+        words = out[i].split()
+        kind = rng.integers(0, 4)
+        if kind == 0:
+            words[0] = words[0].upper() if rng.random() < 0.5 else words[0].lower()
+        elif kind == 1 and len(words) > 5:
+            middle = words[3:-1]
+            rng.shuffle(middle)
+            words = words[:3] + middle + words[-1:]
+        elif kind == 2:
+            words.append(words[-1])
+        else:
+            words = [word.rstrip(",") for word in words]
+        out[i] = " ".join(words)
+    return out
+
+
+def catalogue(rows, skus, seed=0):
+    # rows titles drawn from skus products, half of them perturbed; truth is the SKU each came from
+    rng = np.random.default_rng(seed)
+    base = make_titles(skus, rng)
+    # Same words regardless of case/order/repeats is the same SKU (make_titles has realme/Realme and
+    # "Bluetooth Bluetooth" suffixes of its own)
+    words = pd.Series(base).str.lower().str.findall(r"\w+").map(lambda w: " ".join(sorted(set(w))))
+    truth = pd.factorize(words)[0]
+    pick = rng.integers(0, skus, rows)
+    return pa.array(perturb(base[pick], rng), pa.string()), truth[pick]
+
+
+def pair_scores(predicted, truth):
+    # Pairwise precision/recall of the clustering against the true SKUs
+    def pairs(counts):
+        counts = counts.astype(np.int64)
+        return int((counts * (counts - 1) // 2).sum())
+
+    frame = pd.DataFrame({"predicted": predicted, "truth": truth})
+    both = pairs(frame.groupby(["predicted", "truth"]).size().to_numpy())
+    found = pairs(frame.groupby("predicted").size().to_numpy())
+    actual = pairs(frame.groupby("truth").size().to_numpy())
+    return both / max(found, 1), both / max(actual, 1)
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Brand normalisation and canonical product ID throughput on synthetic titles")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skus", type=int, default=200_000)
+    parser.add_argument("--new", type=float, default=0.01, help="fraction of unseen titles in the incremental run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    titles, truth = catalogue(args.rows, args.skus, args.seed)
+    distinct = len(pc.unique(titles))
+    print(f"{args.rows:,} titles ({distinct:,} distinct) from {args.skus:,} SKUs")
+
+    first_words = pc.list_element(pc.utf8_split_whitespace(titles), 0)
+    seconds, brands = timed(entity_resolution.BrandMatcher().match, titles)
+    print(f"brands: {len(pc.unique(first_words)):,} first-word spellings -> {len(pc.unique(brands)):,} canonical "
+          f"in {seconds:.2f}s ({args.rows / seconds:,.0f} titles/s)")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, entity_resolution.ENTITY_INDEX)
+        index = entity_resolution.EntityIndex(path)
+        seconds, (_, product_ids) = timed(index.lookup, titles)
+        index.save()
+        precision, recall = pair_scores(product_ids.to_numpy(zero_copy_only=False), truth)
+        print(f"cold resolve: {seconds:.2f}s ({args.rows / seconds:,.0f} titles/s), "
+              f"{len(pc.unique(product_ids)):,} products, pair precision {precision:.4f} recall {recall:.4f}")
+        legacy = pair_scores(titles.to_numpy(zero_copy_only=False), truth)
+        print(f"exact-title dedup (task4.py key) for comparison: pair precision {legacy[0]:.4f} recall {legacy[1]:.4f}")
+
+        index = entity_resolution.EntityIndex(path)
+        seconds, _ = timed(index.lookup, titles)
+        print(f"persisted index join: {seconds:.2f}s ({args.rows / seconds:,.0f} titles/s), "
+              f"index {os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+
+        rng = np.random.default_rng(args.seed + 1)
+        fresh, _ = catalogue(max(1, int(args.rows * args.new)), args.skus, args.seed)
+        fresh = pa.array(perturb(fresh.to_numpy(zero_copy_only=False), rng, rate=1.0), pa.string())
+        batch = pa.concat_arrays([titles, fresh])
+        seconds, _ = timed(index.lookup, batch)
+        print(f"incremental: {len(batch):,} titles with {index.stats['new_titles']:,} unseen in {seconds:.2f}s "
+              f"({len(batch) / seconds:,.0f} titles/s), {index.stats['new_products']:,} new products")
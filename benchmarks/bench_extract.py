@@ -0,0 +1,45 @@
+import argparse
+import time
+
+from benchmarks.fixture_server import serve
+from browser_pool import make_driver, open_search_page
+from dom_extract import EXTRACTORS
+
+
+def count_rpcs(driver):
+    # Every WebDriver command (including WebElement calls) goes through driver.execute
+    calls = {"count": 0}
+    execute = driver.execute
+
+    def counting_execute(*args, **kwargs):
+        calls["count"] += 1
+        return execute(*args, **kwargs)
+
+    driver.execute = counting_execute
+    return calls
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WebDriver round-trips and wall time per extraction mode")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with serve() as server:
+        driver = make_driver()
+        try:
+            open_search_page(driver, f"{server.base_url}?q=earbuds")
+            calls = count_rpcs(driver)
+            baseline = None
+
+            print(f"{'mode':>10} {'cards':>6} {'rpcs':>6} {'ms/page':>9} {'speedup':>8}")
+            for mode, extract in EXTRACTORS.items():
+                calls["count"] = 0
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    rows = extract(driver)
+                elapsed = (time.perf_counter() - started) / args.repeat
+                baseline = baseline or elapsed
+                print(f"{mode:>10} {len(rows):>6} {calls['count'] // args.repeat:>6} "
+                      f"{elapsed * 1000:>9.1f} {baseline / elapsed:>7.1f}x")
+        finally:
+            driver.quit()
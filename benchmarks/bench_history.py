@@ -0,0 +1,89 @@
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from history_store import HistoryStore, history_schema
+
+
+def synthetic_scrapes(products, days, scrapes_per_day, seed=0):
+    # Yields one pyarrow table per scrape: every product observed with a slowly drifting price
+    rng = np.random.default_rng(seed)
+    ids = pa.array([f"P{i:09d}" for i in range(products)])
+    names = pa.array([f"Brand{i % 500} Product {i}" for i in range(products)])
+    price = rng.lognormal(6.8, 0.5, products).astype("float32")
+    rating = rng.uniform(3.0, 5.0, products).round(1).astype("float32")
+    start = pd.Timestamp("2026-01-01", tz="UTC")
+
+    for day in range(days):
+        for scrape in range(scrapes_per_day):
+            changed = rng.random(products) < 0.05
+            price = np.where(changed, price * rng.uniform(0.85, 1.15, products), price).astype("float32")
+            ts = start + pd.Timedelta(days=day, hours=scrape * 24 // scrapes_per_day)
+            yield ts, pa.table({
+                "product_id": ids,
+                "ts": pa.array(np.full(products, ts.value // 1000), pa.timestamp("us", tz="UTC")),
+                "price": price,
+                "rating": rating,
+                "name": names,
+            }, schema=history_schema())
+
+
+def time_queries(store, product_ids, day):
+    latencies = []
+    for product_id in product_ids:
+        started = time.perf_counter()
+        store.product_history(product_id)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    one_day = store.query(start=day, end=day + pd.Timedelta(days=1))
+    day_latency = time.perf_counter() - started
+
+    started = time.perf_counter()
+    week = store.query(product_ids[:100], start=day, end=day + pd.Timedelta(days=7))
+    week_latency = time.perf_counter() - started
+    return statistics.median(latencies), max(latencies), (day_latency, len(one_day)), (week_latency, len(week))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="History store ingest rate and query latency")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=25)
+    parser.add_argument("--scrapes-per-day", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="price_history_")
+    try:
+        store = HistoryStore(root)
+        rows = 0
+        write_time = 0.0
+        for ts, table in synthetic_scrapes(args.products, args.days, args.scrapes_per_day):
+            started = time.perf_counter()
+            rows += store.append(table)
+            write_time += time.perf_counter() - started
+        print(f"ingest: {rows:,} rows in {write_time:.1f}s ({rows / write_time:,.0f} rows/s)")
+        print(f"store: {store.stats()}\n")
+
+        rng = np.random.default_rng(1)
+        product_ids = [f"P{i:09d}" for i in rng.integers(0, args.products, args.queries)]
+        day = pd.Timestamp("2026-01-01", tz="UTC") + pd.Timedelta(days=args.days // 2)
+
+        for label in ("before compaction", "after compaction"):
+            if label == "after compaction":
+                started = time.perf_counter()
+                store.compact()
+                print(f"compaction: {time.perf_counter() - started:.1f}s, {store.stats()}\n")
+            median, worst, (day_latency, day_rows), (week_latency, week_rows) = time_queries(store, product_ids, day)
+            print(f"{label}:")
+            print(f"    one product, full history: median {median * 1000:.0f}ms, max {worst * 1000:.0f}ms")
+            print(f"    all products, one day:     {day_latency * 1000:.0f}ms ({day_rows:,} rows)")
+            print(f"    100 products, one week:    {week_latency * 1000:.0f}ms ({week_rows:,} rows)\n")
+    finally:
+        shutil.rmtree(root)
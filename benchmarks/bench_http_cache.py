@@ -0,0 +1,49 @@
+import argparse
+import shutil
+import tempfile
+import time
+
+from benchmarks.fixture_server import serve
+from http_cache import HttpCache
+from scraper import Crawler
+
+
+def crawl(server, cache, queries, pages):
+    crawler = Crawler(workers=8, base_url=server.base_url, cache=cache)
+    before = dict(cache.stats)
+    started = time.perf_counter()
+    products = sum(len(r.products) for r in crawler.crawl(queries, pages))
+    elapsed = time.perf_counter() - started
+    crawler.close()
+    delta = {key: cache.stats[key] - before[key] for key in cache.stats}
+    return elapsed, products, crawler.stats, delta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conditional-request cache against a validator-aware stub server")
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    queries = [f"query {i}" for i in range(args.queries)]
+    cache_dir = tempfile.mkdtemp(prefix="http_cache_")
+    try:
+        with serve(latency=args.latency, validators=True) as server:
+            cache = HttpCache(cache_dir, ttl=0)
+            runs = [("cold", None), ("revalidate (ttl=0)", None), ("one page changed", "change"), ("fresh (ttl=1h)", 3600)]
+
+            print(f"{'run':>20} {'seconds':>8} {'products':>9} {'wire KiB':>9} "
+                  f"{'hits':>5} {'304s':>5} {'misses':>7} {'saved KiB':>10}")
+            for name, action in runs:
+                if action == "change":
+                    server.pages[0] = server.pages[0].replace(b"</body>", b"<!-- price update --></body>")
+                elif action is not None:
+                    cache.ttl = action
+                elapsed, products, crawl_stats, delta = crawl(server, cache, queries, args.pages)
+                print(f"{name:>20} {elapsed:>8.2f} {products:>9} {crawl_stats['bytes'] / 1024:>9.0f} "
+                      f"{delta['hits']:>5} {delta['revalidated']:>5} {delta['misses']:>7} "
+                      f"{delta['bytes_saved'] / 1024:>10.0f}")
+            cache.close()
+    finally:
+        shutil.rmtree(cache_dir)
@@ -0,0 +1,66 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.bench_query import catalogue
+from product_index import ProductIndex
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_listing(rows):
+    # The old Top Rated / Best Budget loop: three columns and a divider per product
+    import streamlit as st
+
+    for idx, row in rows.iterrows():
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            st.markdown(f"**{row['Product Name']}**")
+        with col2:
+            st.markdown(f"**₹{row['Price']:.0f}**")
+        with col3:
+            st.markdown(f"**{row['Rating']} ⭐**")
+        st.markdown("---")
+
+
+def paginated_listing(index):
+    import listing
+
+    total = index.count_budget(float("inf"), 0.0)
+    listing.paginated_listing(lambda offset, limit: index.best_budget(float("inf"), 0.0, limit=limit, offset=offset),
+                              total, key="bench")
+
+
+def render_time(script, arg, repeat):
+    at = AppTest.from_function(script, args=(arg,), default_timeout=600)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        at.run()
+        best = min(best, time.perf_counter() - started)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return best, len(list(at.main))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Listing render time vs result size: per-row columns vs one paginated grid")
+    parser.add_argument("--results", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=1_000, help="skip the per-row loop above this many results")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    sys.path.insert(0, ROOT)
+
+    print(f"{'results':>10} {'listing':>10} {'render s':>9} {'elements':>9}")
+    for results in args.results:
+        df = catalogue(results)
+        if results <= args.legacy_max:
+            seconds, elements = render_time(legacy_listing, df, args.repeat)
+            print(f"{results:>10,} {'per-row':>10} {seconds:>9.3f} {elements:>9,}")
+        seconds, elements = render_time(paginated_listing, ProductIndex(df), args.repeat)
+        print(f"{results:>10,} {'paginated':>10} {seconds:>9.3f} {elements:>9,}")
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import cleaned_data
+from benchmarks.synthetic import cached_cleaned_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What app.py's load_data() did before, plus the first thing every page needs (brand count)
+CSV_LOAD = """
+import pandas as pd
+df = pd.read_csv(SRC)
+df['Brand'] = df['Product Name'].str.split().str[0]
+df['Brand'].nunique()
+"""
+
+BINARY_LOAD = """
+import cleaned_data
+df = cleaned_data.load(SRC, ARTIFACT)
+df['Brand'].nunique()
+"""
+
+# Wraps a loader so the child reports its own import+load time and peak RSS
+CHILD = """
+import resource, time, json
+started = time.perf_counter()
+{body}
+print(json.dumps({{"load": time.perf_counter() - started,
+                   "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+
+def cold_start(body, src, artifact):
+    # A fresh interpreter per run, like a new Streamlit worker; the OS page cache stays warm
+    code = f"SRC = {src!r}\nARTIFACT = {artifact!r}\n" + CHILD.format(body=body)
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["total"] = time.perf_counter() - started
+    return result
+
+
+def best_of(repeat, body, src, artifact):
+    runs = [cold_start(body, src, artifact) for _ in range(repeat)]
+    return min(runs, key=lambda run: run["total"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard cold start: cleaned CSV vs memory-mapped Arrow artifact")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'format':>7} {'MiB':>7} {'process s':>10} {'import+load s':>14} {'peak RSS MiB':>13}")
+    for rows in args.rows:
+        src = cached_cleaned_csv(rows)
+        artifact = os.path.splitext(src)[0] + ".arrow"
+        cleaned_data.write_artifact(src, artifact)
+
+        for name, body, path in (("csv", CSV_LOAD, src), ("arrow", BINARY_LOAD, artifact)):
+            result = best_of(args.repeat, body, src, artifact)
+            print(f"{rows:>10,} {name:>7} {os.path.getsize(path) / 1024 / 1024:>7.1f} {result['total']:>10.2f} "
+                  f"{result['load']:>14.2f} {result['rss'] / 1024:>13,.0f}")
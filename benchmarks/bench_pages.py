@@ -0,0 +1,69 @@
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+import aggregates
+import cleaned_data
+from benchmarks.synthetic import cached_cleaned_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sidebar label -> the aggregates.PAGES entry it reads (the sidebar summary is on every page)
+PAGES = {
+    "🏠 Overview": "overview",
+    "💰 Price Analysis": "price",
+    "⭐ Rating Analysis": "rating",
+    "📈 Price vs Rating": "price_vs_rating",
+    "🏢 Brand Analysis": "brand",
+}
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def render(at, label=None):
+    if label is not None:
+        at.sidebar.radio[0].set_value(label)
+    elapsed = timed(at.run)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-page dashboard render time with and without precomputed summaries")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # Streamlit deprecation notices on every rerun
+
+    # app.py reads ecommerce_data_cleaned.csv from the working directory, so run it in a scratch one
+    workdir = tempfile.mkdtemp(prefix="bench_pages_")
+    os.symlink(cached_cleaned_csv(args.rows), os.path.join(workdir, cleaned_data.CLEANED_CSV))
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+
+    df = cleaned_data.load()
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=600)
+    first = render(at)
+    print(f"{args.rows:,} products; first run (artifact + summaries built): {first:.2f}s\n")
+
+    print(f"{'page':>20} {'summaries s':>12} {'render s':>9} {'rerun s':>8}")
+    for label, name in PAGES.items():
+        # What every rerun of this page used to recompute from the full frame
+        compute = min(timed(aggregates.PAGES[name], df) + timed(aggregates.sidebar, df) for _ in range(args.repeat))
+        rendered = render(at, label)
+        rerun = min(render(at) for _ in range(args.repeat))
+        print(f"{label:>20} {compute:>12.3f} {rendered:>9.3f} {rerun:>8.3f}")
+
+    os.chdir(ROOT)
+    shutil.rmtree(workdir)
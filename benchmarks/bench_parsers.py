@@ -0,0 +1,74 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import time
+import tracemalloc
+
+import parsers
+from benchmarks.fixture_server import FIXTURE_DIR
+
+
+def load_corpus(fixture_dir):
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.html"))):
+        with open(path, "rb") as file:
+            corpus.append(file.read())
+    return corpus
+
+
+def make_parser(name):
+    if name == "lxml-full":
+        return parsers.LxmlParser(parsers.LAYOUTS["flipkart"], early_stop=False)
+    return parsers.get_parser(name)
+
+
+def measure(name, corpus, repeat):
+    # Runs in a fresh process so peak RSS belongs to this backend alone
+    parse = make_parser(name)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    products = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for content in corpus:
+            products += len(parse(content))
+    elapsed = time.perf_counter() - started
+
+    # Python-heap peak over one pass (lxml and selectolax allocate mostly in C, see RSS)
+    tracemalloc.start()
+    for content in corpus:
+        parse(content)
+    heap_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pages = repeat * len(corpus)
+    return {
+        "backend": name,
+        "pages_per_sec": pages / elapsed,
+        "products": products // repeat,
+        "heap_peak_kb": heap_peak / 1024,
+        "rss_growth_kb": rss_after - rss_before,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parser backend throughput and memory over saved pages")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", default=list(parsers.BACKENDS) + ["lxml-full"])
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.fixtures)
+    size = sum(len(content) for content in corpus)
+    print(f"{len(corpus)} pages, {size / 1024:.0f} KiB, {args.repeat} passes\n")
+    print(f"{'backend':>11} {'pages/s':>9} {'products':>9} {'heap peak KiB':>14} {'RSS growth KiB':>15}")
+
+    context = multiprocessing.get_context("spawn")
+    for name in args.backends:
+        with context.Pool(1) as pool:
+            r = pool.apply(measure, (name, corpus, args.repeat))
+        print(f"{r['backend']:>11} {r['pages_per_sec']:>9.1f} {r['products']:>9} "
+              f"{r['heap_peak_kb']:>14.0f} {r['rss_growth_kb']:>15}")
@@ -0,0 +1,68 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_titles
+from product_index import ProductIndex
+
+# Slider positions on the Best Budget page, from narrow to wide result sets
+BUDGET_QUERIES = [(300, 4.8), (500, 4.5), (800, 4.0), (1200, 4.0), (2000, 3.5), (2000, 3.0)]
+TOP_N = [5, 10, 20]
+
+
+def catalogue(rows, seed=0):
+    # Cleaned-frame stand-in; titles are reused past 1M so building 10M rows stays quick
+    rng = np.random.default_rng(seed)
+    titles = make_titles(min(rows, 1_000_000), rng)
+    return pd.DataFrame({
+        "Product Name": titles[rng.integers(0, len(titles), rows)],
+        "Price": ((np.round(rng.lognormal(6.8, 0.55, rows) / 10) * 10 - 1).clip(99, 99_999)).astype(np.float32),
+        "Rating": np.round(np.clip(rng.normal(4.0, 0.35, rows), 1.0, 5.0), 1).astype(np.float32),
+    })
+
+
+def legacy_budget(df, max_price, min_rating):
+    best_budget = df[(df['Price'] <= max_price) & (df['Rating'] >= min_rating)]
+    return best_budget.sort_values(by="Rating", ascending=False)
+
+
+def legacy_top(df, n):
+    return df.sort_values(by="Rating", ascending=False).head(n)
+
+
+def latency(fn, *args, repeat=3):
+    # Best of a few runs, in milliseconds, and the result size
+    best = np.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, len(result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Best Budget / Top Rated latency: boolean masks vs the sorted index")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        df = catalogue(rows)
+        started = time.perf_counter()
+        index = ProductIndex(df)
+        print(f"\n{rows:,} products, index built in {time.perf_counter() - started:.2f}s "
+              f"({len(index.ratings)} rating buckets)")
+        print(f"{'query':>24} {'results':>10} {'mask+sort ms':>13} {'index ms':>9} {'speedup':>8}")
+
+        for max_price, min_rating in BUDGET_QUERIES:
+            legacy_ms, results = latency(legacy_budget, df, max_price, min_rating, repeat=args.repeat)
+            index_ms, _ = latency(index.best_budget, max_price, min_rating, repeat=args.repeat)
+            print(f"{f'budget <={max_price} >={min_rating}':>24} {results:>10,} {legacy_ms:>13.2f} {index_ms:>9.2f} "
+                  f"{legacy_ms / index_ms:>7.0f}x")
+
+        for n in TOP_N:
+            legacy_ms, results = latency(legacy_top, df, n, repeat=args.repeat)
+            index_ms, _ = latency(index.top_rated, n, repeat=args.repeat)
+            print(f"{f'top {n}':>24} {results:>10,} {legacy_ms:>13.2f} {index_ms:>9.2f} {legacy_ms / index_ms:>7.0f}x")
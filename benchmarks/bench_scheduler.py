@@ -0,0 +1,100 @@
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import scheduler
+from benchmarks.fixture_server import serve
+from catalogue import Catalogue
+
+
+def job_counts(db):
+    with sqlite3.connect(db) as conn:
+        return dict(((stage, status), count) for stage, status, count in conn.execute(
+            "SELECT stage, status, COUNT(*) FROM jobs GROUP BY stage, status"))
+
+
+def make_scheduler(schedule, workdir, server, workers=1, offset=0.0):
+    # Every file under workdir; the clock runs offset seconds ahead to reach the next due time
+    return scheduler.Scheduler(
+        schedule, os.path.join(workdir, scheduler.STATE_DB), workers,
+        out_dir=os.path.join(workdir, scheduler.SCRAPE_DIR), root=os.path.join(workdir, "price_history"),
+        base_url=server.base_url, rules=os.path.join(workdir, "alert_rules.json"),
+        alerts_file=os.path.join(workdir, "alerts.jsonl"), catalogue=os.path.join(workdir, "catalogue"),
+        retry_delay=0.1, clock=lambda: time.time() + offset)
+
+
+def run_phase(name, schedule, workdir, server, workers, offset=0.0):
+    # One daemon start: run what is due, then stop once the queue is empty
+    db = os.path.join(workdir, scheduler.STATE_DB)
+    before = job_counts(db) if os.path.exists(db) else {}
+    daemon = make_scheduler(schedule, workdir, server, workers, offset)
+    started = time.perf_counter()
+    daemon.run(until_idle=True, poll=0.05)
+    elapsed = time.perf_counter() - started
+    metrics = daemon.metrics()
+    daemon.close()
+
+    after = job_counts(db)
+    delta = {key: after[key] - before.get(key, 0) for key in after if after[key] != before.get(key, 0)}
+    ran = {stage: sum(count for (s, status), count in delta.items() if s == stage and status == "done")
+           for stage in scheduler.STAGES}
+    skipped = sum(count for (_, status), count in delta.items() if status == "skipped")
+    print(f"{name:>26} {elapsed:>8.2f} " + " ".join(f"{ran[stage]:>8}" for stage in scheduler.STAGES)
+          + f" {skipped:>8} {metrics['chain']['p50_s'] or 0:>9.2f} {metrics['chain']['p95_s'] or 0:>9.2f}")
+    return ran, delta, metrics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scheduler end to end against the fixture server: "
+                                                 "job latency, restarts and skipped work")
+    parser.add_argument("--queries", type=int, default=6)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every fixture response")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="fraction of fixture responses that are 503s")
+    args = parser.parse_args()
+
+    schedule = [{"query": f"category {i}", "pages": args.pages, "every_minutes": 60} for i in range(args.queries)]
+    print(f"{'phase':>26} {'seconds':>8} " + " ".join(f"{stage:>8}" for stage in scheduler.STAGES)
+          + f" {'skipped':>8} {'chain p50':>9} {'chain p95':>9}")
+    for workers in args.workers:
+        workdir = tempfile.mkdtemp(prefix="scheduler_")
+        try:
+            with serve(latency=args.latency, error_rate=args.error_rate) as server:
+                print(f"--- {workers} workers")
+                ran, _, metrics = run_phase("cold", schedule, workdir, server, workers)
+                assert ran == {stage: args.queries for stage in scheduler.STAGES}, ran
+                assert len(Catalogue(os.path.join(workdir, "catalogue"))) == args.queries
+
+                # A restart before anything is due runs nothing
+                ran, delta, _ = run_phase("restart, nothing due", schedule, workdir, server, workers)
+                assert not delta, delta
+
+                # An hour later the listing is the same: it is scraped and ingested, cleaning is skipped
+                ran, delta, _ = run_phase("due, listing unchanged", schedule, workdir, server, workers, offset=3600)
+                assert ran["scrape"] == ran["ingest"] == args.queries and not ran["publish"], ran
+                assert delta[("clean", "skipped")] == args.queries, delta
+
+                # A price change goes through the whole chain again
+                server.pages[0] = server.pages[0].replace("₹672".encode(), "₹599".encode(), 1)
+                ran, _, metrics = run_phase("due, one price changed", schedule, workdir, server, workers, offset=7200)
+                assert ran["publish"] == args.queries, ran
+
+                # Queued and interrupted jobs survive a crash: enqueue, mark one running, then restart
+                crashed = make_scheduler(schedule, workdir, server, offset=10_800)
+                crashed.enqueue_due()
+                crashed._db.execute("UPDATE jobs SET status = 'running' WHERE id = (SELECT MAX(id) FROM jobs)")
+                crashed._db.commit()
+                crashed.close()
+                ran, _, metrics = run_phase("after a crash", schedule, workdir, server, workers, offset=10_800)
+                assert ran["scrape"] == args.queries and metrics["queue"]["queued"] == 0, (ran, metrics["queue"])
+        finally:
+            shutil.rmtree(workdir)
+
+        for stage, stats in metrics["stages"].items():
+            print(f"{stage:>26}   wait p50 {stats['wait_p50_s'] or 0:.3f}s p95 {stats['wait_p95_s'] or 0:.3f}s   "
+                  f"run p50 {stats['run_p50_s'] or 0:.3f}s p95 {stats['run_p95_s'] or 0:.3f}s   "
+                  f"failed {stats['failed']}")
@@ -0,0 +1,45 @@
+import argparse
+import time
+
+from benchmarks.fixture_server import serve
+from scraper import Crawler
+
+
+def run(base_url, queries, pages, workers, per_host):
+    crawler = Crawler(workers=workers, per_host=per_host, base_url=base_url, backoff=0.01)
+    started = time.perf_counter()
+    results = list(crawler.crawl(queries, pages))
+    elapsed = time.perf_counter() - started
+    crawler.close()
+
+    ok = [r for r in results if r.status == 200]
+    products = sum(len(r.products) for r in ok)
+    return {
+        "workers": workers,
+        "pages": len(ok),
+        "requests": crawler.stats["requests"],
+        "retries": crawler.stats["retries"],
+        "seconds": elapsed,
+        "requests_per_sec": crawler.stats["requests"] / elapsed,
+        "pages_per_sec": len(ok) / elapsed,
+        "products_per_sec": products / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraper throughput against the local fixture server")
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated server latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    queries = [f"query {i}" for i in range(args.queries)]
+    with serve(latency=args.latency, error_rate=args.error_rate) as server:
+        print(f"{args.queries} queries x {args.pages} pages, {args.latency * 1000:.0f}ms latency\n")
+        print(f"{'workers':>8} {'pages':>6} {'retries':>8} {'seconds':>8} {'req/s':>8} {'pages/s':>8} {'products/s':>11}")
+        for workers in args.workers:
+            r = run(server.base_url, queries, args.pages, workers, per_host=workers)
+            print(f"{r['workers']:>8} {r['pages']:>6} {r['retries']:>8} {r['seconds']:>8.2f} "
+                  f"{r['requests_per_sec']:>8.1f} {r['pages_per_sec']:>8.1f} {r['products_per_sec']:>11.0f}")
@@ -0,0 +1,81 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import sketches
+from benchmarks.bench_history import synthetic_scrapes
+
+# Brand{i % 500} in the synthetic names
+BRANDS = 500
+
+
+def exact(price, rating, product, quantiles):
+    # What the Price/Rating pages do on a frame: describe()-style statistics over every row
+    result = {}
+    for metric, values in (("price", price), ("rating", rating)):
+        series = pd.Series(values)
+        result[metric] = {"describe": series.describe(), "quantiles": np.quantile(values, quantiles),
+                          "histogram": np.histogram(values, bins=15)}
+    result["distinct"] = len(np.unique(product))
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sketch statistics over a long price history: ingest cost, "
+                                                 "query latency and observed error vs exact scans")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=100)
+    parser.add_argument("--scrapes-per-day", type=int, default=1)
+    args = parser.parse_args()
+
+    store = sketches.SketchStore(path=None)
+    columns = {"price": [], "rating": [], "day": [], "product": []}
+    update_s = []
+    for i, (ts, table) in enumerate(synthetic_scrapes(args.products, args.days, args.scrapes_per_day)):
+        started = time.perf_counter()
+        store.update(table)
+        update_s.append(time.perf_counter() - started)
+        columns["price"].append(table.column("price").to_numpy())
+        columns["rating"].append(table.column("rating").to_numpy())
+        columns["day"].append(np.full(table.num_rows, i // args.scrapes_per_day, np.int16))
+        columns["product"].append(np.arange(table.num_rows, dtype=np.int32))
+    price, rating, day, product = (np.concatenate(columns[name]) for name in ("price", "rating", "day", "product"))
+    print(f"{len(price):,} history rows in {len(store):,} day/brand cells; update per scrape of {args.products:,} rows "
+          f"p50 {np.median(update_s) * 1000:.0f}ms, max {max(update_s) * 1000:.0f}ms")
+
+    start = pd.Timestamp("2026-01-01")
+    selections = {
+        "whole history": (0, args.days - 1, None),
+        "last 30 days": (max(args.days - 30, 0), args.days - 1, None),
+        "last 7 days": (max(args.days - 7, 0), args.days - 1, None),
+        "one brand, whole history": (0, args.days - 1, "Brand7"),
+    }
+    print(f"\n{'selection':>26} {'rows':>12} {'exact ms':>10} {'sketch ms':>10} {'speedup':>8} "
+          f"{'price q err':>12} {'rating q err':>13} {'distinct err':>13}")
+    for name, (first, last, brand) in selections.items():
+        mask = (day >= first) & (day <= last)
+        if brand is not None:
+            mask &= product % BRANDS == int(brand[len("Brand"):])
+        started = time.perf_counter()
+        truth = exact(price[mask], rating[mask], product[mask], sketches.QUANTILES)
+        exact_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        approx = {metric: store.summary(metric, start + pd.Timedelta(days=first), start + pd.Timedelta(days=last), brand)
+                  for metric in sketches.METRICS}
+        sketch_ms = (time.perf_counter() - started) * 1000
+
+        price_err = np.max(np.abs(np.array(list(approx["price"]["quantiles"].values())) - truth["price"]["quantiles"])
+                           / truth["price"]["quantiles"])
+        rating_err = np.max(np.abs(np.array(list(approx["rating"]["quantiles"].values()))
+                                   - truth["rating"]["quantiles"]))
+        distinct_err = abs(approx["price"]["distinct_products"] - truth["distinct"]) / truth["distinct"]
+        assert approx["price"]["count"] == mask.sum()
+        assert price_err <= sketches.RELATIVE_ACCURACY + 1e-6, price_err
+        assert rating_err <= sketches.RATING_STEP / 2 + 1e-6, rating_err
+        print(f"{name:>26} {mask.sum():>12,} {exact_ms:>10.1f} {sketch_ms:>10.1f} {exact_ms / sketch_ms:>7.0f}x "
+              f"{price_err:>11.2%} {rating_err:>13.3f} {distinct_err:>12.2%}")
+    print(f"\nBounds: price quantiles ±{sketches.RELATIVE_ACCURACY:.0%} relative, rating ±{sketches.RATING_STEP / 2:g}, "
+          f"distinct products ±{1.04 / np.sqrt(sketches.HLL_REGISTERS):.1%} standard error")
@@ -0,0 +1,87 @@
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports that only a drawn chart, a visited page or a command that touches data should pay for;
+# flagged when a cold start (--help, or the dashboard's module-level imports) loads them
+HEAVY = ["matplotlib", "seaborn", "scipy", "numpy", "pandas", "pyarrow", "bs4", "lxml", "requests"]
+
+
+def app_imports(path=os.path.join(ROOT, "app.py")):
+    # The module-level imports of the dashboard script, which every fresh `streamlit run` process
+    # pays before the first page draws. Imports inside functions and page branches are left out
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+# name -> arguments after `python -X importtime`, run from the project root
+TARGETS = {
+    "interpreter": ["-c", "pass"],
+    "dashboard": ["-c", app_imports()],
+    "tracker": ["tracker.py", "--help"],
+    "scraper": ["scraper.py", "--help"],
+    "cleaning": ["cleaning.py", "--help"],
+    "scheduler": ["scheduler.py", "--help"],
+    "api": ["api.py", "--help"],
+}
+
+
+def parse_importtime(stderr):
+    # ({top-level module: cumulative µs}, every module imported) from -X importtime output, where
+    # imports made by another module are indented under it
+    top, modules = {}, set()
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2][1:]
+        modules.add(name.strip())
+        if not name.startswith(" "):
+            top[name] = int(parts[1])
+    return top, modules
+
+
+def measure(argv, repeat=5):
+    # Fastest wall time of a fresh interpreter running argv, with that run's import breakdown.
+    # The wall time includes the small overhead of -X importtime itself
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=ROOT, capture_output=True, text=True)
+        wall = time.perf_counter() - started
+        if proc.returncode:
+            raise RuntimeError(f"{' '.join(argv[:1])} exited with {proc.returncode}: "
+                               f"{proc.stderr.strip().splitlines()[-1]}")
+        if best is None or wall < best[0]:
+            best = (wall, proc.stderr)
+    wall, stderr = best
+    top, modules = parse_importtime(stderr)
+    return {"wall_s": wall, "imports_s": sum(top.values()) / 1e6, "modules": modules, "top": top}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start latency of the dashboard and the CLI scripts, "
+                                                 "with the imports that dominate it (python -X importtime)")
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--heaviest", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'target':>12} {'wall ms':>9} {'imports ms':>11} {'modules':>8}  heaviest imports")
+    for name in args.targets:
+        try:
+            result = measure(TARGETS[name], args.repeat)
+        except RuntimeError as error:
+            print(f"{name:>12}  ⚠️ {error}")
+            continue
+        heaviest = sorted(result["top"].items(), key=lambda item: -item[1])[:args.heaviest]
+        loaded = [module for module in HEAVY if module in result["modules"]]
+        print(f"{name:>12} {result['wall_s'] * 1000:>9.0f} {result['imports_s'] * 1000:>11.0f} "
+              f"{len(result['modules']):>8}  " + ", ".join(f"{module} {us / 1000:.0f}ms" for module, us in heaviest)
+              + (f"  ⚠️ loads {', '.join(loaded)}" if loaded else ""))
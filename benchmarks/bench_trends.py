@@ -0,0 +1,75 @@
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+import trends
+from benchmarks.bench_history import synthetic_scrapes
+from history_store import state_path
+
+
+def full_recompute(history, window):
+    # What a snapshot-style analysis does on every new day: regroup the whole history
+    df = history.to_pandas().sort_values(["product_id", "ts"], kind="stable")
+    prices = df.groupby("product_id", sort=False)["price"]
+    summary = prices.agg(["min", "max", "mean", "last", "count"])
+    summary["previous"] = prices.nth(-2).set_axis(df["product_id"][prices.nth(-2).index]).reindex(summary.index)
+    recent = df[df["ts"] > df["ts"].max().floor("D") - pd.Timedelta(days=window - 1)]
+    summary = summary.join(recent.groupby("product_id")["price"].agg(["min", "max", "mean"]), rsuffix="_window")
+    summary["change_pct"] = (summary["last"] - summary["previous"]) / summary["previous"] * 100
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trend update cost per day of data: incremental vs full recompute")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=25)
+    parser.add_argument("--scrapes-per-day", type=int, default=4)
+    parser.add_argument("--window", type=int, default=trends.WINDOW_DAYS)
+    parser.add_argument("--recompute-days", type=int, nargs="+", default=[1, 5, 10, 25],
+                        help="days after which to also time a full recompute")
+    args = parser.parse_args()
+
+    engine = trends.TrendEngine(None, window=args.window)
+    history, day_tables, rows = [], [], 0
+    print(f"{'day':>4} {'history rows':>13} {'new rows':>9} {'incremental s':>14} {'full recompute s':>17}")
+    for i, (ts, table) in enumerate(synthetic_scrapes(args.products, args.days, args.scrapes_per_day)):
+        day_tables.append(table.select(["product_id", "ts", "price", "name"]))
+        if (i + 1) % args.scrapes_per_day:
+            continue
+        day = (i + 1) // args.scrapes_per_day
+        batch = pa.concat_tables(day_tables)
+        started = time.perf_counter()
+        engine.update(batch)
+        incremental = time.perf_counter() - started
+        rows += batch.num_rows
+        history.append(batch.select(["product_id", "ts", "price"]))
+        day_tables = []
+
+        full = ""
+        if day in args.recompute_days:
+            started = time.perf_counter()
+            full_recompute(pa.concat_tables(history), args.window)
+            full = f"{time.perf_counter() - started:.2f}"
+        print(f"{day:>4} {rows:>13,} {batch.num_rows:>9,} {incremental:>14.3f} {full:>17}")
+
+    started = time.perf_counter()
+    summary = engine.summary()
+    print(f"\nsummary of {len(summary):,} products: {time.perf_counter() - started:.3f}s")
+    for label, query in (("drops >= 5%", lambda: engine.drops(5)), ("all-time lows", engine.all_time_lows)):
+        started = time.perf_counter()
+        result = query()
+        print(f"{label}: {len(result):,} products in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        engine.path = state_path(workdir, trends.TRENDS_FILE)
+        started = time.perf_counter()
+        engine.save()
+        saved = time.perf_counter() - started
+        started = time.perf_counter()
+        trends.TrendEngine(engine.path)
+        print(f"state: save {saved:.2f}s, load {time.perf_counter() - started:.2f}s, "
+              f"{os.path.getsize(engine.path) / 1024 / 1024:.1f} MiB")
@@ -0,0 +1,76 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import value_score
+from benchmarks.bench_query import catalogue
+from benchmarks.synthetic import BRANDS
+from value_score import ValueScorer
+
+
+def products(rows, seed=0):
+    # bench_query's catalogue plus the Brand and Product ID columns of the dashboard artifact
+    rng = np.random.default_rng(seed)
+    df = catalogue(rows, seed)
+    weights = 1.0 / np.arange(1, len(BRANDS) + 1) ** 1.1
+    df["Brand"] = pd.Categorical.from_codes(rng.choice(len(BRANDS), rows, p=weights / weights.sum()), BRANDS)
+    df["Product ID"] = pd.Series(np.arange(rows)).map("{:012x}".format)
+    return df
+
+
+def reprice(df, rows, rng):
+    # The same listings with new prices on some rows, as after a re-scrape
+    changed = df.copy()
+    price = changed["Price"].to_numpy().copy()
+    price[rows] = (price[rows] * rng.uniform(0.7, 1.1, len(rows))).round()
+    changed["Price"] = price
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Value scores: full vectorized pass vs incremental sync after "
+                                                 "a partial re-scrape")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        rng = np.random.default_rng(args.seed)
+        df = products(rows, args.seed)
+        brand = df["Brand"].astype(str).to_numpy()
+        small_brand = df["Brand"].value_counts().index[len(BRANDS) // 2]
+        changes = {
+            "nothing changed": np.empty(0, dtype=np.int64),
+            "0.1% of rows, any brand": rng.choice(rows, rows // 1000, replace=False),
+            f"one brand ({small_brand})": np.flatnonzero(brand == small_brand),
+            "one product per brand": np.unique(brand, return_index=True)[1],
+        }
+
+        started = time.perf_counter()
+        full = value_score.scores(df)
+        full_s = time.perf_counter() - started
+        print(f"\n{rows:,} products: full pass {full_s:.2f}s ({rows / full_s:,.0f} products/s)")
+
+        scorer = ValueScorer()
+        started = time.perf_counter()
+        assert np.allclose(scorer.sync(df), full, equal_nan=True)
+        print(f"first sync (full pass + listing keys) {time.perf_counter() - started:.2f}s")
+
+        print(f"{'change':>28} {'rows':>10} {'rescored':>10} {'sync s':>8} {'full s':>8} {'speedup':>8}")
+        for name, changed_rows in changes.items():
+            changed = reprice(df, changed_rows, rng)
+            started = time.perf_counter()
+            full = value_score.scores(changed)
+            full_s = time.perf_counter() - started
+
+            scorer = ValueScorer()
+            scorer.sync(df)
+            rescored = scorer.totals["rescored"]
+            started = time.perf_counter()
+            incremental = scorer.sync(changed)
+            sync_s = time.perf_counter() - started
+            assert np.allclose(incremental, full, equal_nan=True), name
+            print(f"{name:>28} {len(changed_rows):>10,} {scorer.totals['rescored'] - rescored:>10,} "
+                  f"{sync_s:>8.2f} {full_s:>8.2f} {full_s / sync_s:>7.1f}x")
@@ -0,0 +1,119 @@
+import argparse
+import glob
+import hashlib
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_pages(fixture_dir=FIXTURE_DIR):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "search_page_*.html"))):
+        with open(path, "rb") as file:
+            pages.append(file.read())
+    if not pages:
+        raise FileNotFoundError(f"No search_page_*.html fixtures in {fixture_dir}")
+    return pages
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between pages
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits += 1
+
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            self._send(503, b"Service Unavailable", {"Retry-After": "0"})
+            return
+
+        parts = urlsplit(self.path)
+        if parts.path != "/search":
+            self._send(404, b"Not Found")
+            return
+
+        params = parse_qs(parts.query)
+        page = int(params.get("page", ["1"])[0])
+        body = server.pages[(page - 1) % len(server.pages)]
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+
+        if server.validators:
+            # Validators change only when the page body does
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            headers["ETag"] = etag
+            headers["Last-Modified"] = server.last_modified
+            if self.headers.get("If-None-Match") == etag:
+                with server.lock:
+                    server.not_modified += 1
+                self._send(304, b"", {"ETag": etag})
+                return
+
+        self._send(200, body, headers)
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pages, latency=0.0, error_rate=0.0, validators=False, handler=FixtureHandler):
+        super().__init__(address, handler)
+        self.pages = pages
+        self.latency = latency
+        self.error_rate = error_rate
+        self.validators = validators
+        self.last_modified = formatdate(usegmt=True)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.not_modified = 0
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/search"
+
+
+@contextmanager
+def serve(latency=0.0, error_rate=0.0, validators=False, fixture_dir=FIXTURE_DIR, handler=FixtureHandler):
+    # Serve the saved pages on a free localhost port for the duration of the block
+    server = FixtureServer(("127.0.0.1", 0), load_pages(fixture_dir), latency, error_rate, validators, handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve saved Flipkart search pages on localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--validators", action="store_true", help="send ETag/Last-Modified and answer 304s")
+    args = parser.parse_args()
+
+    server = FixtureServer(("127.0.0.1", args.port), load_pages(), args.latency, args.error_rate, args.validators)
+    print(f"Serving fixtures at {server.base_url}")
+    server.serve_forever()
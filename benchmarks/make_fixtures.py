@@ -0,0 +1,110 @@
+import argparse
+import csv
+import hashlib
+import html
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Markup mirrors the Flipkart search layout that task1.py and task3.py select on
+CARD = """<div class="_75nlfW"><div data-id="{pid}" style="width:25%"><div class="_1sdMkc LFEi7Z">
+<a class="wjcEIp" target="_blank" rel="noopener noreferrer" href="/p/itm{pid_lower}?pid={pid}&amp;lid=LST{pid}&amp;marketplace=FLIPKART">
+<div class="_4WELSP"><img loading="eager" class="DByuf4" alt="{name}" src="https://rukminim2.flixcart.com/image/200/200/{pid_lower}.jpeg?q=70"></div></a>
+<a class="IxWX8O" title="{name}" href="/p/itm{pid_lower}?pid={pid}">{name}</a>
+<div class="NqpwHC">Black, Blue</div>
+{rating}<a class="bHVgvr" href="/p/itm{pid_lower}?pid={pid}"><div class="hl05eU"><div class="hZ3P6w">{price}</div>
+<div class="kRYCnD">{mrp}</div><div class="UkUFwK"><span>{discount}% off</span></div></div></a>
+<div class="yiggsN O5Fpg8">Free delivery</div></div></div></div>
+"""
+
+RATING = """<span class="Y1HWO0" id="productRating_LSTACC{pid}"><div class="XQDdHH MKiFS6">{rating}<img src="data:image/svg+xml;base64,PHN2Zz48L3N2Zz4=" class="Rza2QY"></div></span>
+<span class="Wphh3N">({reviews})</span>
+"""
+
+PAGE = """<!doctype html><html lang="en"><head><meta charset="utf-8">
+<title>Wireless Earbuds - Buy Products Online at Best Price in India - All Categories | Flipkart.com</title>
+<link rel="stylesheet" href="https://static-assets-web.flixcart.com/fk-p-linchpin-web/fk-cp-zion/css/app_modules.chunk.css">
+<style>{style}</style>
+<script>window.__INITIAL_STATE__ = {state};</script>
+</head><body><div id="container"><div class="_1TmfNK">
+<header class="_3ZqtNW"><a href="/"><img src="https://static-assets-web.flixcart.com/logo.svg" alt="Flipkart"></a>
+<form action="/search" method="GET"><input name="q" value="{query}" autocomplete="off"></form></header>
+<div class="DOjaWF gdgoEp"><div class="DOjaWF YJG4Cf"><section class="filters">{filters}</section></div>
+<div class="DOjaWF gdgoEp"><div class="cPHDOP col-12-12"><span class="BUOuZu">Showing {first} – {last} of 1,21,345 results for "{query}"</span></div>
+{cards}
+<nav class="WSL9JP">{pagination}</nav>
+</div></div></div>
+<footer class="_2Brcj4">{footer}</footer>
+<script src="https://static-assets-web.flixcart.com/fk-p-linchpin-web/fk-cp-zion/js/runtime.js"></script>
+</body></html>
+"""
+
+
+def load_rows(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        return list(csv.DictReader(file))
+
+
+def render_card(row, rng):
+    pid = hashlib.md5(row["Product Name"].encode("utf-8")).hexdigest()[:16].upper()
+    price = int(row["Price"].replace("₹", "").replace(",", ""))
+    discount = rng.randint(40, 85)
+    mrp = int(price * 100 / (100 - discount))
+    rating = ""
+    if row["Rating"] not in ("", "N/A"):
+        rating = RATING.format(pid=pid, rating=row["Rating"], reviews=f"{rng.randint(10, 90000):,}")
+    return CARD.format(
+        pid=pid,
+        pid_lower=pid.lower(),
+        name=html.escape(row["Product Name"]),
+        price=f"₹{price:,}",
+        mrp=f"₹{mrp:,}",
+        discount=discount,
+        rating=rating,
+    )
+
+
+def render_page(rows, page, query, rng):
+    # Inline state and styles pad the page towards the size of a real search result page
+    state = "{" + ",".join(f'"k{i}":"{rng.getrandbits(64):016x}"' for i in range(6000)) + "}"
+    style = "".join(f".c{i:04x}{{margin:{i % 17}px;padding:{i % 5}px}}" for i in range(3000))
+    filters = "".join(f'<div class="ewzVkT"><input type="checkbox"><label>Filter {i}</label></div>' for i in range(150))
+    footer = "".join(f'<a href="/help/{i}">Help topic {i}</a>' for i in range(200))
+    pagination = "".join(f'<a class="cn++Ap" href="/search?q={query}&amp;page={i}">{i}</a>' for i in range(1, 11))
+    return PAGE.format(
+        style=style,
+        state=state,
+        query=html.escape(query),
+        filters=filters,
+        first=(page - 1) * len(rows) + 1,
+        last=page * len(rows),
+        cards="".join(render_card(row, rng) for row in rows),
+        pagination=pagination,
+        footer=footer,
+    )
+
+
+def write_fixtures(source, pages, per_page, out_dir=FIXTURE_DIR, query="wireless earbuds", seed=0):
+    rng = random.Random(seed)
+    rows = load_rows(source)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for page in range(1, pages + 1):
+        page_rows = [rows[(page * 7 + i) % len(rows)] for i in range(per_page)]
+        path = os.path.join(out_dir, f"search_page_{page}.html")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(render_page(page_rows, page, query, rng))
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the saved Flipkart search page fixtures")
+    parser.add_argument("--source", default="ecommerce_data.csv")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--per-page", type=int, default=40)
+    args = parser.parse_args()
+
+    for path in write_fixtures(args.source, args.pages, args.per_page):
+        print("Wrote", path, os.path.getsize(path), "bytes")
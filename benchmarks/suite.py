@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import aggregates
+import charts
+import cleaned_data
+import parsers
+from benchmarks.bench_parsers import load_corpus
+from benchmarks.bench_query import BUDGET_QUERIES, TOP_N
+from benchmarks.bench_startup import TARGETS, measure
+from benchmarks.fixture_server import FIXTURE_DIR, serve
+from benchmarks.synthetic import cached_cleaned_csv, cached_raw_csv
+from cleaning import clean_csv
+from product_index import ProductIndex
+from scraper import Crawler
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# A timing more than this fraction slower than the baseline counts as a regression
+THRESHOLD = 0.10
+
+# Timings this small are mostly noise and never flagged
+MIN_SECONDS = 0.005
+
+
+def best_of(repeat, fn, *args):
+    # Fastest of a few runs, and the last result
+    best, result = np.inf, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+# ==================== SCENARIOS ====================
+# Each takes (rows, workdir, repeat) and returns {metric: value}; metrics ending in _s are timings
+
+def scenario_clean(rows, workdir, repeat):
+    src = cached_raw_csv(rows)
+    seconds, stats = best_of(repeat, clean_csv, src, os.path.join(workdir, "cleaned.csv"))
+    return {"clean_s": seconds, "rows_per_s": rows / seconds, "rows_out": stats["rows_out"]}
+
+
+def _artifact(rows, workdir):
+    # Dashboard artifact for a synthetic cleaned CSV, built once per size
+    src = cached_cleaned_csv(rows)
+    path = os.path.join(workdir, f"cleaned_{rows}.arrow")
+    if not os.path.exists(path):
+        cleaned_data.write_artifact(src, path)
+    return src, path
+
+
+def scenario_load(rows, workdir, repeat):
+    src = cached_cleaned_csv(rows)
+    path = os.path.join(workdir, "load.arrow")
+    build, _ = best_of(1, cleaned_data.write_artifact, src, path)
+    load, df = best_of(repeat, lambda: cleaned_data.to_frame(cleaned_data.open_artifact(path)))
+    return {"build_artifact_s": build, "load_s": load, "products": len(df)}
+
+
+def scenario_aggregate(rows, workdir, repeat):
+    _, path = _artifact(rows, workdir)
+    df = cleaned_data.to_frame(cleaned_data.open_artifact(path))
+    results = {}
+    for name, page in aggregates.PAGES.items():
+        results[f"{name}_s"], _ = best_of(repeat, page, df)
+    results["all_pages_s"] = sum(results.values())
+    return results
+
+
+def scenario_filter(rows, workdir, repeat):
+    _, path = _artifact(rows, workdir)
+    df = cleaned_data.to_frame(cleaned_data.open_artifact(path))
+    build, index = best_of(1, ProductIndex, df)
+    budget = sum(best_of(repeat, index.best_budget, max_price, min_rating)[0]
+                 for max_price, min_rating in BUDGET_QUERIES)
+    top = sum(best_of(repeat, index.top_rated, n)[0] for n in TOP_N)
+    return {"index_build_s": build, "best_budget_s": budget, "top_rated_s": top}
+
+
+def scenario_chart(rows, workdir, repeat):
+    # Every chart drawn from scratch (no ChartCache), the cost of a cold dashboard
+    _, path = _artifact(rows, workdir)
+    df = cleaned_data.to_frame(cleaned_data.open_artifact(path))
+    pages = aggregates.compute(df)
+    price, rating = df["Price"].to_numpy(), df["Rating"].to_numpy()
+    figures = {
+        "price_histogram": (charts.histogram, *pages["price"]["histogram"], "#667eea", "Price (₹)", "Price"),
+        "price_boxplot": (charts.price_boxplot, pages["price"]["box"]),
+        "scatter": (charts.price_rating_scatter, price, rating),
+        "brand_bars": (charts.brand_count_bars, pages["brand"]["count"]),
+    }
+    results = {}
+    for name, (draw, *args) in figures.items():
+        results[f"{name}_s"], _ = best_of(repeat, lambda: charts.render(draw(*args)))
+    return results
+
+
+def scenario_parse(rows, workdir, repeat):
+    corpus = load_corpus(FIXTURE_DIR)
+    results = {}
+    for backend in parsers.BACKENDS:
+        parse = parsers.get_parser(backend)
+        seconds, _ = best_of(repeat, lambda: [parse(page) for page in corpus])
+        results[f"{backend}_page_s"] = seconds / len(corpus)
+    return results
+
+
+def scenario_scrape(rows, workdir, repeat, pages=30):
+    with serve(latency=0.02) as server:
+        def crawl():
+            crawler = Crawler(workers=8, base_url=server.base_url)
+            products = sum(len(result.products) for result in crawler.crawl(["earbuds"], pages))
+            crawler.close()
+            return products
+        seconds, products = best_of(repeat, crawl)
+    return {"crawl_s": seconds, "pages_per_s": pages / seconds, "products": products}
+
+
+def scenario_startup(rows, workdir, repeat):
+    # Cold start of the dashboard's imports and the CLI entry points, each in a fresh interpreter
+    results = {}
+    for name, argv in TARGETS.items():
+        metrics = measure(argv, repeat)
+        results[f"{name}_s"], results[f"{name}_imports_s"] = metrics["wall_s"], metrics["imports_s"]
+    return results
+
+
+# name -> (run, sized); unsized scenarios run once (on the saved HTML fixtures, or in fresh
+# interpreters for startup) instead of per catalogue size
+SCENARIOS = {
+    "clean": (scenario_clean, True),
+    "load": (scenario_load, True),
+    "aggregate": (scenario_aggregate, True),
+    "filter": (scenario_filter, True),
+    "chart": (scenario_chart, True),
+    "parse": (scenario_parse, False),
+    "scrape": (scenario_scrape, False),
+    "startup": (scenario_startup, False),
+}
+
+
+# ==================== RESULTS ====================
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        commit = None
+    return {"time": datetime.now(timezone.utc).isoformat(timespec="seconds"), "commit": commit or None,
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    # Timings that got slower than the baseline by more than threshold: (scenario, rows, metric, old, new)
+    old = {(r["scenario"], r["rows"], r["metric"]): r["value"] for r in baseline["results"]}
+    slower = []
+    for r in results:
+        key = (r["scenario"], r["rows"], r["metric"])
+        if not r["metric"].endswith("_s") or key not in old:
+            continue
+        if r["value"] > max(old[key], MIN_SECONDS) * (1 + threshold):
+            slower.append((*key, old[key], r["value"]))
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Standard benchmark scenarios on synthetic catalogues, "
+                                                 "saved for regression comparison")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000],
+                        help="catalogue sizes (10k to 100M; generated files are cached in benchmarks/.data)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="results file (defaults to benchmarks/results/<time>.json)")
+    parser.add_argument("--baseline", default=None, help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    meta = {**environment(), "repeat": args.repeat}
+    results = []
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    try:
+        for name in args.scenarios:
+            run, sized = SCENARIOS[name]
+            for rows in (args.rows if sized else [None]):
+                started = time.perf_counter()
+                metrics = run(rows, workdir, args.repeat)
+                results.extend({"scenario": name, "rows": rows, "metric": metric, "value": float(value)}
+                               for metric, value in metrics.items())
+                shown = ", ".join(f"{metric} {value:.4g}" for metric, value in metrics.items())
+                print(f"{name:>10} {'' if rows is None else f'{rows:,}':>12}  {shown}  "
+                      f"({time.perf_counter() - started:.1f}s)")
+    finally:
+        shutil.rmtree(workdir)
+
+    out = args.out or os.path.join(RESULTS_DIR, meta["time"].replace(":", "") + ".json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as file:
+        json.dump({"meta": meta, "results": results}, file, indent=1)
+    print(f"\n✅ Results saved to {out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        slower = compare(results, baseline, args.threshold)
+        print(f"Compared with {args.baseline} (commit {baseline['meta'].get('commit')}):")
+        for scenario, rows, metric, old, new in slower:
+            print(f"  ⚠️ {scenario} {rows or ''} {metric}: {old:.4f}s -> {new:.4f}s ({(new / max(old, 1e-9) - 1) * 100:+.0f}%)")
+        if slower:
+            sys.exit(1)
+        print(f"  no timing more than {args.threshold:.0%} slower")
@@ -0,0 +1,124 @@
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+# Brand names as they appear in scraped titles, including inconsistent casing
+BRANDS = [
+    "boAt", "realme", "Realme", "OnePlus", "TRIGGR", "PTron", "pTron", "BeastBass", "Caidea", "GOBOULT",
+    "Boult", "Noise", "NOISE", "JBL", "Sony", "SAMSUNG", "Samsung", "Mivi", "Aroma", "TECHFIRE",
+    "BULLSTORM", "Sagaft", "3BAAN", "allons", "RAJIBNEW", "Oppo", "OPPO", "Nothing", "CMF", "Redmi",
+    "Xiaomi", "Apple", "Marshall", "Skullcandy", "Zebronics", "ZEBRONICS", "Ambrane", "Portronics", "Fire-Boltt", "Truke",
+]
+MODELS = ["Airdopes", "Buds", "Nord Buds", "Kraken", "Bassbuds", "Pods", "Elite", "Vibe", "Alpha", "Air", "Pro", "Lite", "Max"]
+FEATURES = [
+    "with 13mm Drivers", "40ms Latency", "ENC", "Quad Mic ENC", "60H Battery", "Fast Charging", "Dual Pairing",
+    "IP55", "BT5.4", "v5.3", "Deep Bass", "Type C", "RGB Gaming", "ANC", "Rubber Finish", "3D Audio",
+]
+SUFFIXES = ["Bluetooth", "Bluetooth Gaming", "Bluetooth Bluetooth", "True Wireless"]
+
+
+def make_titles(count, rng):
+    # Zipf-skewed brands, a model family, a number and a few features, like Flipkart titles
+    brand_weights = 1.0 / np.arange(1, len(BRANDS) + 1) ** 1.1
+    brands = rng.choice(BRANDS, count, p=brand_weights / brand_weights.sum())
+    models = rng.choice(MODELS, count)
+    numbers = rng.integers(1, 999, count).astype(str)
+    features = [", ".join(rng.choice(FEATURES, 3, replace=False)) for _ in range(min(count, 4096))]
+    feature_idx = rng.integers(0, len(features), count)
+    suffixes = rng.choice(SUFFIXES, count)
+    return np.array([
+        f"{b} {m} {n} {features[f]} {s}"
+        for b, m, n, f, s in zip(brands, models, numbers, feature_idx, suffixes)
+    ], dtype=object)
+
+
+def make_chunk(rows, titles, rng, na_rating=0.12, na_price=0.01):
+    # Titles are drawn with replacement, so popular products repeat like relisted SKUs
+    idx = np.minimum(rng.zipf(1.3, rows) - 1, len(titles) - 1)
+    idx = (idx + rng.integers(0, len(titles), rows) * (rng.random(rows) < 0.7)) % len(titles)
+
+    price = (np.round(rng.lognormal(6.8, 0.55, rows) / 10) * 10 - 1).clip(99, 99_999).astype(np.int64)
+    # Format each distinct price once, Flipkart-style (₹1,299)
+    values, inverse = np.unique(price, return_inverse=True)
+    price_text = np.array([f"₹{p:,}" for p in values], dtype=object)[inverse]
+    price_text[rng.random(rows) < na_price] = "N/A"
+
+    rating = np.round(np.clip(rng.normal(4.0, 0.35, rows), 1.0, 5.0), 1)
+    values, inverse = np.unique(rating, return_inverse=True)
+    rating_text = np.array([f"{r:g}" for r in values], dtype=object)[inverse]
+    rating_text[rng.random(rows) < na_rating] = "N/A"
+
+    return pd.DataFrame({"Product Name": titles[idx], "Price": price_text, "Rating": rating_text})
+
+
+def write_raw_csv(path, rows, unique_ratio=0.3, chunksize=1_000_000, seed=0):
+    # Writes a task3.py-style CSV chunk by chunk so memory stays flat at any row count
+    rng = np.random.default_rng(seed)
+    titles = make_titles(max(1, min(int(rows * unique_ratio), 5_000_000)), rng)
+    schema = pa.schema([("Product Name", pa.string()), ("Price", pa.string()), ("Rating", pa.string())])
+    written = 0
+    with pa_csv.CSVWriter(path, schema) as writer:
+        while written < rows:
+            n = min(chunksize, rows - written)
+            writer.write_table(pa.Table.from_pandas(make_chunk(n, titles, rng), schema=schema, preserve_index=False))
+            written += n
+    return path
+
+
+def rating_counts(rows, rng, mean=4.0, sd=0.35):
+    # Rows per rating (1.0-5.0 in 0.1 steps) for round(clip(normal(mean, sd), 1, 5), 1), drawn at once
+    # so a rating-sorted file can be written bucket by bucket
+    ratings = np.round(np.arange(10, 51) / 10, 1)
+    edges = np.concatenate([[-np.inf], ratings[:-1] + 0.05, [np.inf]])
+    cdf = 0.5 * (1 + np.array([math.erf((edge - mean) / (sd * math.sqrt(2))) for edge in edges]))
+    return ratings, rng.multinomial(rows, np.diff(cdf))
+
+
+def write_cleaned_csv(path, rows, chunksize=1_000_000, seed=0):
+    # A task4.py-style output (numeric Price/Rating, rating-sorted) for dashboard-side benchmarks.
+    # Written one rating bucket at a time, highest first, in chunks, so memory stays flat at any row count
+    rng = np.random.default_rng(seed)
+    ratings, counts = rating_counts(rows, rng)
+    schema = pa.schema([("Product Name", pa.string()), ("Price", pa.float64()), ("Rating", pa.float64())])
+    with pa_csv.CSVWriter(path, schema) as writer:
+        for rating, count in zip(ratings[::-1], counts[::-1]):
+            for start in range(0, count, chunksize):
+                n = min(chunksize, count - start)
+                price = (np.round(rng.lognormal(6.8, 0.55, n) / 10) * 10 - 1).clip(99, 99_999)
+                writer.write_table(pa.table([make_titles(n, rng), price, np.full(n, rating)], schema=schema))
+    return path
+
+
+def _cached(kind, write, rows, directory, seed):
+    # Reuse a generated file between benchmark runs; generating 50M rows takes a while
+    directory = directory or os.path.join(os.path.dirname(__file__), ".data")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{kind}_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        write(path + ".tmp", rows, seed=seed)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def cached_raw_csv(rows, directory=None, seed=0):
+    return _cached("raw", write_raw_csv, rows, directory, seed)
+
+
+def cached_cleaned_csv(rows, directory=None, seed=0):
+    return _cached("cleaned", write_cleaned_csv, rows, directory, seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic task3.py-style catalogue CSV")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("--out", default="synthetic_ecommerce_data.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_raw_csv(args.out, args.rows, seed=args.seed)
+    print(f"✅ Wrote {args.rows:,} rows to {args.out}")
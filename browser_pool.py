@@ -0,0 +1,209 @@
+import queue
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import instrument
+
+
+def chrome_options(headless=True):
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-extensions")
+    # Product images are never read, so skip downloading them
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    options.page_load_strategy = "eager"
+    return options
+
+
+def make_driver(headless=True):
+    return webdriver.Chrome(options=chrome_options(headless))
+
+
+def open_search_page(driver, url, wait_xpath="//div[@data-id]", timeout=15):
+    driver.get(url)
+
+    # Wait for product cards
+    WebDriverWait(driver, timeout).until(EC.presence_of_all_elements_located((By.XPATH, wait_xpath)))
+
+    # Close login popup if one was shown, without waiting for it
+    for close_btn in driver.find_elements(By.XPATH, "//button[contains(text(),'✕')]"):
+        try:
+            close_btn.click()
+        except WebDriverException:
+            pass
+        break
+    return driver
+
+
+class BrowserSession:
+    # A warm driver plus the bookkeeping used to decide when to recycle it
+
+    def __init__(self, session_id, factory):
+        self.session_id = session_id
+        self.driver = factory()
+        self.started = time.monotonic()
+        self.pages = 0
+        self.latencies = []
+
+    def heap_bytes(self):
+        try:
+            return self.driver.execute_script(
+                "return performance.memory ? performance.memory.usedJSHeapSize : 0;"
+            ) or 0
+        except WebDriverException:
+            return 0
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            pass
+
+
+class BrowserPool:
+    def __init__(self, size=4, max_pages=50, max_heap_mb=512, headless=True, factory=None):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_heap_bytes = max_heap_mb * 1024 * 1024 if max_heap_mb else None
+        self.factory = factory or (lambda: make_driver(headless))
+
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._created = 0
+        self._closed = False
+        self.recycled = 0
+        self.retired = []
+
+    def _new_session(self):
+        with self._lock:
+            self._next_id += 1
+            session_id = self._next_id
+        return BrowserSession(session_id, self.factory)
+
+    def warm_up(self):
+        # Start every browser up front so the first pages don't pay startup
+        with ThreadPoolExecutor(max_workers=self.size) as pool:
+            sessions = list(pool.map(lambda _: self._new_session(), range(self.size - self._created)))
+        with self._lock:
+            self._created += len(sessions)
+        for session in sessions:
+            self._idle.put(session)
+        return self
+
+    def _acquire(self, timeout=None):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            return self._replace()
+        return self._idle.get(timeout=timeout)
+
+    def _replace(self):
+        # Start a browser for a slot already counted in _created, giving the slot back on failure
+        try:
+            return self._new_session()
+        except WebDriverException:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _needs_recycle(self, session):
+        if self.max_pages and session.pages >= self.max_pages:
+            return True
+        if self.max_heap_bytes and session.heap_bytes() > self.max_heap_bytes:
+            return True
+        return False
+
+    def _release(self, session, broken=False):
+        if self._closed or broken or self._needs_recycle(session):
+            self._retire(session)
+            if self._closed:
+                return
+            self.recycled += 1
+            session = self._replace()
+        self._idle.put(session)
+
+    def _retire(self, session):
+        self.retired.append(self._session_stats(session))
+        session.quit()
+
+    @contextmanager
+    def session(self, timeout=None):
+        session = self._acquire(timeout)
+        broken = False
+        try:
+            yield session
+        except WebDriverException:
+            # A crashed or hung browser is replaced rather than handed out again
+            broken = True
+            raise
+        finally:
+            self._release(session, broken)
+
+    def fetch(self, url, handler, timeout=None):
+        # Load url on a pooled browser and run handler(driver) on the page
+        with self.session(timeout) as session:
+            started = time.perf_counter()
+            with instrument.timer("browser.load"):
+                open_search_page(session.driver, url)
+            with instrument.timer("browser.extract"):
+                result = handler(session.driver)
+            session.latencies.append(time.perf_counter() - started)
+            session.pages += 1
+            return result
+
+    def map(self, urls, handler):
+        # Scrape urls in parallel, one worker thread per browser
+        with ThreadPoolExecutor(max_workers=self.size) as pool:
+            yield from pool.map(lambda url: self.fetch(url, handler), urls)
+
+    def _session_stats(self, session):
+        latencies = session.latencies
+        return {
+            "session": session.session_id,
+            "pages": session.pages,
+            "uptime": time.monotonic() - session.started,
+            "mean_latency": statistics.fmean(latencies) if latencies else 0.0,
+            "max_latency": max(latencies) if latencies else 0.0,
+        }
+
+    def stats(self):
+        idle = list(self._idle.queue)
+        return {
+            "recycled": self.recycled,
+            "sessions": [self._session_stats(s) for s in idle] + self.retired,
+        }
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._retire(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,196 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+import cleaned_data
+from cleaning import clean_csv
+from entity_resolution import ENTITY_INDEX, EntityIndex
+from lazy import lazy_import
+
+pa = lazy_import("pyarrow")
+ds = lazy_import("pyarrow.dataset")
+pq = lazy_import("pyarrow.parquet")
+
+CATALOGUE_DIR = "catalogue"
+DEFAULT_SITE = "flipkart"
+
+# One file per shard, replaced as a whole when its category is published again
+SHARD_FILE = "part-0.parquet"
+
+# Shards are rating-sorted, so small row groups keep Rating min/max statistics selective for pushdown
+ROW_GROUP_SIZE = 64 * 1024
+
+# Underscore prefix keeps these out of the dataset scans: one entity index for every shard, so the same
+# product gets the same ID in every category, and per-shard page summaries and value scores next to their data
+SHARED_INDEX = "_" + ENTITY_INDEX
+SUMMARIES_FILE = "_aggregates.pkl"
+SCORES_FILE = "_value_scores.parquet"
+
+@functools.cache
+def partitioning():
+    # site=<site>/category=<slug>/ directories, built on first use like the other Arrow schemas
+    return ds.partitioning(pa.schema([("site", pa.string()), ("category", pa.string())]), flavor="hive")
+
+
+def slug(name):
+    # "Wireless Earbuds" -> "wireless_earbuds", safe as a directory name
+    return re.sub(r"[^0-9a-z]+", "_", name.lower()).strip("_") or "uncategorised"
+
+
+class Catalogue:
+    # Cleaned products sharded by site and category (root/site=<site>/category=<category>/), so a
+    # reader opens only the shards it selects and can push price/rating predicates down to row groups
+
+    def __init__(self, root=CATALOGUE_DIR):
+        self.root = root
+        self._dataset = None
+
+    def shard_dir(self, site, category):
+        return os.path.join(self.root, f"site={site}", f"category={slug(category)}")
+
+    def shards(self):
+        # [(site, category)] from the directory names alone; no data file is opened
+        found = []
+        if not os.path.isdir(self.root):
+            return found
+        for site_dir in sorted(os.listdir(self.root)):
+            if not site_dir.startswith("site="):
+                continue
+            for category_dir in sorted(os.listdir(os.path.join(self.root, site_dir))):
+                if category_dir.startswith("category=") and os.path.exists(
+                        os.path.join(self.root, site_dir, category_dir, SHARD_FILE)):
+                    found.append((site_dir[len("site="):], category_dir[len("category="):]))
+        return found
+
+    def __len__(self):
+        return len(self.shards())
+
+    # ==================== WRITING ====================
+
+    def write(self, table, site, category, src=None):
+        # Replaces one shard with a dashboard table (cleaned_data.artifact_schema())
+        directory = self.shard_dir(site, category)
+        os.makedirs(directory, exist_ok=True)
+        if src is not None:
+            table = table.replace_schema_metadata({"fingerprint": json.dumps(cleaned_data.source_fingerprint(src))})
+        tmp_path = os.path.join(directory, "." + SHARD_FILE)
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp_path, os.path.join(directory, SHARD_FILE))
+        self._dataset = None
+        return table.num_rows
+
+    def publish(self, cleaned_csv, site, category):
+        # Cleaned CSV -> shard, with Brand and Product ID from the shared entity index
+        index = EntityIndex(os.path.join(self.root, SHARED_INDEX))
+        os.makedirs(self.root, exist_ok=True)
+        rows = self.write(cleaned_data.build_table(cleaned_data.read_cleaned_csv(cleaned_csv), index),
+                          site, category, cleaned_csv)
+        index.save()
+        return rows
+
+    def is_current(self, site, category, cleaned_csv):
+        path = os.path.join(self.shard_dir(site, category), SHARD_FILE)
+        if not os.path.exists(path):
+            return False
+        metadata = pq.read_schema(path).metadata or {}
+        return json.loads(metadata.get(b"fingerprint", b"{}")) == cleaned_data.source_fingerprint(cleaned_csv)
+
+    # ==================== READING ====================
+
+    def dataset(self):
+        # File discovery is cached until this catalogue writes again
+        if self._dataset is None:
+            self._dataset = ds.dataset(self.root, format="parquet", partitioning=partitioning(),
+                                       ignore_prefixes=[".", "_"])
+        return self._dataset
+
+    def _filter(self, site=None, category=None, max_price=None, min_rating=None):
+        # site/category prune whole directories; price/rating skip row groups by their statistics
+        terms = []
+        for field, value in (("site", site), ("category", category)):
+            if isinstance(value, str):
+                terms.append(ds.field(field) == (slug(value) if field == "category" else value))
+            elif value is not None:
+                terms.append(ds.field(field).isin([slug(v) if field == "category" else v for v in value]))
+        if max_price is not None:
+            terms.append(ds.field("Price") <= max_price)
+        if min_rating is not None:
+            terms.append(ds.field("Rating") >= min_rating)
+
+        expr = None
+        for term in terms:
+            expr = term if expr is None else expr & term
+        return expr
+
+    def scan(self, site=None, category=None, max_price=None, min_rating=None, columns=None):
+        # Arrow table of the selected shards (None = all), only the rows and columns asked for
+        columns = list(columns or cleaned_data.artifact_schema().names)
+        if not self.shards():
+            return cleaned_data.artifact_schema().empty_table().select(columns)
+        return self.dataset().to_table(columns=columns, filter=self._filter(site, category, max_price, min_rating))
+
+    def load(self, site=None, category=None, **filters):
+        return cleaned_data.to_frame(self.scan(site, category, **filters))
+
+    def version(self, site, category):
+        # Short ID for one shard's current data; costs one stat()
+        st = os.stat(os.path.join(self.shard_dir(site, category), SHARD_FILE))
+        fingerprint = [self.shard_dir(site, category), st.st_size, st.st_mtime_ns]
+        return hashlib.sha1(json.dumps(fingerprint).encode("utf-8")).hexdigest()[:12]
+
+    def summaries_path(self, site, category):
+        return os.path.join(self.shard_dir(site, category), SUMMARIES_FILE)
+
+    def scores_path(self, site, category):
+        return os.path.join(self.shard_dir(site, category), SCORES_FILE)
+
+
+def publish_raw(raw_csv, site, category, root=CATALOGUE_DIR):
+    # A raw task3.py/scraper.py CSV -> cleaned -> shard
+    with tempfile.TemporaryDirectory(prefix="catalogue_") as tmp:
+        cleaned = os.path.join(tmp, "cleaned.csv")
+        stats = clean_csv(raw_csv, cleaned)
+        stats["rows_published"] = Catalogue(root).publish(cleaned, site, category)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Category-sharded catalogue of cleaned products")
+    parser.add_argument("--root", default=CATALOGUE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish = commands.add_parser("publish", help="clean a raw CSV into the shard of its category")
+    publish.add_argument("raw")
+    publish.add_argument("--category", required=True)
+    publish.add_argument("--site", default=DEFAULT_SITE)
+
+    commands.add_parser("list", help="shards and their sizes")
+
+    query = commands.add_parser("query", help="products of some shards, filtered at scan time")
+    query.add_argument("--site", default=None)
+    query.add_argument("--category", nargs="+", default=None)
+    query.add_argument("--max-price", type=float, default=None)
+    query.add_argument("--min-rating", type=float, default=None)
+    query.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    catalogue = Catalogue(args.root)
+    if args.command == "publish":
+        stats = publish_raw(args.raw, args.site, args.category, args.root)
+        print(f"✅ {stats['rows_in']:,} raw rows -> {stats['rows_published']:,} products in "
+              f"{catalogue.shard_dir(args.site, args.category)} ({stats['seconds']:.2f}s cleaning)")
+    elif args.command == "list":
+        for site, category in catalogue.shards():
+            path = os.path.join(catalogue.shard_dir(site, category), SHARD_FILE)
+            print(f"{site:>12} {category:<30} {pq.read_metadata(path).num_rows:>12,} products "
+                  f"{os.path.getsize(path) / 1024 / 1024:>8.1f} MiB")
+    elif args.command == "query":
+        started = time.perf_counter()
+        table = catalogue.scan(args.site, args.category, args.max_price, args.min_rating)
+        print(table.to_pandas().head(args.limit))
+        print(f"✅ {table.num_rows:,} products in {(time.perf_counter() - started) * 1000:.1f}ms")
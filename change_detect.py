@@ -0,0 +1,150 @@
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+
+import alerts
+from history_store import HISTORY_DIR, HistoryStore, state_path, to_observations
+from lazy import lazy_import
+from sketches import SKETCH_DIR, SketchStore
+from trends import TRENDS_FILE, TrendEngine
+
+pd = lazy_import("pandas")
+
+STATE_FILE = "last_state.parquet"
+
+# Fields that define "the same observation"; anything else changing is ignored
+TRACKED = ["name", "price", "rating"]
+
+# An unchanged product is stored again after this long, so gaps in its history mean "not scraped".
+# Anything pd.Timedelta accepts
+HEARTBEAT = "1 day"
+
+
+class ChangeDetector:
+    # Per-product last-known state; only new, changed or heartbeat rows get through
+
+    def __init__(self, state_path=state_path(HISTORY_DIR, STATE_FILE), heartbeat=HEARTBEAT):
+        self.state_path = state_path
+        self.heartbeat = pd.Timedelta(heartbeat)
+        if os.path.exists(state_path):
+            self.state = pd.read_parquet(state_path)
+        else:
+            self.state = pd.DataFrame(
+                {"digest": pd.Series(dtype="uint64"), "last_ts": pd.Series(dtype="datetime64[us, UTC]")},
+                index=pd.Index([], dtype=object, name="product_id"),
+            )
+        self.totals = {"observed": 0, "new": 0, "changed": 0, "heartbeat": 0, "unchanged": 0, "seconds": 0.0}
+
+    def detect(self, observations):
+        started = time.perf_counter()
+
+        # A product listed twice in one scrape counts once (last listing wins)
+        obs = observations.drop_duplicates("product_id", keep="last")
+        digest = pd.util.hash_pandas_object(obs[TRACKED], index=False).to_numpy()
+
+        previous = self.state.reindex(obs["product_id"])
+        prev_digest = previous["digest"].to_numpy()
+        known = previous["digest"].notna().to_numpy()
+
+        is_new = ~known
+        is_changed = known & (prev_digest != digest)
+        since_stored = obs["ts"].reset_index(drop=True) - previous["last_ts"].reset_index(drop=True)
+        is_heartbeat = known & ~is_changed & (since_stored >= self.heartbeat).to_numpy()
+        emit = is_new | is_changed | is_heartbeat
+
+        # Emitted rows become the new last-known state; silent rows leave it untouched
+        emitted = obs[emit]
+        update = pd.DataFrame({"digest": digest[emit].astype("uint64"), "last_ts": emitted["ts"].to_numpy()},
+                              index=pd.Index(emitted["product_id"], name="product_id"))
+        existing = known[emit]
+        self.state.loc[update.index[existing]] = update[existing]
+        self.state = pd.concat([self.state, update[~existing]])
+
+        counts = {
+            "observed": len(observations),
+            "new": int(is_new.sum()),
+            "changed": int(is_changed.sum()),
+            "heartbeat": int(is_heartbeat.sum()),
+            "unchanged": len(observations) - int(emit.sum()),
+            "seconds": time.perf_counter() - started,
+        }
+        for key, value in counts.items():
+            self.totals[key] += value
+        return emitted, counts
+
+    def ingest(self, store, observations):
+        emitted, counts = self.detect(observations)
+        store.append(emitted)
+        self.save()
+        return emitted, counts
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        self.state.to_parquet(tmp_path)
+        os.replace(tmp_path, self.state_path)
+
+    def report(self, counts=None):
+        counts = counts or self.totals
+        stored = counts["observed"] - counts["unchanged"]
+        return {
+            **counts,
+            "stored": stored,
+            "dedup_ratio": counts["observed"] / stored if stored else float("inf"),
+            "rows_per_sec": counts["observed"] / counts["seconds"] if counts["seconds"] else 0.0,
+        }
+
+
+def ingest_scrape(observations, root=HISTORY_DIR, heartbeat=HEARTBEAT, rules=(), sinks=()):
+    # Every step of taking one scrape into the history: new, changed and heartbeat rows are stored,
+    # then folded into the trends and sketches and checked against the watch rules.
+    # -> (stored rows, detector report, alerts fired)
+    detector = ChangeDetector(state_path(root, STATE_FILE), heartbeat)
+    emitted, counts = detector.ingest(HistoryStore(root), observations)
+
+    trends = TrendEngine(state_path(root, TRENDS_FILE))
+    trends.update(emitted)
+    trends.save()
+
+    sketches = SketchStore(state_path(root, SKETCH_DIR))
+    sketches.update(emitted)
+    sketches.save()
+
+    fired = []
+    if rules:
+        evaluator = alerts.AlertEvaluator(rules, sinks, state_path(root, alerts.STATE_FILE))
+        fired = evaluator.evaluate(emitted)
+        evaluator.save()
+    return emitted, detector.report(counts), fired
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append only changed products from a scrape to the price history")
+    parser.add_argument("csv", nargs="?", default="ecommerce_data.csv")
+    parser.add_argument("--root", default=HISTORY_DIR)
+    parser.add_argument("--ts", default=None, help="scrape timestamp (defaults to the file's mtime)")
+    parser.add_argument("--heartbeat-hours", type=float, default=24.0,
+                        help="re-store unchanged products after this long so history shows they are still listed")
+    parser.add_argument("--delta-out", default=None, help="also write the changed raw rows to this CSV")
+    parser.add_argument("--rules", default=alerts.RULES_FILE, help="watch rules to check the stored rows against")
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.csv, dtype=str)
+    ts = args.ts or datetime.fromtimestamp(os.path.getmtime(args.csv), timezone.utc)
+    observations = to_observations(raw, ts)
+
+    rules = alerts.load_rules(args.rules)
+    emitted, report, fired = ingest_scrape(observations, args.root, pd.Timedelta(hours=args.heartbeat_hours),
+                                           rules, [alerts.JsonlSink()])
+    if rules:
+        print(f"🔔 {len(fired)} alerts from {len(rules)} watch rules written to {alerts.ALERTS_FILE}")
+
+    if args.delta_out:
+        # Same rows, original task3.py format, so task4.py can clean just the changes
+        raw.loc[emitted.index].to_csv(args.delta_out, index=False)
+
+    print(f"Observed {report['observed']} rows: {report['new']} new, {report['changed']} changed, "
+          f"{report['heartbeat']} heartbeats, {report['unchanged']} unchanged")
+    print(f"✅ Stored {report['stored']} rows (dedup ratio {report['dedup_ratio']:.1f}x, "
+          f"{report['rows_per_sec']:,.0f} rows/s)")
@@ -0,0 +1,181 @@
+import io
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+plt = lazy_import("matplotlib.pyplot")
+
+# Same output st.pyplot produces by default. pyplot is imported on the first chart actually drawn, so
+# reruns served from the cache (and pages without charts) never pay for importing it
+SAVEFIG = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+
+# Rendered PNGs kept per process; a few hundred KB each
+CACHE_ENTRIES = 128
+CACHE_BYTES = 64 * 1024 * 1024
+
+# Scatter plots draw at most this many points; with s=100 markers more only adds overdraw
+MAX_SCATTER_POINTS = 10_000
+
+
+class ChartCache:
+    # LRU of rendered charts keyed by (chart, parameters..., data version), shared by all sessions
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = CACHE_ENTRIES if max_entries is None else max_entries
+        self.max_bytes = CACHE_BYTES if max_bytes is None else max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return png
+
+    def put(self, key, png):
+        if not self.max_entries or len(png) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = png
+            self._bytes += len(png)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.stats["evictions"] += 1
+
+
+def render(fig):
+    # Rasterise once and always release the figure, so reruns never accumulate open figures
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, **SAVEFIG)
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def show(cache, key, draw, *args):
+    # draw(*args) -> Figure runs only on a cache miss
+    png = cache.get(key)
+    if png is None:
+        png = render(draw(*args))
+        cache.put(key, png)
+    st.image(png, width="stretch")
+
+
+def sample(n, limit=MAX_SCATTER_POINTS, seed=0):
+    # Positions of a fixed random subset (same subset on every render), or everything if small enough
+    if n <= limit:
+        return slice(None)
+    return np.sort(np.random.default_rng(seed).choice(n, limit, replace=False))
+
+
+# ==================== FIGURES ====================
+
+def histogram(counts, edges, color, xlabel, title):
+    # From pre-binned counts, so drawing cost does not depend on the number of products
+    fig, ax = plt.subplots(figsize=(8, 6))
+    ax.hist(edges[:-1], bins=edges, weights=counts, color=color, edgecolor='black', alpha=0.7)
+    ax.set_xlabel(xlabel, fontsize=12, fontweight='bold')
+    ax.set_ylabel("Number of Products", fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    return fig
+
+
+def price_boxplot(box):
+    fig, ax = plt.subplots(figsize=(12, 4))
+    ax.bxp(box, orientation='horizontal', patch_artist=True,
+           boxprops=dict(facecolor='#667eea', alpha=0.7),
+           medianprops=dict(color='red', linewidth=2))
+    ax.set_xlabel("Price (₹)", fontsize=12, fontweight='bold')
+    ax.set_title("Price Distribution Box Plot", fontsize=14, fontweight='bold')
+    ax.grid(axis='x', alpha=0.3)
+    return fig
+
+
+def price_rating_scatter(price, rating):
+    keep = sample(len(price))
+    price, rating = price[keep], rating[keep]
+    fig, ax = plt.subplots(figsize=(12, 6))
+    scatter = ax.scatter(price, rating,
+                         c=price, cmap='viridis',
+                         s=100, alpha=0.6, edgecolors='black')
+    ax.set_xlabel("Price (₹)", fontsize=12, fontweight='bold')
+    ax.set_ylabel("Rating", fontsize=12, fontweight='bold')
+    ax.set_title("Price vs Rating Scatter Plot", fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    plt.colorbar(scatter, ax=ax, label='Price (₹)')
+    return fig
+
+
+def top_rated_bars(top_rated):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.barh(top_rated['Short Name'], top_rated['Rating'],
+            color='#48bb78', edgecolor='black', alpha=0.7)
+    ax.set_xlabel("Rating", fontsize=12, fontweight='bold')
+    ax.set_ylabel("Product Name", fontsize=12, fontweight='bold')
+    ax.set_title(f"Top {len(top_rated)} Rated Products", fontsize=14, fontweight='bold')
+    ax.grid(axis='x', alpha=0.3)
+    return fig
+
+
+def budget_scatter(price, rating):
+    keep = sample(len(price))
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.scatter(price[keep], rating[keep],
+               s=150, alpha=0.6, c='#38b2ac', edgecolors='black')
+    ax.set_xlabel("Price (₹)", fontsize=12, fontweight='bold')
+    ax.set_ylabel("Rating", fontsize=12, fontweight='bold')
+    ax.set_title("Best Budget Products - Price vs Rating", fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+def brand_bars(series, color, xlabel, title):
+    fig, ax = plt.subplots(figsize=(8, 6))
+    series.plot(kind='barh', ax=ax, color=color, edgecolor='black', alpha=0.7)
+    ax.set_xlabel(xlabel, fontsize=12, fontweight='bold')
+    ax.set_ylabel("Brand", fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.grid(axis='x', alpha=0.3)
+    return fig
+
+
+def brand_count_bars(brand_count):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    brand_count.plot(kind='bar', ax=ax, color='#48bb78', edgecolor='black', alpha=0.7)
+    ax.set_xlabel("Brand", fontsize=12, fontweight='bold')
+    ax.set_ylabel("Number of Products", fontsize=12, fontweight='bold')
+    ax.set_title("Product Count by Brand", fontsize=14, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    return fig
+
+
+def price_history(ts, price, low, name):
+    fig, ax = plt.subplots(figsize=(12, 5))
+    ax.step(ts, price, where='post', color='#667eea', linewidth=2, label='Price')
+    ax.axhline(low, color='#48bb78', linestyle='--', linewidth=1.5, label=f'All-time low ₹{low:.0f}')
+    ax.set_xlabel("Date", fontsize=12, fontweight='bold')
+    ax.set_ylabel("Price (₹)", fontsize=12, fontweight='bold')
+    ax.set_title(f"Price History - {name[:60]}", fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    fig.autofmt_xdate()
+    return fig
@@ -0,0 +1,155 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import time
+
+import entity_resolution
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+pa_csv = lazy_import("pyarrow.csv")
+
+CLEANED_CSV = "ecommerce_data_cleaned.csv"
+ARTIFACT = "ecommerce_data_cleaned.arrow"
+
+# Rating bands used by the dashboard (Excellent >= 4.5, Good 4.0-4.5, Average < 4.0)
+RATING_BANDS = ["Average", "Good", "Excellent"]
+RATING_EDGES = [4.0, 4.5]
+
+# Labels in the Top Rated chart are cut to this many characters
+SHORT_NAME = 30
+
+@functools.cache
+def artifact_schema():
+    # Built on first use, so importing this module (the dashboard, the API) does not import pyarrow
+    return pa.schema([
+        ("Product Name", pa.string()),
+        ("Product ID", pa.string()),
+        ("Price", pa.float32()),
+        ("Rating", pa.float32()),
+        ("Brand", pa.dictionary(pa.int32(), pa.string())),
+        ("Short Name", pa.string()),
+        ("Rating Band", pa.dictionary(pa.int8(), pa.string())),
+    ])
+
+
+def source_fingerprint(path):
+    # Size + mtime of the CSV the artifact was built from; a mismatch means it is stale
+    st = os.stat(path)
+    return {"source": os.path.basename(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def read_cleaned_csv(path=CLEANED_CSV):
+    types = {"Product Name": pa.string(), "Price": pa.float32(), "Rating": pa.float32()}
+    return pa_csv.read_csv(path, convert_options=pa_csv.ConvertOptions(column_types=types))
+
+
+def rating_bands(ratings):
+    band = pc.add(pc.cast(pc.greater_equal(ratings, RATING_EDGES[0]), pa.int8()),
+                  pc.cast(pc.greater_equal(ratings, RATING_EDGES[1]), pa.int8()))
+    return pa.DictionaryArray.from_arrays(band.combine_chunks() if isinstance(band, pa.ChunkedArray) else band,
+                                          pa.array(RATING_BANDS))
+
+
+def entity_index(path=ARTIFACT):
+    # Kept next to the artifact so every rebuild reuses the titles already resolved
+    return entity_resolution.EntityIndex(os.path.join(os.path.dirname(path), entity_resolution.ENTITY_INDEX))
+
+
+def build_table(cleaned, index=None):
+    # Cleaned rows -> dashboard table with derived columns computed once instead of on every load.
+    # Brand and Product ID come from the entity index; a product relisted under several titles keeps
+    # only its first row, which is the best rated since the cleaned CSV is sorted by rating
+    if index is None:
+        index = entity_resolution.EntityIndex(None)
+    brand, product_id = index.lookup(cleaned.column("Product Name"))
+    _, first = np.unique(product_id.dictionary_encode().indices.to_numpy(zero_copy_only=False), return_index=True)
+    keep = pa.array(np.sort(first))
+    cleaned = cleaned.take(keep)
+    names = cleaned.column("Product Name")
+    return pa.table([
+        names,
+        product_id.take(keep),
+        pc.cast(cleaned.column("Price"), pa.float32()),
+        pc.cast(cleaned.column("Rating"), pa.float32()),
+        pc.dictionary_encode(brand.take(keep)).cast(artifact_schema().field("Brand").type),
+        pc.utf8_slice_codeunits(names, 0, SHORT_NAME),
+        rating_bands(cleaned.column("Rating")),
+    ], schema=artifact_schema())
+
+
+def save_artifact(table, dst=ARTIFACT, src=None):
+    # Uncompressed Arrow IPC (Feather v2) in one record batch, so readers can memory-map it as is
+    table = table.combine_chunks()
+    if src is not None:
+        table = table.replace_schema_metadata({"fingerprint": json.dumps(source_fingerprint(src))})
+    tmp_path = dst + ".tmp"
+    with pa.ipc.new_file(tmp_path, table.schema) as writer:
+        writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+    os.replace(tmp_path, dst)
+    return table.num_rows
+
+
+def write_artifact(src=CLEANED_CSV, dst=ARTIFACT):
+    index = entity_index(dst)
+    rows = save_artifact(build_table(read_cleaned_csv(src), index), dst, src)
+    index.save()
+    return rows
+
+
+def open_artifact(path=ARTIFACT):
+    return pa.ipc.open_file(pa.memory_map(path)).read_all()
+
+
+def is_current(path=ARTIFACT, src=CLEANED_CSV):
+    if not os.path.exists(path):
+        return False
+    if not os.path.exists(src):
+        return True
+    metadata = pa.ipc.open_file(pa.memory_map(path)).schema.metadata or {}
+    return json.loads(metadata.get(b"fingerprint", b"{}")) == source_fingerprint(src)
+
+
+def data_version(src=CLEANED_CSV, path=ARTIFACT):
+    # Short ID for the current cleaned data; costs one stat(), so it can be checked on every rerun
+    if os.path.exists(src):
+        fingerprint = source_fingerprint(src)
+    else:
+        metadata = pa.ipc.open_file(pa.memory_map(path)).schema.metadata or {}
+        fingerprint = json.loads(metadata.get(b"fingerprint", b"{}")) or source_fingerprint(path)
+    return hashlib.sha1(json.dumps(fingerprint, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def to_frame(table):
+    # Numeric columns stay views of the mapped file; dictionaries become pandas categoricals
+    return table.to_pandas(split_blocks=True)
+
+
+def load(src=CLEANED_CSV, path=ARTIFACT):
+    # The artifact when it matches the CSV; otherwise rebuild it from the CSV for next time
+    if not is_current(path, src):
+        index = entity_index(path)
+        table = build_table(read_cleaned_csv(src), index)
+        try:
+            save_artifact(table, path, src)
+            index.save()
+        except OSError:
+            # Read-only checkout: serve the freshly built table without caching it on disk
+            return to_frame(table)
+    return to_frame(open_artifact(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the binary dashboard artifact from the cleaned CSV")
+    parser.add_argument("src", nargs="?", default=CLEANED_CSV)
+    parser.add_argument("dst", nargs="?", default=ARTIFACT)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = write_artifact(args.src, args.dst)
+    print(f"✅ Wrote {rows:,} rows to {args.dst} in {time.perf_counter() - started:.2f}s "
+          f"({os.path.getsize(args.dst) / 1024 / 1024:.1f} MiB)")
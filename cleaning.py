@@ -0,0 +1,330 @@
+import argparse
+import csv
+import functools
+import os
+import tempfile
+import time
+
+import instrument
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+pa_csv = lazy_import("pyarrow.csv")
+
+COLUMNS = ["Product Name", "Price", "Rating"]
+
+@functools.cache
+def clean_schema():
+    # A function rather than a constant so importing this module does not import pyarrow
+    return pa.schema([
+        ("Product Name", pa.string()),
+        ("Price", pa.float32()),
+        ("Rating", pa.float32()),
+    ])
+
+# Only plain decimals survive the cast; everything else ("N/A", "", junk) becomes null
+NUMBER = r"^[0-9]*\.?[0-9]+$"
+
+# Raw CSV is read in blocks of this many bytes, so memory does not depend on file size
+BLOCK_SIZE = 16 * 1024 * 1024
+
+# Spill files are written in small record batches so the merge only holds one batch per run
+SPILL_BATCH = 8 * 1024
+
+
+def parse_numeric(values, strip=()):
+    # Literal removals plus one cast in Arrow, instead of regex str.replace + to_numeric per value
+    arr = values if isinstance(values, (pa.Array, pa.ChunkedArray)) else pa.array(values, type=pa.string(), from_pandas=True)
+    for literal in strip:
+        arr = pc.replace_substring(arr, literal, "")
+    arr = pc.utf8_trim_whitespace(arr)
+    arr = pc.if_else(pc.match_substring_regex(arr, NUMBER), arr, pa.scalar(None, pa.string()))
+    return pc.cast(arr, pa.float32())
+
+
+def parse_price(values):
+    return parse_numeric(values, strip=("₹", ","))
+
+
+def parse_rating(values):
+    return parse_numeric(values)
+
+
+def name_hashes(names):
+    # Deterministic 64-bit hashes (same in every process), so partial results can be merged later
+    if isinstance(names, (pa.Array, pa.ChunkedArray)):
+        names = names.to_numpy(zero_copy_only=False)
+    return pd.util.hash_array(np.asarray(names, dtype=object), categorize=False)
+
+
+class SeenHashes:
+    # Set of 64-bit name hashes shared across chunks, stored as sorted numpy runs (8 bytes per name)
+    # and merged log-structured so lookups stay a handful of binary searches
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            idx = np.searchsorted(run, hashes)
+            idx[idx == len(run)] = 0
+            found |= run[idx] == hashes
+        return found
+
+    def add(self, hashes):
+        self.runs.append(np.unique(hashes))
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            newer = self.runs.pop()
+            self.runs[-1] = np.union1d(self.runs[-1], newer)
+
+    def first_seen(self, hashes):
+        # Mask of rows whose hash was never seen before, keeping the first occurrence within the chunk
+        first = ~pd.Series(hashes).duplicated().to_numpy()
+        first[first] = ~self.contains(hashes[first])
+        self.add(hashes[first])
+        return first
+
+
+class RunningMean:
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+
+    def update(self, values):
+        self.total += pc.sum(values, min_count=0).as_py() or 0.0
+        self.count += pc.count(values).as_py()
+
+    def merge(self, other):
+        self.total += other.total
+        self.count += other.count
+
+    @property
+    def value(self):
+        return self.total / self.count if self.count else float("nan")
+
+
+def clean_block(block, seen, mean, stats):
+    # Same steps and order as the original task4.py, on one block:
+    # parse, feed the rating mean, drop repeated names, drop missing prices
+    names = block.column("Product Name")
+    price = parse_price(block.column("Price"))
+    rating = parse_rating(block.column("Rating"))
+    mean.update(rating)
+
+    keep = seen.first_seen(name_hashes(names))
+    stats["duplicates"] += int((~keep).sum())
+    has_price = price.is_valid().to_numpy(zero_copy_only=False)
+    stats["missing_price"] += int((keep & ~has_price).sum())
+    keep &= has_price
+
+    mask = pa.array(keep)
+    return pa.table([names.filter(mask), price.filter(mask), rating.filter(mask)], schema=clean_schema())
+
+
+def _record_end(data):
+    # Offset just past the last newline that is outside a quoted field (quote count even), or -1
+    end = len(data)
+    while True:
+        end = data.rfind(b"\n", 0, end)
+        if end == -1 or data.count(b'"', 0, end) % 2 == 0:
+            return end + 1 if end != -1 else -1
+
+
+def read_raw(src, block_size=BLOCK_SIZE, start=0, end=None):
+    # Yields one Arrow table per ~block_size bytes of the raw CSV, split on record boundaries.
+    # Blocks are read only as they are consumed (Arrow's own streaming reader reads ahead without bound).
+    # start/end select a byte range from record_offsets(); the header is always taken from the top
+    with open(src, "rb") as file:
+        header = next(csv.reader([file.readline().decode("utf-8-sig")]))
+        read_options = pa_csv.ReadOptions(column_names=header)
+        convert_options = pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in header},
+            include_columns=COLUMNS,
+        )
+        if start > file.tell():
+            file.seek(start)
+        remaining = float("inf") if end is None else end - file.tell()
+
+        carry = b""
+        while True:
+            data = file.read(int(min(block_size, remaining)))
+            remaining -= len(data)
+            if data:
+                data = carry + data
+                cut = _record_end(data)
+                if cut == -1:
+                    carry = data
+                    continue
+                block, carry = memoryview(data)[:cut], data[cut:]
+            elif carry:
+                block, carry = carry, b""
+            else:
+                return
+            with instrument.timer("clean.read"):
+                table = pa_csv.read_csv(pa.py_buffer(block), read_options=read_options, convert_options=convert_options)
+            yield table
+
+
+def record_offsets(src, chunk_size):
+    # Byte offsets splitting the raw CSV into ~chunk_size ranges that start on a record, so
+    # ranges can be cleaned independently. Scans the file once to keep quoted newlines intact
+    offsets = []
+    with open(src, "rb") as file:
+        file.readline()
+        position = file.tell()
+        offsets.append(position)
+        carry = b""
+        while True:
+            data = file.read(chunk_size)
+            if not data:
+                break
+            data = carry + data
+            cut = _record_end(data)
+            if cut == -1:
+                carry = data
+                continue
+            position += cut
+            offsets.append(position)
+            carry = data[cut:]
+        if carry:
+            offsets.append(position + len(carry))
+    return offsets
+
+
+class _Run:
+    # One sorted spill file read back a batch at a time during the merge
+
+    def __init__(self, path, fill):
+        self.reader = pa.ipc.open_file(pa.OSFile(path))
+        self.fill = fill
+        self.next_batch = 0
+        self.buffer = None
+        self.load()
+
+    @property
+    def exhausted(self):
+        return self.next_batch >= self.reader.num_record_batches
+
+    def load(self):
+        while (self.buffer is None or self.buffer.num_rows == 0) and not self.exhausted:
+            batch = self.reader.get_batch(self.next_batch)
+            self.next_batch += 1
+            self.buffer = _fill_rating(pa.Table.from_batches([batch]), self.fill)
+
+
+def _fill_rating(table, fill):
+    return table.set_column(2, "Rating", pc.fill_null(table.column("Rating"), pa.scalar(fill, pa.float32())))
+
+
+def _write_run(table, path):
+    with pa.ipc.new_file(path, clean_schema()) as writer:
+        writer.write_table(table, max_chunksize=SPILL_BATCH)
+
+
+def _sort_by_rating(table):
+    # sort_indices is stable, so equal ratings keep their input order
+    return table.take(pc.sort_indices(table, sort_keys=[("Rating", "descending")]))
+
+
+def _merge_key(rating):
+    # NaN ratings (the fill when no rating in the input parsed) compare lowest, matching where
+    # _sort_by_rating puts them; as NaN they would never pass the cutoff and the merge would not end
+    return pc.if_else(pc.is_nan(rating), pa.scalar(-np.inf, pa.float32()), rating)
+
+
+def _merge_runs(runs, write):
+    # Batched k-way merge on Rating (descending): everything at or above the highest "last key"
+    # among runs with unread batches can be emitted, since unread rows can only be lower
+    while True:
+        live = [run for run in runs if run.buffer is not None and run.buffer.num_rows]
+        if not live:
+            return
+        pending = [_merge_key(run.buffer.column("Rating"))[-1].as_py() for run in live if not run.exhausted]
+        cutoff = max(pending) if pending else -np.inf
+
+        taken = []
+        for run in live:
+            mask = pc.greater_equal(_merge_key(run.buffer.column("Rating")), cutoff)
+            taken.append(run.buffer.filter(mask))
+            run.buffer = run.buffer.filter(pc.invert(mask))
+            run.load()
+        write(_sort_by_rating(pa.concat_tables(taken)))
+
+
+def clean_csv(src, dst, block_size=BLOCK_SIZE, sort=True, spill_dir=None):
+    started = time.perf_counter()
+    stats = {"rows_in": 0, "rows_out": 0, "duplicates": 0, "missing_price": 0, "imputed": 0}
+    seen = SeenHashes()
+    mean = RunningMean()
+
+    with tempfile.TemporaryDirectory(prefix="clean_", dir=spill_dir) as tmp:
+        runs = []
+
+        # Pass 1: clean each block and spill it (sorted) with missing ratings left null
+        for i, block in enumerate(read_raw(src, block_size)):
+            stats["rows_in"] += block.num_rows
+            with instrument.timer("clean.block"):
+                table = clean_block(block, seen, mean, stats)
+            stats["imputed"] += table.column("Rating").null_count
+
+            with instrument.timer("clean.spill"):
+                if sort:
+                    # Unrated rows all get the same key (the final mean), so they form a sorted run as they are
+                    rated = table.column("Rating").is_valid()
+                    runs.append(os.path.join(tmp, f"rated-{i:05d}.arrow"))
+                    _write_run(_sort_by_rating(table.filter(rated)), runs[-1])
+                    runs.append(os.path.join(tmp, f"unrated-{i:05d}.arrow"))
+                    _write_run(table.filter(pc.invert(rated)), runs[-1])
+                else:
+                    runs.append(os.path.join(tmp, f"run-{i:05d}.arrow"))
+                    _write_run(table, runs[-1])
+
+        # Pass 2: the mean is final now, so missing ratings can be filled while writing out. The merge
+        # goes to a tmp file that replaces dst at the end, so readers of dst never see a partial CSV
+        fill = mean.value
+        tmp_path = dst + ".tmp"
+        try:
+            with instrument.timer("clean.merge"), pa_csv.CSVWriter(tmp_path, clean_schema()) as writer:
+                def write(table):
+                    writer.write_table(table)
+                    stats["rows_out"] += table.num_rows
+
+                if sort:
+                    _merge_runs([_Run(path, fill) for path in runs], write)
+                else:
+                    for path in runs:
+                        reader = pa.ipc.open_file(pa.OSFile(path))
+                        for b in range(reader.num_record_batches):
+                            write(_fill_rating(pa.Table.from_batches([reader.get_batch(b)]), fill))
+            os.replace(tmp_path, dst)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    stats["mean_rating"] = fill
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_sec"] = stats["rows_in"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean a scraped CSV in bounded-memory chunks")
+    parser.add_argument("src", nargs="?", default="ecommerce_data.csv")
+    parser.add_argument("dst", nargs="?", default="ecommerce_data_cleaned.csv")
+    parser.add_argument("--block-mb", type=int, default=BLOCK_SIZE // (1024 * 1024), help="raw CSV read per chunk")
+    parser.add_argument("--no-sort", action="store_true", help="keep input order instead of sorting by rating")
+    parser.add_argument("--spill-dir", default=None)
+    args = parser.parse_args()
+
+    stats = clean_csv(args.src, args.dst, args.block_mb * 1024 * 1024, not args.no_sort, args.spill_dir)
+    print(f"✅ Cleaned {stats['rows_in']:,} rows into {stats['rows_out']:,} in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/s)")
+    print(f"   {stats['duplicates']:,} duplicates, {stats['missing_price']:,} without price, "
+          f"{stats['imputed']:,} ratings imputed with {stats['mean_rating']:.2f}")
@@ -0,0 +1,114 @@
+import threading
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from lazy import lazy_import
+from parsers import _row
+
+# Only the "source" mode parses HTML, so the default "script" mode never imports lxml
+etree = lazy_import("lxml.etree")
+lxml_html = lazy_import("lxml.html")
+
+CARD_XPATH = "//div[@data-id]"
+NAME_XPATH = ".//a[@title]"
+PRICE_XPATH = ".//div[contains(text(),'₹')]"
+RATING_XPATH = ".//div[contains(@class,'MKiFS6')]"
+
+# One execute_script call that walks every card in the browser and returns plain arrays
+EXTRACT_SCRIPT = """
+const cards = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const first = (xpath, node) =>
+    document.evaluate(xpath, node, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const rows = [];
+for (let i = 0; i < cards.snapshotLength; i++) {
+    const card = cards.snapshotItem(i);
+    const name = first(arguments[1], card);
+    const price = first(arguments[2], card);
+    const rating = first(arguments[3], card);
+    rows.push([
+        card.getAttribute("data-id"),
+        name ? name.getAttribute("title") : null,
+        price ? price.innerText.trim() : null,
+        rating ? rating.innerText.trim() : null,
+    ]);
+}
+return rows;
+"""
+
+# XPath evaluators must not be shared between BrowserPool threads (see parsers.LxmlParser), so each
+# thread compiles its own on the first page it parses
+_local = threading.local()
+
+
+def _xpaths():
+    # (cards, name, price, rating) XPaths of the calling thread
+    if not hasattr(_local, "xpaths"):
+        _local.xpaths = tuple(etree.XPath(xpath) for xpath in (CARD_XPATH, NAME_XPATH, PRICE_XPATH, RATING_XPATH))
+    return _local.xpaths
+
+
+def extract_with_elements(driver):
+    # The original task3.py loop: three find_element round-trips per card
+    rows = []
+    for product in driver.find_elements(By.XPATH, CARD_XPATH):
+        product_id = product.get_attribute("data-id")
+
+        try:
+            name = product.find_element(By.XPATH, NAME_XPATH).get_attribute("title")
+        except NoSuchElementException:
+            name = None
+
+        try:
+            price = product.find_element(By.XPATH, PRICE_XPATH).text
+        except NoSuchElementException:
+            price = None
+
+        try:
+            rating = product.find_element(By.XPATH, RATING_XPATH).text.strip()
+        except NoSuchElementException:
+            rating = None
+
+        rows.append(_row(product_id, name, price, rating))
+    return rows
+
+
+def extract_with_script(driver):
+    rows = driver.execute_script(EXTRACT_SCRIPT, CARD_XPATH, NAME_XPATH, PRICE_XPATH, RATING_XPATH)
+    return [_row(*row) for row in rows]
+
+
+def _text(element):
+    return " ".join(element.text_content().split())
+
+
+def extract_from_source(page_source):
+    tree = lxml_html.fromstring(page_source)
+    find_cards, find_name, find_price, find_rating = _xpaths()
+    rows = []
+    for card in find_cards(tree):
+        name = find_name(card)
+        price = find_price(card)
+        rating = find_rating(card)
+        rows.append(_row(
+            card.get("data-id"),
+            name[0].get("title") if name else None,
+            _text(price[0]) if price else None,
+            _text(rating[0]) if rating else None,
+        ))
+    return rows
+
+
+def extract_with_source(driver):
+    return extract_from_source(driver.page_source)
+
+
+EXTRACTORS = {
+    "elements": extract_with_elements,
+    "script": extract_with_script,
+    "source": extract_with_source,
+}
+
+
+def extract_cards(driver, mode="script"):
+    return EXTRACTORS[mode](driver)
@@ -0,0 +1,340 @@
+import argparse
+import functools
+import os
+import time
+
+from history_store import product_key
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+pq = lazy_import("pyarrow.parquet")
+
+ENTITY_INDEX = "entity_index.parquet"
+
+# Canonical brand -> other spellings seen in titles (matching is case-insensitive, punctuation ignored).
+# Brands not listed here fall back to their most common spelling in the data
+BRAND_ALIASES = {
+    "boAt": ["boat"],
+    "realme": ["realme"],
+    "OnePlus": ["oneplus", "one plus"],
+    "PTron": ["ptron"],
+    "Boult": ["boult", "boult audio", "goboult"],
+    "Noise": ["noise"],
+    "Samsung": ["samsung"],
+    "OPPO": ["oppo"],
+    "Zebronics": ["zebronics", "zeb"],
+    "Fire-Boltt": ["fire boltt", "fireboltt", "fire bolt"],
+    "Xiaomi": ["xiaomi", "mi"],
+    "Redmi": ["redmi"],
+    "JBL": ["jbl"],
+    "Sony": ["sony"],
+    "Apple": ["apple"],
+    "Nothing": ["nothing"],
+    "CMF": ["cmf", "cmf by nothing"],
+    "Mivi": ["mivi"],
+    "Portronics": ["portronics"],
+    "TRIGGR": ["triggr"],
+}
+
+# Longest alias, in words, that the matcher looks at
+MAX_ALIAS_TOKENS = 3
+
+# Words that make up the model phrase of titles without a number
+MODEL_WORDS = 3
+
+# MinHash signature size, split into bands for candidate generation (4 bands x 4 rows ~ 0.7 Jaccard)
+NUM_HASHES = 16
+BANDS = 4
+
+# Neighbours compared after sorting each band, and the signature agreement that counts as the same SKU
+WINDOW = 8
+THRESHOLD = 0.85
+
+_MIX = 0x9E3779B97F4A7C15
+
+
+@functools.cache
+def _seeds():
+    # One fixed seed per MinHash function; drawn on first use so importing the module skips numpy
+    return np.random.default_rng(20240101).integers(1, 2 ** 63, NUM_HASHES, dtype=np.uint64)
+
+
+def _to_array(values):
+    if isinstance(values, pa.ChunkedArray):
+        return values.combine_chunks()
+    return values if isinstance(values, pa.Array) else pa.array(values, pa.string())
+
+
+def _hash_strings(values):
+    # 64-bit hash per string (nulls hash like ""), computed once per distinct value
+    values = pc.fill_null(_to_array(values), "").dictionary_encode()
+    hashes = pd.util.hash_array(np.asarray(values.dictionary.to_pylist(), dtype=object), categorize=False)
+    return hashes[values.indices.to_numpy()]
+
+
+def normalize(titles):
+    # Lower case, punctuation to spaces, single spaces: "boAt Airdopes 141, ENC" -> "boat airdopes 141 enc".
+    # Titles reuse a small vocabulary, so the regex runs once per distinct word rather than per title
+    words = pc.utf8_split_whitespace(_to_array(titles))
+    vocab = pc.list_flatten(words).dictionary_encode()
+    clean = pc.replace_substring_regex(pc.utf8_lower(vocab.dictionary), r"[\W_]+", " ")
+    flat = pc.utf8_trim_whitespace(clean).take(vocab.indices)
+    kept = np.concatenate([[0], np.cumsum(pc.not_equal(flat, "").to_numpy(zero_copy_only=False))])
+    offsets = pa.array(kept[words.offsets.to_numpy()].astype(np.int32))
+    words = pa.ListArray.from_arrays(offsets, flat.filter(pc.not_equal(flat, "")), mask=pc.is_null(words))
+    return pc.binary_join(words, " ")
+
+
+class BrandMatcher:
+    # Token trie compiled from BRAND_ALIASES; titles are matched by their leading tokens, once per
+    # distinct prefix, so the cost depends on the number of distinct prefixes rather than titles
+
+    def __init__(self, aliases=BRAND_ALIASES):
+        self.trie = {}
+        for canonical, spellings in aliases.items():
+            for spelling in [canonical, *spellings]:
+                node = self.trie
+                for token in normalize([spelling])[0].as_py().split():
+                    node = node.setdefault(token, {})
+                node[None] = canonical
+
+    def _walk(self, tokens):
+        # (longest alias that is a prefix of tokens, whether a longer alias could still match)
+        node, found = self.trie, None
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                return found, False
+            found = node.get(None, found)
+        return found, len(node) > (None in node)
+
+    def match(self, titles):
+        titles = _to_array(titles)
+        words = pc.utf8_split_whitespace(pc.utf8_trim_whitespace(titles), max_splits=MAX_ALIAS_TOKENS)
+
+        # Titles share a handful of first words, so the trie is walked once per distinct first word
+        first = pc.list_element(words, 0)
+        first = pc.if_else(pc.equal(first, ""), pa.scalar(None, pa.string()), first).dictionary_encode()
+        codes = first.indices
+        walked = [self._walk(tokens or ()) for tokens in pc.utf8_split_whitespace(normalize(first.dictionary)).to_pylist()]
+        known = pa.array([found for found, _ in walked], pa.string())
+
+        # Unlisted brands: the first word, spelled the way most titles spell it
+        spellings = pd.DataFrame({"spelling": first.dictionary.to_pylist(),
+                                  "n": np.bincount(codes.drop_null().to_numpy(), minlength=len(first.dictionary))})
+        spellings["folded"] = spellings["spelling"].str.lower()
+        best = spellings.sort_values("n", ascending=False, kind="stable").drop_duplicates("folded")
+        spellings = pa.array(spellings["folded"].map(best.set_index("folded")["spelling"]), pa.string())
+        brands = pc.if_else(pc.is_null(known), spellings, known).take(codes)
+
+        # Multi-word aliases ("boult audio", "cmf by nothing"): look further only where one could start
+        longer = pc.fill_null(pa.array([more for _, more in walked], pa.bool_()).take(codes), False)
+        if pc.any(longer).as_py():
+            heads = pc.binary_join(pc.list_slice(words.filter(longer), 0, MAX_ALIAS_TOKENS), " ").dictionary_encode()
+            found = [self._walk(tokens)[0] for tokens in pc.utf8_split_whitespace(normalize(heads.dictionary)).to_pylist()]
+            found = pc.coalesce(pa.array(found, pa.string()).take(heads.indices), brands.filter(longer))
+            brands = pc.replace_with_mask(brands, longer, found)
+        return brands
+
+
+def _mix(values, seed):
+    mix = np.uint64(_MIX)
+    h = (values ^ seed) * mix
+    h ^= h >> np.uint64(29)
+    h *= mix
+    return h ^ (h >> np.uint64(32))
+
+
+def features(brands, normalized):
+    # (MinHash signatures, block keys) per normalized title, from one pass over its words
+    words = pc.utf8_split_whitespace(_to_array(normalized))
+    offsets = words.offsets.to_numpy()
+    vocab = pc.list_flatten(words).dictionary_encode()
+    word_hash = _hash_strings(vocab.dictionary)[vocab.indices.to_numpy()]
+    has_digit = pc.match_substring_regex(vocab.dictionary, r"\d").to_numpy(zero_copy_only=False)[vocab.indices.to_numpy()]
+
+    lengths = np.diff(offsets)
+    non_empty = lengths > 0
+    starts = offsets[:-1][non_empty]
+    return signatures(word_hash, starts, non_empty), block_keys(brands, word_hash, has_digit, offsets, non_empty)
+
+
+def signatures(word_hash, starts, non_empty):
+    # MinHash over the title's word set: identical for reordered/repeated words, close for small edits
+    sig = np.full((len(non_empty), NUM_HASHES), np.iinfo(np.uint32).max, dtype=np.uint32)
+    if len(word_hash):
+        for k, seed in enumerate(_seeds()):
+            hashed = (_mix(word_hash, seed) >> np.uint64(32)).astype(np.uint32)
+            sig[non_empty, k] = np.minimum.reduceat(hashed, starts)
+    return sig
+
+
+def block_keys(brands, word_hash, has_digit, offsets, non_empty):
+    # Candidates must share the brand and the model phrase: the words up to the first one with a digit
+    # ("airdopes 141"), or the first MODEL_WORDS words when a title has no number
+    lengths = np.diff(offsets)
+    starts = offsets[:-1][non_empty]
+    position = np.arange(len(word_hash)) - np.repeat(offsets[:-1], lengths)
+    last = np.full(len(non_empty), MODEL_WORDS - 1)
+    if len(word_hash):
+        first_digit = np.minimum.reduceat(np.where(has_digit, position, len(word_hash)), starts)
+        last[non_empty] = np.where(first_digit < len(word_hash), first_digit, MODEL_WORDS - 1)
+    in_phrase = position <= np.repeat(last, lengths)
+    phrase = np.zeros(len(non_empty), dtype=np.uint64)
+    if len(word_hash):
+        # Position-salted so word order within the phrase matters
+        salted = np.where(in_phrase, _mix(word_hash, position.astype(np.uint64)), np.uint64(0))
+        phrase[non_empty] = np.add.reduceat(salted, starts)
+    return _mix(_hash_strings(pc.utf8_lower(_to_array(brands))), phrase)
+
+
+def candidate_pairs(blocks, sig):
+    # Banded sorted neighbourhood: per band, sort by (block, band) and pair rows WINDOW apart that share both
+    rows_per_band = NUM_HASHES // BANDS
+    pairs = []
+    for band in range(BANDS):
+        band_key = _band_hash(sig[:, band * rows_per_band:(band + 1) * rows_per_band])
+        key = blocks ^ (band_key * np.uint64(0x100000001B3))
+        order = np.argsort(key, kind="stable")
+        key = key[order]
+        for step in range(1, WINDOW + 1):
+            same = key[step:] == key[:-step]
+            if not same.any():
+                break
+            pairs.append(np.stack([order[:-step][same], order[step:][same]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    n = np.int64(len(sig))
+    pairs = np.unique(pairs[:, 0] * n + pairs[:, 1])
+    return np.stack([pairs // n, pairs % n], axis=1)
+
+
+def _band_hash(part):
+    h = np.zeros(len(part), dtype=np.uint64)
+    for column in part.T:
+        h = _mix(h ^ column.astype(np.uint64), np.uint64(_MIX))
+    return h
+
+
+def components(n, pairs):
+    # Connected components by min-label propagation with pointer jumping (no graph library needed)
+    labels = np.arange(n)
+    if len(pairs) == 0:
+        return labels
+    a, b = pairs[:, 0], pairs[:, 1]
+    while True:
+        low = np.minimum(labels[a], labels[b])
+        before = labels.copy()
+        np.minimum.at(labels, a, low)
+        np.minimum.at(labels, b, low)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels, before):
+            return labels
+
+
+def cluster(blocks, sig):
+    # Cluster label per row; rows with the same label are the same SKU
+    pairs = candidate_pairs(blocks, sig)
+    if len(pairs):
+        agreement = np.zeros(len(pairs), dtype=np.float32)
+        for start in range(0, len(pairs), 1_000_000):
+            chunk = pairs[start:start + 1_000_000]
+            agreement[start:start + len(chunk)] = (sig[chunk[:, 0]] == sig[chunk[:, 1]]).mean(axis=1)
+        pairs = pairs[agreement >= THRESHOLD]
+    return components(len(blocks), pairs)
+
+
+@functools.cache
+def index_schema():
+    # Columns of the persisted entity index, built on first use
+    return pa.schema([("title", pa.string()), ("normalized", pa.string()), ("brand", pa.string()),
+                      ("block", pa.uint64()), ("product_id", pa.string())])
+
+
+class EntityIndex:
+    # Persisted title -> (brand, canonical product ID) lookup. Known titles are a join; only unseen
+    # titles are resolved, against the indexed titles in the blocks they fall into
+
+    def __init__(self, path=ENTITY_INDEX, matcher=None):
+        self.path = path
+        self.matcher = matcher or BrandMatcher()
+        if path and os.path.exists(path):
+            self.table = pq.read_table(path)
+        else:
+            self.table = index_schema().empty_table()
+        self.stats = {"looked_up": 0, "new_titles": 0, "new_products": 0, "seconds": 0.0}
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def _resolve(self, titles):
+        # titles: distinct titles missing from the index -> rows to append
+        normalized = normalize(titles)
+        brands = self.matcher.match(titles)
+        sig, blocks = features(brands, normalized)
+
+        # Re-cluster together with indexed titles of the same blocks so new variants join existing SKUs
+        old = self.table.filter(pa.array(np.isin(self.table.column("block").to_numpy(), blocks)))
+        old_sig, old_blocks = features(old.column("brand"), old.column("normalized"))
+        labels = cluster(np.concatenate([old_blocks, blocks]), np.concatenate([old_sig, sig]))
+
+        # A cluster keeps its existing ID (smallest, if two SKUs merged); new clusters get one from their first title
+        existing = pd.DataFrame({"label": labels[:old.num_rows], "id": old.column("product_id").to_pandas()})
+        existing = existing.sort_values(["label", "id"]).drop_duplicates("label").set_index("label")["id"]
+        new_labels = pd.Series(labels[old.num_rows:])
+        first = pd.DataFrame({"label": new_labels, "normalized": normalized.to_pandas()})
+        first = first.drop_duplicates("label").set_index("label")["normalized"]
+        created = first[~first.index.isin(existing.index)].map(product_key)
+        product_ids = new_labels.map(pd.concat([existing, created]))
+
+        self.stats["new_products"] += len(created)
+        return pa.table([titles, normalized, brands, pa.array(blocks), pa.array(product_ids, pa.string())],
+                        schema=index_schema())
+
+    def lookup(self, titles, update=True):
+        # (brand, product_id) arrays aligned with titles
+        started = time.perf_counter()
+        titles = _to_array(titles)
+        positions = pc.index_in(titles, value_set=self.table.column("title"))
+        unknown = pc.and_(pc.is_null(positions), pc.is_valid(titles))
+        if update and pc.any(unknown).as_py():
+            new_titles = pc.unique(titles.filter(unknown))
+            self.stats["new_titles"] += len(new_titles)
+            self.table = pa.concat_tables([self.table, self._resolve(new_titles)])
+            positions = pc.index_in(titles, value_set=self.table.column("title"))
+
+        self.stats["looked_up"] += len(titles)
+        self.stats["seconds"] += time.perf_counter() - started
+        return (_to_array(self.table.column("brand").take(positions)),
+                _to_array(self.table.column("product_id").take(positions)))
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        pq.write_table(self.table, tmp_path)
+        os.replace(tmp_path, self.path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve brands and canonical product IDs for scraped titles")
+    parser.add_argument("csv", nargs="?", default="ecommerce_data_cleaned.csv")
+    parser.add_argument("--index", default=ENTITY_INDEX)
+    args = parser.parse_args()
+
+    titles = pa.array(pd.read_csv(args.csv, usecols=["Product Name"], dtype=str)["Product Name"], pa.string())
+    index = EntityIndex(args.index)
+    brands, product_ids = index.lookup(titles)
+    index.save()
+
+    stats = index.stats
+    print(f"✅ {stats['looked_up']:,} titles -> {len(pc.unique(product_ids)):,} products, "
+          f"{len(pc.unique(brands)):,} brands in {stats['seconds']:.2f}s "
+          f"({stats['new_titles']:,} new titles, {stats['new_products']:,} new products)")
+    print(f"✅ Index saved to {args.index} ({len(index):,} titles)")
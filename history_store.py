@@ -0,0 +1,225 @@
+import argparse
+import functools
+import glob
+import hashlib
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+from lazy import lazy_import
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+ds = lazy_import("pyarrow.dataset")
+pq = lazy_import("pyarrow.parquet")
+
+HISTORY_DIR = "price_history"
+
+# Names the history dataset scans skip: "." for files still being written, "_" for the state other
+# modules keep beside the history (see state_path)
+IGNORE_PREFIXES = [".", "_"]
+
+@functools.cache
+def history_schema():
+    # Built on first use, so a CLI's --help (or a module that only needs the constants) skips pyarrow
+    return pa.schema([
+        ("product_id", pa.string()),
+        ("ts", pa.timestamp("us", tz="UTC")),
+        ("price", pa.float32()),
+        ("rating", pa.float32()),
+        ("name", pa.string()),
+    ])
+
+# Small row groups keep per-product min/max statistics selective inside sorted files
+ROW_GROUP_SIZE = 64 * 1024
+
+
+def product_key(name):
+    # Stable ID for rows scraped without a data-id (e.g. the bundled CSVs)
+    return hashlib.md5(" ".join(str(name).lower().split()).encode("utf-8")).hexdigest()[:16].upper()
+
+
+def state_path(root, name):
+    # Where a module keeps state next to the history, out of the dataset scans (_trends.parquet, ...)
+    return os.path.join(root, "_" + name)
+
+
+def _utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _write(table, directory, prefix):
+    # Written under a dot-name first so readers never see a half-written file
+    name = f"{prefix}-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, "." + name)
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp_path, os.path.join(directory, name))
+
+
+def to_observations(products, ts=None):
+    # Scraped rows (dicts or a raw task3.py frame) -> typed history rows
+    df = pd.DataFrame(products)
+    if df.columns.empty:
+        # A scrape that found no cards gives no columns either; it is still an (empty) raw scrape
+        df = pd.DataFrame(columns=["Product Name", "Price", "Rating"])
+    # The schema stores microseconds; a float epoch (time.time()) carries nanosecond digits the cast rejects
+    ts = _utc(ts or datetime.now(timezone.utc)).floor("us")
+
+    if "Product ID" in df:
+        ids = df["Product ID"].astype(str)
+        missing = ids.isin(["", "N/A", "nan"])
+        ids = ids.where(~missing, df["Product Name"].map(product_key))
+    else:
+        ids = df["Product Name"].map(product_key)
+
+    price = df["Price"].astype(str).str.replace("₹", "", regex=False).str.replace(",", "", regex=False)
+    return pd.DataFrame({
+        "product_id": ids.values,
+        "ts": ts,
+        "price": pd.to_numeric(price, errors="coerce").astype("float32").values,
+        "rating": pd.to_numeric(df["Rating"], errors="coerce").astype("float32").values,
+        "name": df["Product Name"].astype(str).values,
+    })
+
+
+class HistoryStore:
+    # Append-only price history: Parquet files partitioned by scrape date (date=YYYY-MM-DD). The root
+    # is created by the first append, so reading a missing history leaves nothing behind
+
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+        self._dataset = None
+
+    def _partition_dir(self, day):
+        return os.path.join(self.root, f"date={day}")
+
+    def partitions(self):
+        return sorted(os.path.basename(p)[5:] for p in glob.glob(os.path.join(self.root, "date=*")))
+
+    def append(self, observations):
+        # One new file per scrape and day; existing files are never rewritten here
+        if not isinstance(observations, pa.Table):
+            observations = pa.Table.from_pandas(observations, schema=history_schema(), preserve_index=False)
+        if observations.num_rows == 0:
+            return 0
+
+        days = pc.strftime(observations["ts"], format="%Y-%m-%d")
+        for day in pc.unique(days).to_pylist():
+            part = observations.filter(pc.equal(days, day))
+            part = part.sort_by([("product_id", "ascending"), ("ts", "ascending")])
+            _write(part, self._partition_dir(day), "part")
+        self._dataset = None
+        return observations.num_rows
+
+    def append_scrape(self, products, ts=None):
+        return self.append(to_observations(products, ts))
+
+    def dataset(self):
+        # File discovery is cached until this store writes again
+        if self._dataset is None:
+            partitioning = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+            self._dataset = ds.dataset(self.root, format="parquet", partitioning=partitioning,
+                                       ignore_prefixes=IGNORE_PREFIXES)
+        return self._dataset
+
+    def _filter(self, product_ids=None, start=None, end=None):
+        # The date partition key prunes whole directories before any file is opened
+        terms = []
+        if start is not None:
+            start = _utc(start)
+            terms.append(ds.field("date") >= start.strftime("%Y-%m-%d"))
+            terms.append(ds.field("ts") >= start.to_pydatetime())
+        if end is not None:
+            end = _utc(end)
+            terms.append(ds.field("date") <= end.strftime("%Y-%m-%d"))
+            terms.append(ds.field("ts") < end.to_pydatetime())
+        if isinstance(product_ids, str):
+            terms.append(ds.field("product_id") == product_ids)
+        elif product_ids is not None:
+            terms.append(ds.field("product_id").isin(list(product_ids)))
+
+        expr = None
+        for term in terms:
+            expr = term if expr is None else expr & term
+        return expr
+
+    def query(self, product_ids=None, start=None, end=None, columns=("product_id", "ts", "price", "rating")):
+        if not self.partitions():
+            return pd.DataFrame(columns=list(columns))
+        table = self.dataset().to_table(columns=list(columns), filter=self._filter(product_ids, start, end))
+        return table.to_pandas()
+
+    def product_history(self, product_id, start=None, end=None):
+        return self.query(product_id, start, end).sort_values("ts", ignore_index=True)
+
+    def compact(self, min_files=2):
+        # Merge each day's small append files into one sorted file so queries open fewer files
+        compacted = 0
+        for day in self.partitions():
+            directory = self._partition_dir(day)
+            files = sorted(glob.glob(os.path.join(directory, "*.parquet")))
+            if len(files) < min_files:
+                continue
+
+            table = pa.concat_tables(pq.read_table(f, schema=history_schema()) for f in files)
+            table = table.sort_by([("product_id", "ascending"), ("ts", "ascending")])
+            _write(table, directory, "compacted")
+            for f in files:
+                os.remove(f)
+            compacted += 1
+        self._dataset = None
+        return compacted
+
+    def stats(self):
+        files = glob.glob(os.path.join(self.root, "date=*", "*.parquet"))
+        rows = sum(pq.ParquetFile(f).metadata.num_rows for f in files)
+        return {
+            "partitions": len(self.partitions()),
+            "files": len(files),
+            "rows": rows,
+            "bytes": sum(os.path.getsize(f) for f in files),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append scrapes to the price history and maintain it")
+    parser.add_argument("--root", default=HISTORY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="add a task3.py CSV as one scrape (changed rows, trends, "
+                                                "sketches and alerts, like change_detect.py)")
+    ingest.add_argument("csv", nargs="?", default="ecommerce_data.csv")
+    ingest.add_argument("--ts", default=None, help="scrape timestamp (defaults to the file's mtime)")
+    ingest.add_argument("--rules", default=None, help="watch rules to check the stored rows against "
+                                                     "(defaults to alert_rules.json)")
+
+    commands.add_parser("compact", help="merge each day's files into one sorted file")
+    commands.add_parser("stats")
+
+    show = commands.add_parser("show", help="print one product's history")
+    show.add_argument("product_id")
+
+    args = parser.parse_args()
+    store = HistoryStore(args.root)
+
+    if args.command == "ingest":
+        # Through the change detector, so the trends, sketches and alert state stay in step with the
+        # stored rows. Imported here: change_detect itself builds on this module
+        import alerts
+        from change_detect import ingest_scrape
+        ts = args.ts or datetime.fromtimestamp(os.path.getmtime(args.csv), timezone.utc)
+        observations = to_observations(pd.read_csv(args.csv, dtype=str), ts)
+        _, report, fired = ingest_scrape(observations, args.root, rules=alerts.load_rules(args.rules or alerts.RULES_FILE),
+                                         sinks=[alerts.JsonlSink()])
+        print(f"✅ Stored {report['stored']} of {report['observed']} observations in {args.root} "
+              f"({report['new']} new, {report['changed']} changed), {len(fired)} alerts")
+    elif args.command == "compact":
+        print(f"✅ Compacted {store.compact()} partitions")
+    elif args.command == "stats":
+        print(store.stats())
+    elif args.command == "show":
+        print(store.product_history(args.product_id))
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from lazy import lazy_import
+
+requests = lazy_import("requests")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    headers TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+"""
+
+# Response headers worth replaying from the cache (requests has already undone Content-Encoding)
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+
+
+class HttpCache:
+    # On-disk response cache: bodies as files, validators and LRU bookkeeping in SQLite
+
+    def __init__(self, path=".http_cache", ttl=3600, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(path, "index.sqlite"), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_saved": 0}
+
+    def _count(self, **counts):
+        with self._stats_lock:
+            for key, value in counts.items():
+                self.stats[key] += value
+
+    def _body_path(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def lookup(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, key, etag, last_modified, headers, size, stored_at FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(("url", "key", "etag", "last_modified", "headers", "size", "stored_at"), row))
+        if not os.path.exists(self._body_path(entry["key"])):
+            self._delete(url, entry["key"])
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        return self.ttl is not None and time.time() - entry["stored_at"] < self.ttl
+
+    def validators(self, entry):
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def response(self, entry):
+        # Rebuild a requests.Response from disk so callers can't tell it was cached
+        with open(self._body_path(entry["key"]), "rb") as file:
+            body = file.read()
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry["url"]
+        response.headers = requests.structures.CaseInsensitiveDict(json.loads(entry["headers"]))
+        response._content = body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def hit(self, entry):
+        self._count(hits=1, bytes_saved=entry["size"])
+        self._touch(entry["url"])
+        return self.response(entry)
+
+    def revalidated(self, entry, response):
+        # 304: the stored body is still current, restart its TTL and pick up refreshed validators
+        self._count(revalidated=1, bytes_saved=entry["size"])
+        etag = response.headers.get("ETag", entry["etag"])
+        last_modified = response.headers.get("Last-Modified", entry["last_modified"])
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET etag = ?, last_modified = ?, stored_at = ?, last_access = ? WHERE url = ?",
+                (etag, last_modified, now, now, entry["url"]),
+            )
+            self._db.commit()
+        return self.response(entry)
+
+    def store(self, url, response):
+        self._count(misses=1)
+        if "no-store" in response.headers.get("Cache-Control", ""):
+            return
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified and not self.ttl:
+            return
+
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        body_path = self._body_path(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(response.content)
+        os.replace(tmp_path, body_path)
+
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, key, etag, last_modified, json.dumps(headers), len(response.content), now, now),
+            )
+            self._db.commit()
+        self._count(stores=1)
+        self._evict()
+
+    def _touch(self, url):
+        with self._lock:
+            self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def _delete(self, url, key):
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._db.commit()
+        try:
+            os.remove(self._body_path(key))
+        except FileNotFoundError:
+            pass
+
+    def size(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self):
+        # Drop least recently used entries until the cache fits in max_bytes
+        if not self.max_bytes:
+            return
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        with self._lock:
+            rows = self._db.execute("SELECT url, key, size FROM entries ORDER BY last_access").fetchall()
+        for url, key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._delete(url, key)
+            total -= size
+            self._count(evictions=1)
+
+    def clear(self):
+        with self._lock:
+            rows = self._db.execute("SELECT url, key FROM entries").fetchall()
+        for url, key in rows:
+            self._delete(url, key)
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,256 @@
+import argparse
+import atexit
+import cProfile
+import fnmatch
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Path for structured metrics: *.prom gets a Prometheus text snapshot, anything else JSONL events.
+# Unset, timings are only kept in memory (the dashboard's Performance page still shows them)
+METRICS_ENV = "TRACKER_METRICS"
+
+# Timer names (fnmatch pattern, e.g. "clean.*") to run under cProfile; dumps go to PROFILE_DIR
+PROFILE_ENV = "TRACKER_PROFILE"
+PROFILE_DIR = "profiles"
+
+# Also record the peak traced allocation of every profiled timer (slows the profiled code down)
+TRACEMALLOC_ENV = "TRACKER_TRACEMALLOC"
+
+# Samples kept per series for the in-memory percentiles
+RESERVOIR = 2048
+
+# JSONL events are buffered and appended in batches of this size
+FLUSH_EVERY = 256
+
+QUANTILES = [0.5, 0.95, 0.99]
+
+
+def series(name, labels=None):
+    # "app.page" + {"page": "Overview"} -> 'app.page{page="Overview"}'
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in sorted(labels.items())) + "}"
+
+
+def _prometheus_name(key):
+    name, _, labels = key.partition("{")
+    return name.replace(".", "_").replace("-", "_") + ("{" + labels if labels else "")
+
+
+class Registry:
+    # Per-series timing samples and counters for this process, optionally written out as metrics
+
+    def __init__(self, path=None, profile=None, trace_memory=False, reservoir=RESERVOIR):
+        self.path = path
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.samples = defaultdict(lambda: deque(maxlen=reservoir))
+        self.totals = defaultdict(lambda: [0, 0.0])
+        self.counters = defaultdict(float)
+        self.gauges = {}
+        self._events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _jsonl(self):
+        return bool(self.path) and not self.path.endswith(".prom")
+
+    def observe(self, name, seconds, **labels):
+        key = series(name, labels)
+        with self._lock:
+            self.samples[key].append(seconds)
+            total = self.totals[key]
+            total[0] += 1
+            total[1] += seconds
+            if self._jsonl():
+                self._events.append({"ts": time.time(), "type": "timer", "name": name, "labels": labels,
+                                     "seconds": seconds, "pid": os.getpid()})
+                if len(self._events) >= FLUSH_EVERY:
+                    self._flush_locked()
+
+    def count(self, name, value=1, **labels):
+        with self._lock:
+            self.counters[series(name, labels)] += value
+            if self._jsonl():
+                self._events.append({"ts": time.time(), "type": "counter", "name": name, "labels": labels,
+                                     "value": value, "pid": os.getpid()})
+
+    @contextmanager
+    def timer(self, name, **labels):
+        profiler = self._start_profile(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+            if profiler is not None:
+                self._stop_profile(name, profiler, labels)
+
+    def timed(self, name=None):
+        # Decorator form of timer(), named after the function unless given a name
+        def decorate(func):
+            label = name or f"{func.__module__}.{func.__qualname__}"
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(label):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    # ==================== PROFILING ====================
+
+    def _start_profile(self, name):
+        # One profiled timer per thread at a time; nested ones are only timed
+        if not self.profile or not fnmatch.fnmatchcase(name, self.profile) or getattr(self._local, "active", False):
+            return None
+        self._local.active = True
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _stop_profile(self, name, profiler, labels):
+        profiler.disable()
+        self._local.active = False
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{name}-{os.getpid()}-{time.time_ns()}.prof"))
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            key = series(name + ".peak_bytes", labels)
+            with self._lock:
+                self.gauges[key] = max(self.gauges.get(key, 0), peak)
+
+    # ==================== OUTPUT ====================
+
+    def summary(self):
+        # {series: {count, total_s, p50_s, p95_s, p99_s, max_s}}; percentiles over the recent samples
+        with self._lock:
+            samples = {key: np.array(values) for key, values in self.samples.items()}
+            totals = {key: tuple(total) for key, total in self.totals.items()}
+        result = {}
+        for key, values in samples.items():
+            quantiles = np.quantile(values, QUANTILES) if len(values) else [np.nan] * len(QUANTILES)
+            result[key] = {"count": totals[key][0], "total_s": totals[key][1],
+                           **{f"p{round(q * 100)}_s": float(v) for q, v in zip(QUANTILES, quantiles)},
+                           "max_s": float(values.max()) if len(values) else np.nan}
+        return result
+
+    def prometheus(self):
+        # Text exposition format: a summary per timer series, then counters and gauges
+        lines, typed = [], set()
+        for key, stats in sorted(self.summary().items()):
+            name, _, labels = _prometheus_name(key).partition("{")
+            labels = labels.rstrip("}")
+            if name not in typed:
+                lines.append(f"# TYPE {name}_seconds summary")
+                typed.add(name)
+            for q in QUANTILES:
+                inner = ",".join(filter(None, [labels, f'quantile="{q}"']))
+                lines.append(f"{name}_seconds{{{inner}}} {stats[f'p{round(q * 100)}_s']:.6f}")
+            suffix = "{" + labels + "}" if labels else ""
+            lines.append(f"{name}_seconds_sum{suffix} {stats['total_s']:.6f}")
+            lines.append(f"{name}_seconds_count{suffix} {stats['count']}")
+        with self._lock:
+            values = [(key, value, "counter") for key, value in self.counters.items()]
+            values += [(key, value, "gauge") for key, value in self.gauges.items()]
+        for key, value, kind in sorted(values):
+            name = _prometheus_name(key)
+            if name.partition("{")[0] not in typed:
+                lines.append(f"# TYPE {name.partition('{')[0]} {kind}")
+                typed.add(name.partition("{")[0])
+            lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def _flush_locked(self):
+        events, self._events = self._events, []
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.writelines(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+
+    def flush(self):
+        if not self.path:
+            return
+        if not self._jsonl():
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write(self.prometheus())
+            os.replace(tmp_path, self.path)
+            return
+        with self._lock:
+            if self._events:
+                self._flush_locked()
+
+
+def read_events(path):
+    # Timer events from a JSONL metrics file -> {series: [seconds, ...]}
+    samples = defaultdict(list)
+    if not os.path.exists(path):
+        return samples
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            event = json.loads(line)
+            if event.get("type") == "timer":
+                samples[series(event["name"], event.get("labels"))].append(event["seconds"])
+    return samples
+
+
+def percentiles(samples):
+    # {series: [seconds]} -> rows of count and p50/p95/p99/max in milliseconds, slowest p95 first
+    rows = []
+    for key, values in samples.items():
+        values = np.asarray(values, dtype=np.float64)
+        quantiles = np.quantile(values, QUANTILES) * 1000
+        rows.append({"series": key, "count": len(values),
+                     **{f"p{round(q * 100)} ms": v for q, v in zip(QUANTILES, quantiles)},
+                     "max ms": values.max() * 1000, "total s": values.sum()})
+    return sorted(rows, key=lambda row: -row["p95 ms"])
+
+
+def format_table(rows):
+    lines = [f"{'series':<50} {'count':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'total s':>9}"]
+    lines += [f"{row['series'][:50]:<50} {row['count']:>8,} {row['p50 ms']:>9.2f} {row['p95 ms']:>9.2f} "
+              f"{row['p99 ms']:>9.2f} {row['max ms']:>9.2f} {row['total s']:>9.2f}" for row in rows]
+    return "\n".join(lines)
+
+
+REGISTRY = Registry(os.environ.get(METRICS_ENV), os.environ.get(PROFILE_ENV),
+                    os.environ.get(TRACEMALLOC_ENV, "") not in ("", "0"))
+
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+observe = REGISTRY.observe
+count = REGISTRY.count
+flush = REGISTRY.flush
+atexit.register(flush)
+
+
+def configure(path=None, profile=None, trace_memory=None):
+    # Override the environment settings for this process (e.g. from a --metrics CLI flag)
+    REGISTRY.flush()
+    if path is not None:
+        REGISTRY.path = path
+    if profile is not None:
+        REGISTRY.profile = profile
+    if trace_memory is not None:
+        REGISTRY.trace_memory = trace_memory
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-stage latency percentiles from a JSONL metrics file")
+    parser.add_argument("path", nargs="?", default=os.environ.get(METRICS_ENV, "metrics.jsonl"))
+    args = parser.parse_args()
+
+    print(format_table(percentiles(read_events(args.path))))
@@ -0,0 +1,25 @@
+import importlib
+import sys
+
+
+class LazyModule:
+    # Bound where `import numpy as np` would be. The module is imported on the first attribute access
+    # and its namespace copied in, so later lookups are ordinary attribute reads with no import cost
+
+    def __init__(self, name):
+        self.__dict__["__lazy_name__"] = name
+
+    def __getattr__(self, attr):
+        # Reached only for names not copied in yet: the first access, or ones the module adds later
+        module = importlib.import_module(self.__dict__["__lazy_name__"])
+        self.__dict__.update(vars(module))
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<lazy module {self.__dict__['__lazy_name__']!r}>"
+
+
+def lazy_import(name):
+    # `np = lazy_import("numpy")` instead of `import numpy as np`: nothing is imported until np is used,
+    # so a script's --help (or a page that never touches np) does not pay for it
+    return sys.modules.get(name) or LazyModule(name)
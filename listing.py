@@ -0,0 +1,44 @@
+import math
+
+import streamlit as st
+
+# Rows shown per page of a product listing
+PAGE_SIZE = 25
+PAGE_SIZES = [10, 25, 50, 100]
+
+COLUMNS = ["Product Name", "Price", "Rating", "Value Score"]
+
+COLUMN_CONFIG = {
+    "Product Name": st.column_config.TextColumn("Product Name", width="large"),
+    "Price": st.column_config.NumberColumn("Price", format="₹%.0f"),
+    "Rating": st.column_config.NumberColumn("Rating", format="%.1f ⭐"),
+    "Value Score": st.column_config.ProgressColumn("Value Score", format="%.0f", min_value=0, max_value=100),
+}
+
+
+def product_table(rows):
+    # One grid element for the whole window instead of three columns and a divider per product
+    st.dataframe(rows[[column for column in COLUMNS if column in rows]], column_config=COLUMN_CONFIG, hide_index=True, use_container_width=True)
+
+
+def paginated_listing(fetch, total, key, page_size=PAGE_SIZE):
+    # Renders one page of a result set. fetch(offset, limit) returns just that page's rows, so
+    # nothing outside the visible window is ever built or sent to the browser
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(page_size),
+                                 key=f"{key}_page_size")
+    pages = max(1, math.ceil(total / page_size))
+
+    # A narrower filter can leave the remembered page past the end; start over from the top
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = 1
+    with col2:
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=page_key)
+
+    offset = (page - 1) * page_size
+    rows = fetch(offset, page_size)
+    product_table(rows)
+    st.caption(f"Showing {offset + 1:,}–{offset + len(rows):,} of {total:,} products")
+    return rows
@@ -0,0 +1,163 @@
+import threading
+
+from lazy import lazy_import
+
+bs4 = lazy_import("bs4")
+etree = lazy_import("lxml.etree")
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxTree
+except ImportError:
+    SelectolaxTree = None
+
+
+def _has_class(cls):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+
+# Selectors per site layout; every backend reads the same product grid
+LAYOUTS = {
+    "flipkart": {
+        "card": "div[data-id]",
+        "card_attr": "data-id",
+        "name": ("a", "IxWX8O"),
+        "price": ("div", "hZ3P6w"),
+        "rating": ("div", "MKiFS6"),
+        # Everything after the pagination bar is footer, so parsing can stop here
+        "grid_end": b'<nav class="WSL9JP"',
+    },
+}
+
+
+def _row(product_id, name, price, rating):
+    return {
+        "Product ID": product_id or "N/A",
+        "Product Name": name or "N/A",
+        "Price": price or "N/A",
+        "Rating": rating or "N/A",
+    }
+
+
+def _grid_only(content, layout):
+    # Drop the bytes after the grid; lxml and selectolax both close the open tags themselves
+    end = layout.get("grid_end")
+    if end:
+        cut = content.find(end)
+        if cut != -1:
+            return content[:cut]
+    return content
+
+
+class Bs4Parser:
+    # The original task1.py parse: str decode, html.parser and three page-wide class scans
+
+    def __init__(self, layout):
+        self.layout = layout
+
+    def __call__(self, content):
+        soup = bs4.BeautifulSoup(content, "html.parser")
+
+        # FIND ELEMENTS
+        names = soup.find_all(*self.layout["name"])
+        prices = soup.find_all(*self.layout["price"])
+        ratings = soup.find_all(*self.layout["rating"])
+
+        products = []
+        for i in range(len(names)):
+            products.append(_row(
+                None,
+                names[i].text.strip(),
+                prices[i].text.strip() if i < len(prices) else None,
+                ratings[i].text.strip() if i < len(ratings) else None,
+            ))
+        return products
+
+
+class LxmlParser:
+    # Parses raw bytes with precompiled XPath, one card at a time
+
+    def __init__(self, layout, early_stop=True):
+        self.layout = layout
+        self.early_stop = early_stop
+        tag, attr = layout["card"].rstrip("]").split("[")
+        self._card_xpath = f"//{tag}[@{attr}]"
+        self._field_xpaths = [
+            f"(.//{tag}[{_has_class(cls)}])[1]"
+            for tag, cls in (layout["name"], layout["price"], layout["rating"])
+        ]
+        # lxml parsers and XPath evaluators must not be shared between crawler threads
+        self._local = threading.local()
+
+    def _compiled(self):
+        local = self._local
+        if not hasattr(local, "parser"):
+            local.parser = etree.HTMLParser(remove_blank_text=True, remove_comments=True, encoding="utf-8")
+            local.cards = etree.XPath(self._card_xpath)
+            local.fields = [etree.XPath(xpath) for xpath in self._field_xpaths]
+        return local
+
+    def __call__(self, content):
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        if self.early_stop:
+            content = _grid_only(content, self.layout)
+
+        compiled = self._compiled()
+        root = etree.fromstring(content, compiled.parser)
+        if root is None:
+            return []
+
+        products = []
+        for card in compiled.cards(root):
+            name, price, rating = (
+                " ".join(found[0].xpath("string()").split()) if found else None
+                for found in (field(card) for field in compiled.fields)
+            )
+            products.append(_row(card.get(self.layout["card_attr"]), name, price, rating))
+        return products
+
+
+class SelectolaxParser:
+    # Optional backend: only registered when selectolax is installed
+
+    def __init__(self, layout, early_stop=True):
+        self.layout = layout
+        self.early_stop = early_stop
+        self._selectors = [f"{tag}.{cls}" for tag, cls in (layout["name"], layout["price"], layout["rating"])]
+
+    def __call__(self, content):
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        if self.early_stop:
+            content = _grid_only(content, self.layout)
+
+        tree = SelectolaxTree(content)
+        products = []
+        for card in tree.css(self.layout["card"]):
+            name, price, rating = (
+                " ".join(found.text().split()) if found is not None else None
+                for found in (card.css_first(selector) for selector in self._selectors)
+            )
+            products.append(_row(card.attributes.get(self.layout["card_attr"]), name, price, rating))
+        return products
+
+
+BACKENDS = {"bs4": Bs4Parser, "lxml": LxmlParser}
+if SelectolaxTree is not None:
+    BACKENDS["selectolax"] = SelectolaxParser
+
+_cache = {}
+
+
+def get_parser(backend="lxml", layout="flipkart"):
+    # Parsers hold compiled selectors, so build each (backend, layout) pair once
+    key = (backend, layout)
+    if key not in _cache:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown parser backend {backend!r}; available: {', '.join(BACKENDS)}")
+        _cache[key] = BACKENDS[backend](LAYOUTS[layout])
+    return _cache[key]
+
+
+def parse(content, backend="lxml", layout="flipkart"):
+    return get_parser(backend, layout)(content)
@@ -0,0 +1,67 @@
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+class ProductIndex:
+    # Read-only query index over the cleaned frame for the Best Budget and Top Rated pages.
+    # Rows are ordered once by rating (descending) and, within each rating, by price (ascending);
+    # every distinct rating is then a contiguous price-sorted bucket, so a (max price, min rating)
+    # filter is a binary search per bucket and costs O(buckets * log n + results)
+
+    def __init__(self, df):
+        self.df = df
+        price = df["Price"].to_numpy(dtype=np.float32, na_value=np.nan)
+        rating = df["Rating"].to_numpy(dtype=np.float32, na_value=np.nan)
+
+        rows = np.flatnonzero(~np.isnan(price) & ~np.isnan(rating))
+        self.order = rows[np.lexsort((price[rows], -rating[rows]))]
+        self.price = price[self.order]
+
+        self.rating = rating[self.order]
+        starts = np.flatnonzero(np.r_[True, self.rating[1:] != self.rating[:-1]]) if len(rows) else np.empty(0, int)
+        self.ratings = self.rating[starts]
+        self.bounds = np.r_[starts, len(self.order)]
+
+    def __len__(self):
+        return len(self.order)
+
+    def _ranges(self, max_price, min_rating):
+        # (start, stop) into self.order for each rating bucket at or above min_rating
+        buckets = np.searchsorted(-self.ratings, -np.float32(min_rating), side="right")
+        ranges = []
+        for b in range(buckets):
+            lo, hi = self.bounds[b], self.bounds[b + 1]
+            ranges.append((lo, lo + np.searchsorted(self.price[lo:hi], np.float32(max_price), side="right")))
+        return ranges
+
+    def count_budget(self, max_price, min_rating):
+        return int(sum(stop - start for start, stop in self._ranges(max_price, min_rating)))
+
+    def best_budget(self, max_price, min_rating, limit=None, offset=0):
+        # Rows with Price <= max_price and Rating >= min_rating, best rated first (cheapest first on ties);
+        # offset/limit cut one page out of the ranges without building the rows around it
+        positions = []
+        remaining = np.inf if limit is None else limit
+        for start, stop in self._ranges(max_price, min_rating):
+            if remaining <= 0:
+                break
+            skip = min(offset, stop - start)
+            offset -= skip
+            start += skip
+            stop = int(min(stop, start + remaining))
+            positions.append(self.order[start:stop])
+            remaining -= stop - start
+        positions = np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
+        return self.df.iloc[positions]
+
+    def budget_points(self, max_price, min_rating):
+        # Price and rating arrays of the same rows, for plotting without building a frame
+        ranges = self._ranges(max_price, min_rating)
+        if not ranges:
+            return np.empty(0, np.float32), np.empty(0, np.float32)
+        return (np.concatenate([self.price[start:stop] for start, stop in ranges]),
+                np.concatenate([self.rating[start:stop] for start, stop in ranges]))
+
+    def top_rated(self, n):
+        return self.df.iloc[self.order[:n]]
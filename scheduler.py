@@ -0,0 +1,502 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import aggregates
+import alerts
+import cleaned_data
+import parsers
+import value_score
+from catalogue import CATALOGUE_DIR, DEFAULT_SITE, Catalogue, slug
+from change_detect import ingest_scrape
+from cleaning import clean_csv
+from history_store import HISTORY_DIR, to_observations
+from http_cache import HttpCache
+from lazy import lazy_import
+from scraper import SITES, Crawler
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+SCHEDULE_FILE = "schedule.json"
+STATE_DB = "scheduler.sqlite"
+SCRAPE_DIR = "scrapes"
+
+# Kept next to each cleaned CSV: the fingerprint of the raw file its last finished clean read
+CLEAN_RECORD_SUFFIX = ".source.json"
+
+# Minutes between scrapes of a query unless its schedule entry says otherwise
+DEFAULT_EVERY = 60
+
+# Every scrape is followed by these stages in order; a stage that finds nothing new ends the chain
+STAGES = ["scrape", "ingest", "clean", "publish"]
+
+# Stages that write shared state (price history, entity index) run one at a time
+EXCLUSIVE = {"ingest", "publish"}
+
+# A failed job is retried after RETRY_DELAY, doubling each time, up to MAX_ATTEMPTS runs in total
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 30.0
+
+# Seconds the daemon waits for a job to finish before looking for due work again
+POLL_SECONDS = 1.0
+
+# Latency percentiles cover this many recently finished jobs per stage
+METRICS_WINDOW = 500
+
+# Finished jobs older than this are dropped when the scheduler starts
+KEEP_DAYS = 7
+
+
+def load_schedule(path=SCHEDULE_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_schedule(schedule, path=SCHEDULE_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(schedule, file, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def entry_paths(entry, out_dir=SCRAPE_DIR):
+    # Raw and cleaned files of one query. Its products are published to the category's catalogue shard;
+    # an entry that points "cleaned" at the dashboard's own CSV also gets the flat dashboard artifact
+    name = slug(entry["query"])
+    cleaned = entry.get("cleaned")
+    return {
+        "raw": entry.get("raw") or os.path.join(out_dir, f"{name}.csv"),
+        "cleaned": cleaned or os.path.join(out_dir, f"{name}_cleaned.csv"),
+        "artifact": entry.get("artifact") or (os.path.splitext(cleaned)[0] + ".arrow" if cleaned else None),
+    }
+
+
+def _digest(path):
+    if not os.path.exists(path):
+        return None
+    sha = hashlib.sha1()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+# ==================== STAGES ====================
+# Each stage runs in a worker process: it takes the job's params and returns a JSON-able result.
+# {"changed": False} means its output is the same as last time, so the following stages are not queued
+
+def run_scrape(params):
+    cache = HttpCache(params["cache_dir"]) if params.get("cache_dir") else None
+    crawler = Crawler(workers=params["threads"], rate=params.get("rate"), base_url=params["base_url"], cache=cache)
+    parse = parsers.get_parser("lxml", SITES[params["site"]]["layout"])
+    try:
+        results = sorted(crawler.crawl([params["query"]], params["pages"], parse), key=lambda result: result.page)
+    finally:
+        crawler.close()
+    ok = [result for result in results if result.error is None and result.status is not None and result.status < 400]
+    if not ok:
+        errors = {result.error or f"status {result.status}" for result in results}
+        raise RuntimeError(f"every page of {params['query']!r} failed: {', '.join(sorted(errors))}")
+
+    # The raw file is only replaced when the listing changed, so later stages can tell by its mtime
+    raw = params["raw"]
+    os.makedirs(os.path.dirname(raw) or ".", exist_ok=True)
+    tmp_path = raw + ".tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=["Product Name", "Price", "Rating"], extrasaction="ignore")
+        writer.writeheader()
+        for result in ok:
+            writer.writerows(result.products)
+    changed = _digest(tmp_path) != _digest(raw)
+    if changed:
+        os.replace(tmp_path, raw)
+    else:
+        os.remove(tmp_path)
+    return {"products": sum(len(result.products) for result in ok), "pages": len(ok),
+            "failed_pages": len(results) - len(ok), "requests": crawler.stats["requests"],
+            "raw_changed": changed, "scraped_at": time.time()}
+
+
+def run_ingest(params):
+    # Same steps as change_detect.py: changed rows into the history, then trends, sketches and alerts.
+    # Runs even for an unchanged listing, so the history gets its heartbeat rows
+    observations = to_observations(pd.read_csv(params["raw"], dtype=str),
+                                   pd.Timestamp(params["scraped_at"], unit="s", tz="UTC"))
+    _, report, fired = ingest_scrape(observations, params["root"], rules=alerts.load_rules(params["rules"]),
+                                     sinks=[alerts.JsonlSink(params["alerts"])])
+    return {"stored": report["stored"], "new": report["new"], "changed_rows": report["changed"],
+            "alerts": len(fired)}
+
+
+def run_clean(params):
+    # Skipped only when a finished clean of this exact raw file is on record. The record is written
+    # after clean_csv has replaced the cleaned CSV, so a run that failed midway is cleaned again
+    raw, cleaned = params["raw"], params["cleaned"]
+    record = cleaned + CLEAN_RECORD_SUFFIX
+    source = cleaned_data.source_fingerprint(raw)
+    if os.path.exists(cleaned) and _read_record(record) == source:
+        return {"skipped": True, "changed": False}
+    os.makedirs(os.path.dirname(cleaned) or ".", exist_ok=True)
+    stats = clean_csv(raw, cleaned)
+    tmp_path = record + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(source, file)
+    os.replace(tmp_path, record)
+    return {"rows_in": stats["rows_in"], "rows_out": stats["rows_out"]}
+
+
+def _read_record(path):
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def run_publish(params):
+    # Catalogue shard (and the flat artifact, if asked for) plus page summaries and value scores, so
+    # the first dashboard load after a scrape is warm. Scores re-rank only brands whose listings changed
+    cleaned, artifact = params["cleaned"], params["artifact"]
+    site, category = params["site"], params["category"]
+    shards = Catalogue(params["catalogue"])
+    result = {}
+    if not shards.is_current(site, category, cleaned):
+        result["rows"] = shards.publish(cleaned, site, category)
+        df, version = shards.load(site, category), shards.version(site, category)
+        aggregates.load(df, version, shards.summaries_path(site, category))
+        value_score.load(df, version, shards.scores_path(site, category))
+    if artifact and not cleaned_data.is_current(artifact, cleaned):
+        result["artifact_rows"] = cleaned_data.write_artifact(cleaned, artifact)
+        df, version = cleaned_data.load(cleaned, artifact), cleaned_data.data_version(cleaned, artifact)
+        aggregates.load(df, version, os.path.splitext(artifact)[0] + ".aggregates.pkl")
+        value_score.load(df, version, value_score.state_path(artifact))
+    return result or {"skipped": True, "changed": False}
+
+
+RUNNERS = {"scrape": run_scrape, "ingest": run_ingest, "clean": run_clean, "publish": run_publish}
+
+
+def _percentiles(values):
+    if not values:
+        return None, None
+    p50, p95 = np.percentile(values, [50, 95])
+    return round(float(p50), 3), round(float(p95), 3)
+
+
+class Scheduler:
+    # Turns each scheduled query into a chain of queued jobs (scrape -> ingest -> clean -> publish)
+    # run on a bounded pool of worker processes. Jobs and due times live in SQLite, so a restarted
+    # daemon resumes queued work and does not scrape again before a query is due
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY,
+        chain INTEGER,
+        query TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        status TEXT NOT NULL,
+        params TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        enqueued_at REAL NOT NULL,
+        run_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, run_at);
+    CREATE INDEX IF NOT EXISTS jobs_stage ON jobs (stage, finished_at);
+    CREATE TABLE IF NOT EXISTS queries (
+        query TEXT PRIMARY KEY,
+        next_due REAL NOT NULL,
+        overlaps INTEGER NOT NULL DEFAULT 0
+    );
+    """
+
+    def __init__(self, schedule, db=STATE_DB, workers=2, out_dir=SCRAPE_DIR, root=HISTORY_DIR, base_url=None,
+                 cache_dir=None, rules=alerts.RULES_FILE, alerts_file=alerts.ALERTS_FILE, catalogue=CATALOGUE_DIR,
+                 max_attempts=MAX_ATTEMPTS, retry_delay=RETRY_DELAY, clock=time.time):
+        self.schedule = {entry["query"]: entry for entry in schedule}
+        self.workers = workers
+        self.out_dir = out_dir
+        self.root = root
+        self.base_url = base_url
+        self.cache_dir = cache_dir
+        self.rules = rules
+        self.alerts_file = alerts_file
+        self.catalogue = catalogue
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.pool = None
+        self.inflight = {}
+
+        self._db = sqlite3.connect(db)
+        self._db.executescript(self.SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def recover(self):
+        # Called when the daemon starts: jobs that were running when the last one stopped start over
+        with self._db:
+            self._db.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+            self._db.execute("DELETE FROM jobs WHERE finished_at < ? AND status IN ('done', 'skipped', 'failed')",
+                             (self.clock() - KEEP_DAYS * 86_400,))
+
+    def _scrape_params(self, entry):
+        site = entry.get("site", DEFAULT_SITE)
+        return {
+            "query": entry["query"],
+            "site": site,
+            "category": entry.get("category", entry["query"]),
+            "pages": int(entry.get("pages", 1)),
+            "threads": int(entry.get("threads", 4)),
+            "rate": entry.get("rate"),
+            "base_url": entry.get("base_url") or self.base_url or SITES[site]["base_url"],
+            "cache_dir": self.cache_dir,
+            "catalogue": self.catalogue,
+            "root": self.root,
+            "rules": self.rules,
+            "alerts": self.alerts_file,
+            **entry_paths(entry, self.out_dir),
+        }
+
+    def _enqueue(self, query, stage, params, now, chain=None):
+        cursor = self._db.execute(
+            "INSERT INTO jobs (chain, query, stage, status, params, enqueued_at, run_at) "
+            "VALUES (?, ?, ?, 'queued', ?, ?, ?)", (chain, query, stage, json.dumps(params), now, now))
+        if chain is None:
+            self._db.execute("UPDATE jobs SET chain = id WHERE id = ?", (cursor.lastrowid,))
+        return cursor.lastrowid
+
+    def enqueue_due(self, now=None):
+        # A scrape for every query whose time has come, unless its previous chain is still in the queue
+        now = self.clock() if now is None else now
+        due = dict(self._db.execute("SELECT query, next_due FROM queries"))
+        busy = {query for (query,) in self._db.execute(
+            "SELECT DISTINCT query FROM jobs WHERE status IN ('queued', 'running')")}
+        added = 0
+        with self._db:
+            for query, entry in self.schedule.items():
+                next_due = due.get(query, now)
+                if now < next_due:
+                    continue
+                # Runs missed while the daemon was down are not made up; the next one stays on the cadence
+                every = float(entry.get("every_minutes", DEFAULT_EVERY)) * 60
+                next_due += (int((now - next_due) // every) + 1) * every
+                overlap = query in busy
+                self._db.execute(
+                    "INSERT INTO queries (query, next_due, overlaps) VALUES (?, ?, ?) ON CONFLICT (query) "
+                    "DO UPDATE SET next_due = excluded.next_due, overlaps = overlaps + excluded.overlaps",
+                    (query, next_due, int(overlap)))
+                if not overlap:
+                    self._enqueue(query, "scrape", self._scrape_params(entry), now)
+                    added += 1
+        return added
+
+    def dispatch(self, now=None):
+        # Start ready jobs in queue order while worker slots are free
+        now = self.clock() if now is None else now
+        free = self.workers - len(self.inflight)
+        if free <= 0:
+            return 0
+        running = {stage for _, stage in self.inflight.values()}
+        ready = self._db.execute(
+            "SELECT id, stage, params FROM jobs WHERE status = 'queued' AND run_at <= ? ORDER BY run_at, id",
+            (now,)).fetchall()
+        started = 0
+        with self._db:
+            for job_id, stage, params in ready:
+                if started == free:
+                    break
+                if stage in EXCLUSIVE and stage in running:
+                    continue
+                future = self.pool.submit(RUNNERS[stage], json.loads(params))
+                self.inflight[future] = (job_id, stage)
+                running.add(stage)
+                self._db.execute("UPDATE jobs SET status = 'running', started_at = ?, attempts = attempts + 1 "
+                                 "WHERE id = ?", (now, job_id))
+                started += 1
+        return started
+
+    def collect(self, timeout=None):
+        # Record finished jobs and queue the next stage of their chain
+        if not self.inflight:
+            return 0
+        done, _ = wait(list(self.inflight), timeout=timeout, return_when=FIRST_COMPLETED)
+        now = self.clock()
+        with self._db:
+            for future in done:
+                job_id, stage = self.inflight.pop(future)
+                chain, query, params, attempts = self._db.execute(
+                    "SELECT chain, query, params, attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if attempts < self.max_attempts:
+                        self._db.execute("UPDATE jobs SET status = 'queued', error = ?, run_at = ? WHERE id = ?",
+                                         (repr(e), now + self.retry_delay * 2 ** (attempts - 1), job_id))
+                    else:
+                        self._db.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                                         (repr(e), now, job_id))
+                    continue
+                status = "skipped" if result.get("skipped") else "done"
+                self._db.execute("UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE id = ?",
+                                 (status, json.dumps(result), now, job_id))
+                position = STAGES.index(stage)
+                if result.get("changed", True) and position + 1 < len(STAGES):
+                    self._enqueue(query, STAGES[position + 1], {**json.loads(params), **result}, now, chain)
+        return len(done)
+
+    def pending(self):
+        return self._db.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+
+    def run(self, until_idle=False, duration=None, poll=POLL_SECONDS, metrics_file=None):
+        # until_idle: stop once nothing is queued or running (one pass over what is due now);
+        # duration: stop after this many seconds, letting running jobs finish
+        stop_at = None if duration is None else time.monotonic() + duration
+        self.recover()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            self.pool = pool
+            try:
+                while True:
+                    self.enqueue_due()
+                    self.dispatch()
+                    if metrics_file:
+                        self.write_metrics(metrics_file)
+                    if until_idle and not self.pending():
+                        break
+                    if stop_at is not None and time.monotonic() >= stop_at:
+                        break
+                    if self.inflight:
+                        self.collect(poll)
+                    else:
+                        time.sleep(poll)
+                while self.inflight:
+                    self.collect()
+            finally:
+                self.pool = None
+        if metrics_file:
+            self.write_metrics(metrics_file)
+
+    # ==================== METRICS ====================
+
+    def metrics(self, now=None):
+        now = self.clock() if now is None else now
+        queued, ready, running, oldest = self._db.execute(
+            "SELECT SUM(status = 'queued'), SUM(status = 'queued' AND run_at <= ?), SUM(status = 'running'), "
+            "MIN(CASE WHEN status = 'queued' THEN run_at END) FROM jobs", (now,)).fetchone()
+        metrics = {
+            "queue": {"queued": queued or 0, "ready": ready or 0, "running": running or 0,
+                      "oldest_wait_s": round(max(0.0, now - oldest), 3) if oldest is not None else None},
+            "stages": {},
+        }
+        totals = {}
+        for stage, status, count in self._db.execute("SELECT stage, status, COUNT(*) FROM jobs GROUP BY stage, status"):
+            totals.setdefault(stage, {})[status] = count
+        for stage in STAGES:
+            # Wait is measured from when the job became runnable, so retry back-off does not count
+            rows = self._db.execute(
+                "SELECT started_at - run_at, finished_at - started_at FROM jobs WHERE stage = ? AND status != 'failed' "
+                "AND finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT ?", (stage, METRICS_WINDOW)).fetchall()
+            wait_p50, wait_p95 = _percentiles([row[0] for row in rows])
+            run_p50, run_p95 = _percentiles([row[1] for row in rows])
+            metrics["stages"][stage] = {**{status: totals.get(stage, {}).get(status, 0)
+                                           for status in ("queued", "running", "done", "skipped", "failed")},
+                                        "wait_p50_s": wait_p50, "wait_p95_s": wait_p95,
+                                        "run_p50_s": run_p50, "run_p95_s": run_p95}
+
+        # Scrape enqueued -> last stage of the chain finished, for chains with nothing left to run
+        chains = self._db.execute(
+            "SELECT MAX(finished_at) - MIN(enqueued_at) FROM jobs GROUP BY chain "
+            "HAVING SUM(status IN ('queued', 'running')) = 0 AND SUM(status = 'failed') = 0 "
+            "ORDER BY MAX(finished_at) DESC LIMIT ?", (METRICS_WINDOW,)).fetchall()
+        chain_p50, chain_p95 = _percentiles([row[0] for row in chains])
+        metrics["chain"] = {"p50_s": chain_p50, "p95_s": chain_p95}
+        metrics["queries"] = {query: {"due_in_s": round(next_due - now, 1), "overlaps": overlaps}
+                              for query, next_due, overlaps in self._db.execute("SELECT * FROM queries")}
+        return metrics
+
+    def write_metrics(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.metrics(), file, indent=1)
+        os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape -> clean -> publish on a schedule, as queued jobs")
+    parser.add_argument("--schedule", default=SCHEDULE_FILE)
+    parser.add_argument("--db", default=STATE_DB)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="scrape a query every N minutes")
+    add.add_argument("query")
+    add.add_argument("--pages", type=int, default=1)
+    add.add_argument("--every", type=float, default=DEFAULT_EVERY, help="minutes between scrapes")
+    add.add_argument("--category", default=None, help="catalogue category (defaults to the query)")
+    add.add_argument("--site", default=DEFAULT_SITE, choices=sorted(SITES))
+    add.add_argument("--cleaned", default=None, help="also publish to this flat cleaned CSV (e.g. ecommerce_data_cleaned.csv)")
+    add.add_argument("--base-url", default=None)
+
+    commands.add_parser("list")
+    remove = commands.add_parser("remove")
+    remove.add_argument("query")
+
+    run = commands.add_parser("run", help="run the scheduler daemon")
+    run.add_argument("--workers", type=int, default=2, help="worker processes")
+    run.add_argument("--once", action="store_true", help="run what is due now, then exit")
+    run.add_argument("--out-dir", default=SCRAPE_DIR)
+    run.add_argument("--root", default=HISTORY_DIR)
+    run.add_argument("--base-url", default=None, help="send every query here instead of its site's search URL")
+    run.add_argument("--catalogue", default=CATALOGUE_DIR)
+    run.add_argument("--cache-dir", default=None, help="share an on-disk HTTP cache between scrapes")
+    run.add_argument("--metrics-file", default=None, help="keep queue depth and job latencies in this JSON file")
+
+    commands.add_parser("status", help="queue depth, job latencies and when each query is due")
+    args = parser.parse_args()
+
+    schedule = load_schedule(args.schedule)
+    if args.command == "add":
+        entry = {"query": args.query, "pages": args.pages, "every_minutes": args.every,
+                 "site": args.site, "category": args.category or args.query}
+        if args.cleaned:
+            entry["cleaned"] = args.cleaned
+        if args.base_url:
+            entry["base_url"] = args.base_url
+        save_schedule([e for e in schedule if e["query"] != args.query] + [entry], args.schedule)
+        print(f"✅ {args.query!r}: {args.pages} pages every {args.every:g} minutes")
+    elif args.command == "list":
+        for entry in schedule:
+            print(f"{entry['query']!r:<30} {entry.get('pages', 1):>3} pages every "
+                  f"{entry.get('every_minutes', DEFAULT_EVERY):g} min -> "
+                  f"{entry.get('site', DEFAULT_SITE)}/{slug(entry.get('category', entry['query']))}")
+    elif args.command == "remove":
+        save_schedule([e for e in schedule if e["query"] != args.query], args.schedule)
+        print(f"✅ Removed {args.query!r}")
+    elif args.command == "run":
+        scheduler = Scheduler(schedule, args.db, args.workers, args.out_dir, args.root, args.base_url, args.cache_dir,
+                              catalogue=args.catalogue)
+        print(f"Scheduling {len(schedule)} queries on {args.workers} workers")
+        try:
+            scheduler.run(until_idle=args.once, metrics_file=args.metrics_file)
+            stages = scheduler.metrics()["stages"]
+            print("✅ " + ", ".join(f"{stage}: {counts['done']} done, {counts['skipped']} skipped, "
+                                   f"{counts['failed']} failed" for stage, counts in stages.items()))
+        except KeyboardInterrupt:
+            print("Stopped; queued and interrupted jobs resume on the next start")
+        finally:
+            scheduler.close()
+    elif args.command == "status":
+        scheduler = Scheduler(schedule, args.db)
+        print(json.dumps(scheduler.metrics(), indent=1, ensure_ascii=False))
+        scheduler.close()
@@ -0,0 +1,248 @@
+import argparse
+import csv
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode, urlsplit
+
+import instrument
+import parsers
+from http_cache import HttpCache
+from lazy import lazy_import
+
+requests = lazy_import("requests")
+
+BASE_URL = "https://www.flipkart.com/search"
+SEARCH_URL = BASE_URL + "?q=wireless+earbuds"
+
+# STRONG HEADERS to bypass basic blocking
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive"
+}
+
+# Sites the crawler knows: search endpoint and the parsers.LAYOUTS entry for its result pages. The first
+# one is the default, matching catalogue.DEFAULT_SITE
+SITES = {
+    "flipkart": {"base_url": BASE_URL, "layout": "flipkart"},
+}
+
+# Status codes worth another attempt (throttling and transient server errors)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+PageResult = namedtuple("PageResult", ["query", "page", "url", "status", "products", "elapsed", "size", "error"])
+
+
+def search_url(query, page=1, base_url=BASE_URL):
+    params = {"q": query}
+    if page > 1:
+        params["page"] = page
+    return base_url + "?" + urlencode(params)
+
+
+def parse_products(content, backend="lxml"):
+    return parsers.parse(content, backend)
+
+
+class HostLimiter:
+    # Caps in-flight requests and request starts per second for every host
+
+    def __init__(self, max_concurrency=4, rate=None):
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _state(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = [threading.BoundedSemaphore(self.max_concurrency), 0.0]
+            return self._hosts[host]
+
+    @contextmanager
+    def slot(self, url):
+        state = self._state(urlsplit(url).netloc)
+        state[0].acquire()
+        try:
+            if self.rate:
+                # Reserve the next start time for this host, then sleep until it
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, state[1])
+                    state[1] = start + 1.0 / self.rate
+                if start > now:
+                    time.sleep(start - now)
+            yield
+        finally:
+            state[0].release()
+
+
+class Crawler:
+    def __init__(self, workers=8, per_host=4, rate=None, retries=3, backoff=0.5,
+                 timeout=15, base_url=BASE_URL, headers=None, session=None, cache=None):
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.base_url = base_url
+        self.cache = cache
+        self.limiter = HostLimiter(per_host, rate)
+
+        # One session for every worker so keep-alive connections are reused
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        session.headers.update(headers or HEADERS)
+        self.session = session
+
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "bytes": 0}
+
+    def _count(self, **counts):
+        with self._stats_lock:
+            for key, value in counts.items():
+                self.stats[key] += value
+        for key, value in counts.items():
+            instrument.count(f"scraper.{key}", value)
+
+    def _delay(self, attempt, response=None):
+        # Honour Retry-After when the server sends one, otherwise exponential backoff with jitter
+        if response is not None and "Retry-After" in response.headers:
+            value = response.headers["Retry-After"]
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    def _get(self, url, headers=None):
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                with self.limiter.slot(url):
+                    self._count(requests=1)
+                    with instrument.timer("scraper.fetch"):
+                        response = self.session.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS:
+                    self._count(bytes=len(response.content))
+                    return response
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            if attempt == self.retries:
+                return response
+            self._count(retries=1)
+            time.sleep(self._delay(attempt, response))
+
+    def fetch(self, url):
+        if self.cache is None:
+            return self._get(url)
+
+        # Fresh entries skip the network; stale ones are revalidated with a conditional request
+        entry = self.cache.lookup(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            return self.cache.hit(entry)
+
+        response = self._get(url, self.cache.validators(entry))
+        if response.status_code == 304 and entry is not None:
+            return self.cache.revalidated(entry, response)
+        if response.status_code == 200:
+            self.cache.store(url, response)
+        return response
+
+    def _crawl_page(self, query, page, parse):
+        url = search_url(query, page, self.base_url)
+        started = time.perf_counter()
+        try:
+            response = self.fetch(url)
+        except requests.RequestException as e:
+            self._count(failures=1)
+            return PageResult(query, page, url, None, [], time.perf_counter() - started, 0, str(e))
+
+        with instrument.timer("scraper.parse"):
+            products = parse(response.content) if response.ok else []
+        if not response.ok:
+            self._count(failures=1)
+        return PageResult(query, page, url, response.status_code, products,
+                          time.perf_counter() - started, len(response.content), None)
+
+    def crawl(self, queries, pages=1, parse=parse_products):
+        # pages: number of pages, an iterable of page numbers, or a dict of query -> either
+        jobs = []
+        for query in queries:
+            query_pages = pages.get(query, 1) if isinstance(pages, dict) else pages
+            if isinstance(query_pages, int):
+                query_pages = range(1, query_pages + 1)
+            jobs.extend((query, page) for page in query_pages)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._crawl_page, query, page, parse) for query, page in jobs]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def close(self):
+        self.session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl Flipkart search pages for several queries in parallel")
+    parser.add_argument("queries", nargs="+")
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-host", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=None, help="max requests/sec per host")
+    parser.add_argument("--site", default=next(iter(SITES)), choices=sorted(SITES))
+    parser.add_argument("--base-url", default=None, help="overrides the site's search URL")
+    parser.add_argument("--parser", default="lxml", choices=sorted(parsers.BACKENDS))
+    parser.add_argument("--cache-dir", default=None, help="keep an on-disk HTTP cache here")
+    parser.add_argument("--cache-ttl", type=float, default=3600, help="seconds before a cached page is revalidated")
+    parser.add_argument("--out", default="ecommerce_data.csv")
+    parser.add_argument("--catalogue", default=None,
+                        help="also clean each query into its own category shard of this catalogue")
+    args = parser.parse_args()
+
+    site = SITES[args.site]
+    cache = HttpCache(args.cache_dir, ttl=args.cache_ttl) if args.cache_dir else None
+    crawler = Crawler(workers=args.workers, per_host=args.per_host, rate=args.rate,
+                      base_url=args.base_url or site["base_url"], cache=cache)
+    started = time.perf_counter()
+
+    by_query = {query: [] for query in args.queries}
+    with open(args.out, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=["Product Name", "Price", "Rating"], extrasaction="ignore")
+        writer.writeheader()
+        for result in crawler.crawl(args.queries, args.pages, parsers.get_parser(args.parser, site["layout"])):
+            print(f"{result.query!r} page {result.page}: status {result.status}, {len(result.products)} products")
+            writer.writerows(result.products)
+            by_query[result.query].extend(result.products)
+
+    crawler.close()
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ {crawler.stats['requests']} requests in {elapsed:.2f}s "
+          f"({crawler.stats['retries']} retries, {crawler.stats['failures']} failures)")
+    print(f"✅ Data saved to {args.out}")
+
+    if args.catalogue:
+        # One raw file per query, each cleaned into the shard of its category. Imported only here:
+        # catalogue pulls in pyarrow and the cleaning pipeline, which a plain crawl never needs
+        import catalogue
+        for query, products in by_query.items():
+            raw = f"{os.path.splitext(args.out)[0]}_{catalogue.slug(query)}.csv"
+            with open(raw, "w", newline="", encoding="utf-8") as file:
+                writer = csv.DictWriter(file, fieldnames=["Product Name", "Price", "Rating"], extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(products)
+            stats = catalogue.publish_raw(raw, args.site, query, args.catalogue)
+            print(f"✅ {query!r}: {stats['rows_published']:,} products in the {args.catalogue}/ catalogue")
@@ -0,0 +1,296 @@
+import argparse
+import os
+import time
+
+from entity_resolution import BrandMatcher
+from history_store import HISTORY_DIR, HistoryStore, state_path
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+pq = lazy_import("pyarrow.parquet")
+
+SKETCH_DIR = "sketches"
+
+METRICS = ["price", "rating"]
+
+# Prices go into log-spaced buckets, so every price quantile is within this fraction of the exact value
+RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+MIN_PRICE = 1.0
+
+# Ratings are scraped with one decimal, so 0.1-wide bins keep them exactly
+RATING_STEP = 0.1
+
+# HyperLogLog registers per (day, brand); distinct counts have a standard error of 1.04 / sqrt(2 ** HLL_BITS)
+HLL_BITS = 10
+HLL_REGISTERS = 2 ** HLL_BITS
+
+QUANTILES = [0.25, 0.5, 0.75, 0.95]
+
+_KEYS = ["day", "brand", "metric"]
+
+
+def to_buckets(metric, values):
+    if metric == "price":
+        return np.ceil(np.log(np.maximum(values, MIN_PRICE)) / np.log(_GAMMA)).astype(np.int32)
+    return np.rint(values / RATING_STEP).astype(np.int32)
+
+
+def bucket_values(metric, buckets):
+    # Value that stands for a whole bucket: within RELATIVE_ACCURACY of anything in a price bucket
+    if metric == "price":
+        return 2 * _GAMMA ** buckets.astype(np.float64) / (_GAMMA + 1)
+    return buckets * RATING_STEP
+
+
+def error_bound(metric):
+    # (bound, kind) of every quantile the sketch returns
+    if metric == "price":
+        return RELATIVE_ACCURACY, "relative"
+    return RATING_STEP / 2, "absolute"
+
+
+def hll_ranks(ids):
+    # (register, rank) per ID: the top HLL_BITS of a 64-bit hash pick the register, and the rank is the
+    # position of the first 1-bit in the next 32
+    hashes = pd.util.hash_array(np.asarray(ids, dtype=object), categorize=True)
+    register = (hashes >> np.uint64(64 - HLL_BITS)).astype(np.int32)
+    rest = (hashes << np.uint64(HLL_BITS)) >> np.uint64(32)
+    return register, (33 - np.frexp(rest.astype(np.float64))[1]).astype(np.uint8)
+
+
+def hll_estimate(registers):
+    m = len(registers)
+    raw = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.exp2(-registers.astype(np.float64)))
+    zeros = np.count_nonzero(registers == 0)
+    if raw <= 2.5 * m and zeros:
+        return m * np.log(m / zeros)
+    return raw
+
+
+class SketchStore:
+    # Mergeable summaries of the price history per (day, brand): exact moments, fixed-bin histograms
+    # (log-spaced for price) and HyperLogLog registers for distinct products. Each ingest folds in only
+    # its new rows; a query merges the selected days and brands without touching the history itself
+
+    def __init__(self, path=state_path(HISTORY_DIR, SKETCH_DIR), matcher=None):
+        self.path = path
+        self.matcher = matcher or BrandMatcher()
+        self.moments = pd.DataFrame({"day": pd.Series(dtype="datetime64[ns]"), "brand": pd.Series(dtype=object),
+                                     "metric": pd.Series(dtype=object), "n": pd.Series(dtype=np.int64),
+                                     "sum": pd.Series(dtype=np.float64), "sum_sq": pd.Series(dtype=np.float64),
+                                     "min": pd.Series(dtype=np.float64), "max": pd.Series(dtype=np.float64)})
+        self.bins = pd.DataFrame({"day": pd.Series(dtype="datetime64[ns]"), "brand": pd.Series(dtype=object),
+                                  "metric": pd.Series(dtype=object), "bucket": pd.Series(dtype=np.int32),
+                                  "count": pd.Series(dtype=np.int64)})
+        self.hll_keys = pd.DataFrame({"day": pd.Series(dtype="datetime64[ns]"), "brand": pd.Series(dtype=object)})
+        self.hll = np.zeros((0, HLL_REGISTERS), np.uint8)
+        self.totals = {"rows": 0, "updates": 0, "seconds": 0.0}
+        if path and os.path.exists(os.path.join(path, "moments.parquet")):
+            self._read(path)
+
+    def __len__(self):
+        return len(self.hll_keys)
+
+    # ==================== INGEST ====================
+
+    def update(self, observations):
+        # History rows (pandas or Arrow, history_store.history_schema() columns) -> merged into their day's sketches
+        started = time.perf_counter()
+        if isinstance(observations, pa.Table):
+            observations = observations.to_pandas()
+        if not len(observations):
+            return 0
+        day = pd.to_datetime(observations["ts"], utc=True).dt.tz_localize(None).dt.normalize().to_numpy()
+        brand = self.matcher.match(pa.array(observations["name"].astype(str).to_numpy(dtype=object), pa.string()))
+        brand = pc.fill_null(brand, "").to_numpy(zero_copy_only=False)
+
+        moments, bins = [], []
+        for metric in METRICS:
+            values = observations[metric].to_numpy(np.float64, na_value=np.nan)
+            keep = ~np.isnan(values) & (values > 0)
+            part = pd.DataFrame({"day": day[keep], "brand": brand[keep], "metric": metric, "value": values[keep],
+                                 "bucket": to_buckets(metric, values[keep])})
+            part["value_sq"] = part["value"] ** 2
+            grouped = part.groupby(_KEYS, sort=False)
+            moments.append(grouped.agg(n=("value", "size"), sum=("value", "sum"), sum_sq=("value_sq", "sum"),
+                                       min=("value", "min"), max=("value", "max")).reset_index())
+            bins.append(part.groupby(_KEYS + ["bucket"], sort=False).size().rename("count").reset_index())
+
+        days = np.unique(day)
+        self.moments = self._merge(self.moments, pd.concat(moments), _KEYS, days,
+                                   {"n": "sum", "sum": "sum", "sum_sq": "sum", "min": "min", "max": "max"})
+        self.bins = self._merge(self.bins, pd.concat(bins), _KEYS + ["bucket"], days, {"count": "sum"})
+        self._update_hll(day, brand, observations["product_id"].astype(str).to_numpy(dtype=object))
+
+        self.totals["rows"] += len(observations)
+        self.totals["updates"] += 1
+        self.totals["seconds"] += time.perf_counter() - started
+        return len(observations)
+
+    @staticmethod
+    def _merge(state, batch, keys, days, how):
+        # Only the days this batch touches are regrouped; the rest of the state is kept as it is
+        touched = state["day"].isin(days).to_numpy()
+        merged = pd.concat([state[touched], batch]).groupby(keys, sort=False).agg(how).reset_index()
+        return pd.concat([state[~touched], merged], ignore_index=True)
+
+    def _update_hll(self, day, brand, ids):
+        batch = pd.DataFrame({"day": day, "brand": brand})
+        key = batch.groupby(["day", "brand"], sort=False).ngroup().to_numpy()
+        keys = batch.drop_duplicates(ignore_index=True)
+        registers = np.zeros((len(keys), HLL_REGISTERS), np.uint8)
+        register, rank = hll_ranks(ids)
+        np.maximum.at(registers, (key, register), rank)
+
+        positions = pd.MultiIndex.from_frame(self.hll_keys).get_indexer(pd.MultiIndex.from_frame(keys))
+        known = positions >= 0
+        self.hll[positions[known]] = np.maximum(self.hll[positions[known]], registers[known])
+        self.hll_keys = pd.concat([self.hll_keys, keys[~known]], ignore_index=True)
+        self.hll = np.concatenate([self.hll, registers[~known]])
+
+    # ==================== QUERIES ====================
+
+    def _selected(self, frame, start, end, brands):
+        mask = np.ones(len(frame), bool)
+        if start is not None:
+            mask &= (frame["day"] >= pd.Timestamp(start).normalize()).to_numpy()
+        if end is not None:
+            mask &= (frame["day"] <= pd.Timestamp(end).normalize()).to_numpy()
+        if brands is not None:
+            mask &= frame["brand"].isin([brands] if isinstance(brands, str) else list(brands)).to_numpy()
+        return mask
+
+    def days(self):
+        return self.hll_keys["day"].min(), self.hll_keys["day"].max()
+
+    def brands(self):
+        return sorted(self.hll_keys["brand"].unique())
+
+    def summary(self, metric, start=None, end=None, brands=None, quantiles=QUANTILES, bins=15):
+        # describe()-style statistics of one metric over the selected days (inclusive) and brands.
+        # count/mean/std/min/max are exact; quantiles and the histogram carry error_bound(metric)
+        moments = self.moments[(self.moments["metric"] == metric).to_numpy()
+                               & self._selected(self.moments, start, end, brands)]
+        n = int(moments["n"].sum())
+        bound, kind = error_bound(metric)
+        result = {"count": n, "error": bound, "error_kind": kind, "distinct_products": self.distinct(start, end, brands),
+                  "distinct_error": 1.04 / np.sqrt(HLL_REGISTERS)}
+        if not n:
+            return {**result, "mean": np.nan, "std": np.nan, "min": np.nan, "max": np.nan,
+                    "quantiles": {q: np.nan for q in quantiles}, "histogram": (np.zeros(bins), np.zeros(bins + 1))}
+
+        total, total_sq = moments["sum"].sum(), moments["sum_sq"].sum()
+        mean = total / n
+        low, high = float(moments["min"].min()), float(moments["max"].max())
+        result.update(mean=mean, std=np.sqrt(max(total_sq - n * mean * mean, 0.0) / max(n - 1, 1)), min=low, max=high)
+
+        selected = self.bins[(self.bins["metric"] == metric).to_numpy() & self._selected(self.bins, start, end, brands)]
+        merged = selected.groupby("bucket")["count"].sum().sort_index()
+        values = np.clip(bucket_values(metric, merged.index.to_numpy()), low, high)
+        cumulative = np.cumsum(merged.to_numpy())
+        result["quantiles"] = dict(zip(quantiles, _interpolated(values, cumulative, np.asarray(quantiles), n)))
+        result["histogram"] = np.histogram(values, bins=bins, range=(low, high), weights=merged.to_numpy())
+        return result
+
+    def distinct(self, start=None, end=None, brands=None):
+        # Distinct products seen over the selection (HyperLogLog estimate)
+        mask = self._selected(self.hll_keys, start, end, brands)
+        if not mask.any():
+            return 0
+        return float(hll_estimate(self.hll[mask].max(axis=0)))
+
+    # ==================== STORAGE ====================
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        tables = {
+            "moments": pa.Table.from_pandas(self.moments, preserve_index=False),
+            "bins": pa.Table.from_pandas(self.bins, preserve_index=False),
+            "hll": pa.table({"day": pa.array(self.hll_keys["day"]), "brand": pa.array(self.hll_keys["brand"], pa.string()),
+                             "registers": pa.FixedSizeListArray.from_arrays(pa.array(self.hll.ravel()),
+                                                                            HLL_REGISTERS)}),
+        }
+        # hll.parquet is written last; its mtime is the state version
+        for name, table in tables.items():
+            tmp_path = os.path.join(self.path, f".{name}.parquet")
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, os.path.join(self.path, f"{name}.parquet"))
+
+    def _read(self, path):
+        self.moments = pq.read_table(os.path.join(path, "moments.parquet")).to_pandas()
+        self.bins = pq.read_table(os.path.join(path, "bins.parquet")).to_pandas()
+        table = pq.read_table(os.path.join(path, "hll.parquet"))
+        self.hll_keys = table.select(["day", "brand"]).to_pandas()
+        self.hll = pc.list_flatten(table.column("registers")).to_numpy().astype(np.uint8).reshape(-1, HLL_REGISTERS)
+
+
+def _interpolated(values, cumulative, quantiles, n):
+    # Linear interpolation between the neighbouring order statistics, as pandas and np.quantile do.
+    # Both neighbours are within the error bound of their exact values, so the result is too
+    position = quantiles * (n - 1)
+    lower = np.floor(position)
+    below = values[np.searchsorted(cumulative, lower, side="right")]
+    above = values[np.searchsorted(cumulative, np.minimum(lower + 1, n - 1), side="right")]
+    return below + (position - lower) * (above - below)
+
+
+def state_version(path=state_path(HISTORY_DIR, SKETCH_DIR)):
+    # Changes whenever the sketches are saved; None before the first save
+    path = os.path.join(path, "hll.parquet")
+    if not os.path.exists(path):
+        return None
+    st = os.stat(path)
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def rebuild(store, sketches):
+    # Fold the whole history in one day at a time; only needed once for an existing price_history/
+    for day in store.partitions():
+        start = pd.Timestamp(day, tz="UTC")
+        sketches.update(store.query(start=start, end=start + pd.Timedelta(days=1),
+                                    columns=("product_id", "ts", "price", "rating", "name")))
+    return sketches
+
+
+def format_value(metric, value):
+    return f"₹{value:,.0f}" if metric == "price" else f"{value:.1f}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Approximate price/rating statistics over the price history "
+                                                 "from per-day, per-brand sketches")
+    parser.add_argument("--root", default=HISTORY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="build the sketches from the whole history")
+    query = commands.add_parser("summary", help="merged statistics over a date range")
+    query.add_argument("--metric", choices=METRICS, default="price")
+    query.add_argument("--start", default=None)
+    query.add_argument("--end", default=None)
+    query.add_argument("--brand", nargs="+", default=None)
+    args = parser.parse_args()
+
+    path = state_path(args.root, SKETCH_DIR)
+    if args.command == "rebuild":
+        started = time.perf_counter()
+        sketches = rebuild(HistoryStore(args.root), SketchStore(path=None))
+        sketches.path = path
+        sketches.save()
+        print(f"✅ Sketched {sketches.totals['rows']:,} history rows into {len(sketches):,} day/brand cells "
+              f"in {time.perf_counter() - started:.1f}s")
+    else:
+        sketches = SketchStore(path)
+        started = time.perf_counter()
+        stats = sketches.summary(args.metric, args.start, args.end, args.brand)
+        elapsed = time.perf_counter() - started
+        error = f"±{stats['error']:.0%}" if stats["error_kind"] == "relative" else f"±{stats['error']:g}"
+        print(f"count     {stats['count']:,}")
+        print(f"products  ~{stats['distinct_products']:,.0f} (±{stats['distinct_error']:.1%})")
+        for name in ("mean", "std", "min", "max"):
+            print(f"{name:<9} {format_value(args.metric, stats[name])}")
+        for q, value in stats["quantiles"].items():
+            print(f"{f'p{q * 100:g}':<9} {format_value(args.metric, value)} {error}")
+        print(f"✅ Merged in {elapsed * 1000:.1f}ms")
@@ -1,37 +1,25 @@
 import requests
-from bs4 import BeautifulSoup
 
-url = "https://www.flipkart.com/search?q=wireless+earbuds"
+import instrument
+from scraper import HEADERS, SEARCH_URL, parse_products
 
-# STRONG HEADERS to bypass basic blocking
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Accept-Encoding": "gzip, deflate, br",
-    "Connection": "keep-alive"
-}
-
-response = requests.get(url, headers=headers)
+with instrument.timer("scraper.fetch"):
+    response = requests.get(SEARCH_URL, headers=HEADERS)
 
 print("Response status code:", response.status_code)
 print("Length of page content:", len(response.text))
 
-soup = BeautifulSoup(response.text, "html.parser")
-
-# FIND ELEMENTS
-names = soup.find_all("a", class_="IxWX8O")
-prices = soup.find_all("div", class_="hZ3P6w")
-ratings = soup.find_all("div", class_="MKiFS6")
+with instrument.timer("scraper.parse"):
+    products = parse_products(response.content)
 
-print("Products found:", len(names))
+print("Products found:", len(products))
+summary = instrument.REGISTRY.summary()
+print(f"Fetch: {summary['scraper.fetch']['total_s'] * 1000:.0f} ms, "
+      f"parse: {summary['scraper.parse']['total_s'] * 1000:.1f} ms")
 print("\nSample Output:\n")
 
-for i in range(min(5, len(names))):
-    name = names[i].text.strip()
-    price = prices[i].text.strip() if i < len(prices) else "N/A"
-    rating = ratings[i].text.strip() if i < len(ratings) else "N/A"
-
-    print(f"Product: {name}")
-    print(f"Price: {price}")
-    print(f"Rating: {rating}")
+for product in products[:5]:
+    print(f"Product: {product['Product Name']}")
+    print(f"Price: {product['Price']}")
+    print(f"Rating: {product['Rating']}")
     print("-" * 40)
\ No newline at end of file
@@ -1,33 +1,16 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import csv
 
-url = "https://www.flipkart.com/search?q=wireless+earbuds"
-
-options = Options()
-options.add_argument("--start-maximized")
-
-driver = webdriver.Chrome(options=options)
-driver.get(url)
+from browser_pool import BrowserPool
+from dom_extract import extract_cards
 
-wait = WebDriverWait(driver, 15)
-
-# Close login popup
-try:
-    close_btn = wait.until(
-        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'✕')]"))
-    )
-    close_btn.click()
-except:
-    pass
+url = "https://www.flipkart.com/search?q=wireless+earbuds"
 
-# Wait for product cards
-wait.until(EC.presence_of_all_elements_located((By.XPATH, "//div[@data-id]")))
+# "script" pulls every card in one execute_script call; "source" parses page_source with lxml;
+# "elements" is the old per-card find_element loop
+EXTRACT_MODE = "script"
 
-products = driver.find_elements(By.XPATH, "//div[@data-id]")
+with BrowserPool(size=1) as pool:
+    products = pool.fetch(url, lambda driver: extract_cards(driver, EXTRACT_MODE))
 
 print("Products scraped:", len(products))
 
@@ -37,26 +20,43 @@ with open("ecommerce_data.csv", "w", newline="", encoding="utf-8") as file:
     writer.writerow(["Product Name", "Price", "Rating"])
 
     for product in products:
-        # Product Name
-        try:
-            name = product.find_element(By.XPATH, ".//a[@title]").get_attribute("title")
-        except:
-            name = "N/A"
-
-        # Price
-        try:
-            price = product.find_element(By.XPATH, ".//div[contains(text(),'₹')]").text
-        except:
-            price = "N/A"
-
-        # Rating
-        try:
-            rating_div = product.find_element(By.XPATH, ".//div[contains(@class,'MKiFS6')]")
-            rating = rating_div.text.strip()  # e.g., "4" or "3.9"
-        except:
-            rating = "N/A"
-
-        writer.writerow([name, price, rating])
+        writer.writerow([product["Product Name"], product["Price"], product["Rating"]])
 
 print("✅ Data saved to ecommerce_data.csv")
-driver.quit()
\ No newline at end of file
+
+# The history side (and pandas/pyarrow behind it) is only imported once the scrape is done, so the
+# browser starts without waiting for it. A scrape with no cards (blocked page, changed layout) has
+# nothing to ingest, so the history steps are skipped
+if products:
+    from change_detect import ChangeDetector
+    from history_store import HistoryStore, to_observations
+    from sketches import SketchStore
+    from trends import TrendEngine
+    from alerts import AlertEvaluator, JsonlSink, load_rules
+
+    # Keep the price history, storing only products that are new or whose price/rating changed
+    detector = ChangeDetector()
+    emitted, _ = detector.ingest(HistoryStore(), to_observations(products))
+    report = detector.report()
+    print(f"✅ {report['stored']} of {report['observed']} observations stored in the price history "
+          f"({report['changed']} changed, {report['new']} new)")
+
+    # Fold the stored rows into the per-product price trends (rolling stats, drops, all-time lows)
+    trends = TrendEngine()
+    trends.update(emitted)
+    trends.save()
+
+    # And into the per-day, per-brand sketches behind the approximate history statistics
+    sketches = SketchStore()
+    sketches.update(emitted)
+    sketches.save()
+
+    # Check the new and changed products against the registered watch rules (alert_rules.json)
+    rules = load_rules()
+    if rules:
+        evaluator = AlertEvaluator(rules, [JsonlSink()])
+        alerts = evaluator.evaluate(emitted)
+        evaluator.save()
+        print(f"🔔 {len(alerts)} alerts from {len(rules)} watch rules written to alerts.jsonl")
+else:
+    print("⚠️ No products scraped; the price history was left unchanged")
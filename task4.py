@@ -1,35 +1,24 @@
 import pandas as pd
 
-# Load CSV
-df = pd.read_csv("ecommerce_data.csv")
-print("Original data shape:", df.shape)
+import cleaned_data
+import instrument
+from cleaning import clean_csv
 
-# Clean Price: remove ₹ and commas, convert to numeric
-df["Price"] = df["Price"].astype(str).str.replace("₹", "", regex=True).str.replace(",", "", regex=True)
-df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
-
-# Convert Rating to numeric and fill missing ratings with mean
-df["Rating"] = pd.to_numeric(df["Rating"], errors="coerce")
-mean_rating = df["Rating"].mean()
-df["Rating"] = df["Rating"].fillna(mean_rating)  # avoids FutureWarning
-
-# Remove duplicate products
-df.drop_duplicates(subset=["Product Name"], inplace=True)
-
-# Drop rows with missing Price
-df.dropna(subset=["Price"], inplace=True)
-
-# Reset index
-df.reset_index(drop=True, inplace=True)
-
-# Sort by Rating descending
-df.sort_values(by="Rating", ascending=False, inplace=True)
-
-# Save cleaned data
-df.to_csv("ecommerce_data_cleaned.csv", index=False)
+# Clean in bounded-memory chunks: parse ₹ prices, fill missing ratings with the mean,
+# remove duplicate products, drop rows without a price and sort by rating (descending)
+stats = clean_csv("ecommerce_data.csv", "ecommerce_data_cleaned.csv")
+print("Original data shape:", (stats["rows_in"], 3))
 
 # Display info & top 5 products
 print("\n✅ Cleaned data saved to ecommerce_data_cleaned.csv")
-print("Cleaned data shape:", df.shape)
+print("Cleaned data shape:", (stats["rows_out"], 3))
+print(f"Processed {stats['rows_in']:,} rows in {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/s)")
+
+# Binary copy with Brand and other derived columns for the dashboard to memory-map
+with instrument.timer("publish.artifact"):
+    cleaned_data.write_artifact("ecommerce_data_cleaned.csv", cleaned_data.ARTIFACT)
+print(f"✅ Dashboard artifact saved to {cleaned_data.ARTIFACT}")
+print("\nTime per stage:\n")
+print(instrument.format_table(instrument.percentiles(instrument.REGISTRY.samples)))
 print("\nTop 5 products by Rating:\n")
-print(df.head())
\ No newline at end of file
+print(pd.read_csv("ecommerce_data_cleaned.csv", nrows=5))
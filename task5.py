@@ -58,7 +58,14 @@ print(best_budget[['Product Name', 'Price', 'Rating']])
 # Average rating and Average price
 #  Extract Brand Name
 
-df['Brand'] = df['Product Name'].str.split().str[0]
+# Canonical brand from the entity index, so realme/Realme or GOBOULT/Boult count as one brand
+
+import entity_resolution
+
+index = entity_resolution.EntityIndex()
+brand, product_id = index.lookup(df['Product Name'])
+index.save()
+df['Brand'] = brand.to_pandas()
 
 print(df[['Product Name', 'Brand']].head())
 
@@ -0,0 +1,55 @@
+import argparse
+import os
+import runpy
+import sys
+
+# Command -> (module run as if it were the script itself, help). Nothing else is imported before a
+# command is picked, so `python tracker.py --help` starts instantly and each command pays only for
+# the imports of its own module
+COMMANDS = {
+    "scrape": ("scraper", "crawl search pages for one or more queries"),
+    "clean": ("cleaning", "clean a scraped CSV in bounded-memory chunks"),
+    "batch-clean": ("batch_clean", "clean many scraped CSVs in parallel into one dataset"),
+    "publish": ("cleaned_data", "build the dashboard's Arrow artifact from the cleaned CSV"),
+    "analyse": ("aggregates", "precompute the dashboard's per-page summaries"),
+    "score": ("value_score", "value-for-money scores, best first"),
+    "catalogue": ("catalogue", "publish, list and query category shards"),
+    "entities": ("entity_resolution", "resolve brands and product IDs for scraped titles"),
+    "history": ("history_store", "append scrapes to the price history and maintain it"),
+    "detect": ("change_detect", "append only changed products to the price history"),
+    "trends": ("trends", "per-product price trends over the history"),
+    "sketches": ("sketches", "approximate statistics over the whole price history"),
+    "alerts": ("alerts", "price-drop watch rules and alerts"),
+    "schedule": ("scheduler", "scrape -> clean -> publish on a schedule"),
+    "api": ("api", "read-only JSON API over the cleaned data"),
+    "metrics": ("instrument", "per-stage latency percentiles from a metrics file"),
+    "dashboard": (None, "open the Streamlit dashboard (streamlit run app.py)"),
+}
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def run(command, argv):
+    # Hand the remaining arguments to the command's own argparse CLI, exactly as `python <module>.py`
+    module, _ = COMMANDS[command]
+    if module is None:
+        import subprocess
+        return subprocess.call([sys.executable, "-m", "streamlit", "run", APP, *argv])
+    sys.argv = [f"{module}.py", *argv]
+    # alter_sys makes the module __main__ for the run, so worker processes can re-import it
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    width = max(map(len, COMMANDS))
+    parser = argparse.ArgumentParser(
+        description="Price tracker: scrape, clean, analyse and serve from one entry point. "
+                    "`python tracker.py <command> --help` shows a command's own options",
+        epilog="commands:\n" + "\n".join(f"  {name:<{width}}  {help}" for name, (_, help) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments for the command")
+    args = parser.parse_args()
+
+    sys.exit(run(args.command, args.args))
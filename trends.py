@@ -0,0 +1,314 @@
+import argparse
+import os
+import time
+
+from history_store import HISTORY_DIR, HistoryStore, state_path
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+pq = lazy_import("pyarrow.parquet")
+
+TRENDS_FILE = "trends.parquet"
+
+# Rolling statistics cover this many calendar days, ending on the latest scrape day
+WINDOW_DAYS = 30
+
+# A price within this fraction of the all-time minimum counts as "at the all-time low"
+LOW_TOLERANCE = 1e-6
+
+_DAY_US = 86_400 * 1_000_000
+_NO_DAY = -2 ** 31  # int32 minimum
+
+# Per-product all-time state (scalars) and the per-day ring buffer behind the rolling window
+# (dtype names rather than np types, so importing the module does not import numpy)
+_SCALARS = {
+    "count": "int64", "total": "float64", "low": "float32", "low_ts": "int64", "high": "float32",
+    "first_price": "float32", "first_ts": "int64", "last_price": "float32", "last_ts": "int64",
+    "prev_price": "float32", "dropped_to_low_ts": "int64",
+}
+_RING = {"day": "int32", "min": "float32", "max": "float32", "sum": "float64", "n": "int32"}
+
+
+def _empty(dtype, shape):
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.floating):
+        return np.full(shape, np.nan, dtype=dtype)
+    if dtype == np.int32:
+        return np.full(shape, _NO_DAY, dtype=dtype)
+    return np.zeros(shape, dtype=dtype)
+
+
+def _batch(observations):
+    # History rows (pandas or Arrow, history_store.history_schema() columns) -> id, ts (us), price arrays with a price
+    if not isinstance(observations, pa.Table):
+        observations = pa.Table.from_pandas(observations, preserve_index=False)
+    observations = observations.filter(pc.is_valid(observations.column("price")))
+    ids = pc.cast(observations.column("product_id"), pa.string()).combine_chunks()
+    ts = pc.cast(observations.column("ts"), pa.timestamp("us", tz="UTC")).cast(pa.int64()).to_numpy()
+    price = pc.cast(observations.column("price"), pa.float32()).to_numpy(zero_copy_only=False)
+    names = observations.column("name").to_numpy(zero_copy_only=False) if "name" in observations.column_names else None
+    return ids, ts, price, names
+
+
+class TrendEngine:
+    # Per-product price trends kept up to date from new observations only: each update costs
+    # O(new rows), never a rescan of the history
+
+    def __init__(self, path=state_path(HISTORY_DIR, TRENDS_FILE), window=WINDOW_DAYS):
+        self.path = path
+        self.window = window
+        self.ids = pa.array([], pa.string())
+        self.names = np.array([], dtype=object)
+        self.state = {name: _empty(dtype, 0) for name, dtype in _SCALARS.items()}
+        self.ring = {name: _empty(dtype, (0, window)) for name, dtype in _RING.items()}
+        self.latest_day = _NO_DAY
+        self._summary = None
+        self.totals = {"rows": 0, "updates": 0, "seconds": 0.0}
+        if path and os.path.exists(path):
+            self._read(path)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _positions(self, ids):
+        # Row of each product in the state arrays, adding rows for products seen for the first time
+        positions = pc.index_in(ids, value_set=self.ids)
+        new = pc.is_null(positions)
+        if pc.any(new).as_py():
+            added = pc.unique(ids.filter(new))
+            self.ids = pa.concat_arrays([self.ids, added])
+            self.names = np.concatenate([self.names, np.full(len(added), None, dtype=object)])
+            for name, dtype in _SCALARS.items():
+                self.state[name] = np.concatenate([self.state[name], _empty(dtype, len(added))])
+            for name, dtype in _RING.items():
+                self.ring[name] = np.concatenate([self.ring[name], _empty(dtype, (len(added), self.window))])
+            positions = pc.index_in(ids, value_set=self.ids)
+        return positions.to_numpy()
+
+    def update(self, observations):
+        started = time.perf_counter()
+        ids, ts, price, names = _batch(observations)
+        if len(ids) == 0:
+            return 0
+        pos = self._positions(ids)
+
+        # Group the batch by product, in time order within each product
+        order = np.lexsort((ts, pos))
+        pos, ts, price = pos[order], ts[order], price[order]
+        starts = np.flatnonzero(np.r_[True, pos[1:] != pos[:-1]])
+        ends = np.r_[starts[1:], len(pos)] - 1
+        rows = pos[starts]
+        if names is not None:
+            self.names[rows] = names[order][ends]
+
+        s = self.state
+        seen = s["count"][rows] > 0
+        s["count"][rows] += np.diff(np.r_[starts, len(pos)])
+        s["total"][rows] = np.where(seen, s["total"][rows], 0) + np.add.reduceat(price.astype(np.float64), starts)
+
+        # All-time low/high, and when the low was set; a new low below an existing one is a drop to a low
+        lowest = np.minimum.reduceat(price, starts)
+        lowest_at = ts[_first_where(price == np.repeat(lowest, np.diff(np.r_[starts, len(price)])), starts)]
+        new_low = ~(lowest >= s["low"][rows])
+        s["dropped_to_low_ts"][rows] = np.where(new_low & seen, lowest_at, s["dropped_to_low_ts"][rows])
+        s["low_ts"][rows] = np.where(new_low, lowest_at, s["low_ts"][rows])
+        s["low"][rows] = np.where(new_low, lowest, s["low"][rows])
+        s["high"][rows] = np.fmax(s["high"][rows], np.maximum.reduceat(price, starts))
+
+        earlier = ~seen | (ts[starts] < s["first_ts"][rows])
+        s["first_ts"][rows] = np.where(earlier, ts[starts], s["first_ts"][rows])
+        s["first_price"][rows] = np.where(earlier, price[starts], s["first_price"][rows])
+
+        # Latest and previous price; a late batch older than what is stored leaves both alone
+        later = ~seen | (ts[ends] >= s["last_ts"][rows])
+        several = ends > starts
+        previous = np.where(several, price[np.maximum(ends - 1, starts)], s["last_price"][rows])
+        s["prev_price"][rows] = np.where(later, previous, s["prev_price"][rows])
+        s["last_price"][rows] = np.where(later, price[ends], s["last_price"][rows])
+        s["last_ts"][rows] = np.where(later, ts[ends], s["last_ts"][rows])
+
+        self._update_ring(pos, ts // _DAY_US, price)
+        self._summary = None
+        self.totals["rows"] += len(ids)
+        self.totals["updates"] += 1
+        self.totals["seconds"] += time.perf_counter() - started
+        return len(ids)
+
+    def _update_ring(self, pos, day, price):
+        # One slot per calendar day (day % window); a slot holding an older day is recycled
+        day = day.astype(np.int32)
+        key = pos.astype(np.int64) * (1 << 32) + (day.astype(np.int64) - _NO_DAY)
+        order = np.argsort(key, kind="stable")
+        key, pos, day, price = key[order], pos[order], day[order], price[order]
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        pos, day = pos[starts], day[starts]
+        slot = day % self.window
+
+        r = self.ring
+        current = r["day"][pos, slot]
+        same = current == day
+        newer = day > current
+        keep = same | newer
+        pos, day, slot, same = pos[keep], day[keep], slot[keep], same[keep]
+
+        lo = np.minimum.reduceat(price, starts)[keep]
+        hi = np.maximum.reduceat(price, starts)[keep]
+        total = np.add.reduceat(price.astype(np.float64), starts)[keep]
+        n = np.diff(np.r_[starts, len(price)])[keep]
+        r["min"][pos, slot] = np.where(same, np.fmin(r["min"][pos, slot], lo), lo)
+        r["max"][pos, slot] = np.where(same, np.fmax(r["max"][pos, slot], hi), hi)
+        r["sum"][pos, slot] = np.where(same, r["sum"][pos, slot], 0) + total
+        r["n"][pos, slot] = np.where(same, r["n"][pos, slot], 0) + n
+        r["day"][pos, slot] = day
+        if len(day):
+            self.latest_day = max(self.latest_day, int(day.max()))
+
+    def summary(self, as_of=None):
+        # One row per product: latest price, change, rolling window and all-time statistics, as of a
+        # date (or day number since the epoch). The latest one is kept until the next update, so
+        # repeated queries only filter it
+        if as_of is None:
+            if self._summary is None:
+                self._summary = self.summary(self.latest_day)
+            return self._summary
+        if not isinstance(as_of, (int, np.integer)):
+            as_of = int(pd.Timestamp(as_of).value // 1000 // _DAY_US)
+        r, s = self.ring, self.state
+        valid = (r["day"] > as_of - self.window) & (r["day"] <= as_of) & (r["n"] > 0)
+        n = np.where(valid, r["n"], 0).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rolling_min = np.where(valid, r["min"], np.inf).min(axis=1)
+            rolling_max = np.where(valid, r["max"], -np.inf).max(axis=1)
+            rolling_mean = np.where(valid, r["sum"], 0).sum(axis=1) / n
+            change = (s["last_price"] - s["prev_price"]) / s["prev_price"] * 100
+            from_mean = (s["last_price"] - rolling_mean) / rolling_mean * 100
+        empty = n == 0
+        return pd.DataFrame({
+            "product_id": self.ids.to_pandas(),
+            "name": self.names,
+            "price": s["last_price"],
+            "previous_price": s["prev_price"],
+            "change_pct": change.astype(np.float32),
+            f"min_{self.window}d": np.where(empty, np.nan, rolling_min).astype(np.float32),
+            f"max_{self.window}d": np.where(empty, np.nan, rolling_max).astype(np.float32),
+            f"mean_{self.window}d": rolling_mean.astype(np.float32),
+            "vs_mean_pct": from_mean.astype(np.float32),
+            "all_time_low": s["low"],
+            "all_time_high": s["high"],
+            "all_time_mean": (s["total"] / np.maximum(s["count"], 1)).astype(np.float32),
+            "at_all_time_low": s["last_price"] <= s["low"] * (1 + LOW_TOLERANCE),
+            "low_since": pd.to_datetime(s["low_ts"], unit="us", utc=True),
+            "observations": s["count"],
+            "last_seen": pd.to_datetime(s["last_ts"], unit="us", utc=True),
+        })
+
+    # ==================== QUERIES ====================
+
+    def product(self, product_id):
+        row = self.ids.index(product_id).as_py()
+        if row < 0:
+            raise KeyError(product_id)
+        return self.summary().iloc[row]
+
+    def drops(self, min_pct=0.0, limit=None):
+        # Products whose latest price is below the previous one, biggest drop first
+        summary = self.summary()
+        drops = summary[summary["change_pct"] <= -min_pct].sort_values("change_pct", kind="stable")
+        return drops if limit is None else drops.head(limit)
+
+    def all_time_lows(self, since=None, limit=None):
+        # Products currently at their all-time low after having been more expensive, most recent drop first
+        summary = self.summary().assign(
+            dropped_at=pd.to_datetime(self.state["dropped_to_low_ts"], unit="us", utc=True))
+        lows = summary[summary["at_all_time_low"] & (self.state["dropped_to_low_ts"] > 0)]
+        if since is not None:
+            since = pd.Timestamp(since)
+            lows = lows[lows["dropped_at"] >= (since.tz_localize("UTC") if since.tzinfo is None else since)]
+        lows = lows.sort_values("dropped_at", ascending=False, kind="stable")
+        return lows if limit is None else lows.head(limit)
+
+    # ==================== PERSISTENCE ====================
+
+    def save(self):
+        columns = {"product_id": self.ids, "name": pa.array(self.names, pa.string())}
+        columns.update({name: pa.array(values) for name, values in self.state.items()})
+        for name, values in self.ring.items():
+            columns[f"ring_{name}"] = pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), self.window)
+        table = pa.table(columns).replace_schema_metadata({
+            "window": str(self.window), "latest_day": str(self.latest_day)})
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def _read(self, path):
+        table = pq.read_table(path)
+        metadata = table.schema.metadata
+        self.window = int(metadata[b"window"])
+        self.latest_day = int(metadata[b"latest_day"])
+        self.ids = table.column("product_id").combine_chunks()
+        self.names = np.array(table.column("name").to_pylist(), dtype=object)
+        self.state = {name: table.column(name).to_numpy().astype(dtype) for name, dtype in _SCALARS.items()}
+        self.ring = {
+            name: pc.list_flatten(table.column(f"ring_{name}")).to_numpy().astype(dtype).reshape(-1, self.window)
+            for name, dtype in _RING.items()
+        }
+
+
+def state_version(path=state_path(HISTORY_DIR, TRENDS_FILE)):
+    # Changes whenever the trend state is saved; None before the first save
+    if not os.path.exists(path):
+        return None
+    st = os.stat(path)
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def _first_where(mask, starts):
+    # Position of the first True in each contiguous group (every group has one)
+    hits = np.flatnonzero(mask)
+    return hits[np.searchsorted(hits, starts)]
+
+
+def rebuild(store, engine):
+    # Replay the whole history one day at a time; only needed once, or after changing the window
+    for day in store.partitions():
+        start = pd.Timestamp(day, tz="UTC")
+        engine.update(store.query(start=start, end=start + pd.Timedelta(days=1),
+                                  columns=("product_id", "ts", "price", "name")))
+    return engine
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-product price trends over the scrape history")
+    parser.add_argument("--root", default=HISTORY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="recompute the trend state from the full history")
+    drops = commands.add_parser("drops", help="biggest drops since the previous observation")
+    drops.add_argument("--min-pct", type=float, default=5.0)
+    drops.add_argument("--limit", type=int, default=20)
+    lows = commands.add_parser("lows", help="products that just dropped to an all-time low")
+    lows.add_argument("--limit", type=int, default=20)
+    show = commands.add_parser("show", help="print one product's trend")
+    show.add_argument("product_id")
+    args = parser.parse_args()
+
+    path = state_path(args.root, TRENDS_FILE)
+    if args.command == "rebuild":
+        if os.path.exists(path):
+            os.remove(path)
+        engine = rebuild(HistoryStore(args.root), TrendEngine(path))
+        engine.save()
+        print(f"✅ Trends for {len(engine):,} products from {engine.totals['rows']:,} observations "
+              f"in {engine.totals['seconds']:.2f}s, saved to {path}")
+    else:
+        engine = TrendEngine(path)
+        with pd.option_context("display.width", 200, "display.max_columns", 20):
+            if args.command == "drops":
+                print(engine.drops(args.min_pct, args.limit))
+            elif args.command == "lows":
+                print(engine.all_time_lows(limit=args.limit))
+            elif args.command == "show":
+                print(engine.product(args.product_id))
@@ -0,0 +1,202 @@
+import argparse
+import os
+import time
+
+import cleaned_data
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+pq = lazy_import("pyarrow.parquet")
+
+# State kept next to the artifact, like its page summaries (ecommerce_data_cleaned.scores.parquet)
+SCORES_SUFFIX = ".scores.parquet"
+
+# Brands with fewer listings than this have no meaningful price percentile; they are ranked together
+MIN_GROUP = 20
+POOLED = -1
+
+# Share of the score that comes from the rating percentile; the rest comes from being cheap
+RATING_WEIGHT = 0.5
+
+COLUMN = "Value Score"
+
+
+def state_path(artifact=cleaned_data.ARTIFACT):
+    return os.path.splitext(artifact)[0] + SCORES_SUFFIX
+
+
+def row_keys(df):
+    # Product ID plus an occurrence number, so a product listed several times keeps one key per listing
+    ids = df["Product ID"].astype(str)
+    occurrence = ids.groupby(ids, sort=False).cumcount().to_numpy()
+    return pc.binary_join_element_wise(pa.array(ids.to_numpy(dtype=object), pa.string()),
+                                       pc.cast(pa.array(occurrence), pa.string()), "#")
+
+
+def group_percentiles(values, groups):
+    # Mid-rank percentile (0-1) of each value within its group, ties averaged; NaN stays NaN
+    grouped = pd.Series(values).groupby(groups, sort=False)
+    ranks = grouped.rank(method="average").to_numpy()
+    sizes = grouped.transform("count").to_numpy()
+    return ((ranks - 0.5) / sizes).astype(np.float32)
+
+
+def effective_groups(codes, brands):
+    # Brand code per listing, or POOLED for listings of small or unknown brands. The trailing zero
+    # makes sizes[-1] (no brand) fall below MIN_GROUP
+    sizes = np.bincount(codes[codes >= 0], minlength=brands + 1)
+    sizes[-1] = 0
+    return np.where(sizes[codes] >= MIN_GROUP, codes, POOLED).astype(np.int32)
+
+
+def combine(price_pct, rating_pct):
+    return (100 * (RATING_WEIGHT * rating_pct + (1 - RATING_WEIGHT) * (1 - price_pct))).astype(np.float32)
+
+
+def scores(df):
+    # 0-100 per listing: its rating and cheapness ranked against the rest of its brand, in one pass
+    # of group ranks over the whole frame
+    brand = df["Brand"].astype("category")
+    codes = brand.cat.codes.to_numpy(np.int32)
+    groups = effective_groups(codes, len(brand.cat.categories))
+    return combine(group_percentiles(df["Price"].to_numpy(np.float32, na_value=np.nan), groups),
+                   group_percentiles(df["Rating"].to_numpy(np.float32, na_value=np.nan), groups))
+
+
+def ranking(values):
+    # Rows with a score, best first
+    rows = np.flatnonzero(~np.isnan(values))
+    return rows[np.argsort(-values[rows], kind="stable")]
+
+
+class ValueScorer:
+    # Scores of the last synced frame, keyed per listing. A new cleaned frame is diffed against
+    # them and only the brands with a new, removed or changed listing are ranked again
+
+    def __init__(self, path=None):
+        self.path = path
+        self.keys = pa.array([], pa.string())
+        self.brands = pd.Index([], dtype=object)
+        self.codes = np.empty(0, np.int32)
+        self.price = np.empty(0, np.float32)
+        self.rating = np.empty(0, np.float32)
+        self.score = np.empty(0, np.float32)
+        self.version = None
+        self.totals = {"rows": 0, "rescored": 0, "syncs": 0, "seconds": 0.0}
+        if path and os.path.exists(path):
+            self._read(path)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _codes(self, brand):
+        # Brand labels -> codes into self.brands, which only ever grows so old codes stay valid
+        brand = brand.astype("category")
+        categories = brand.cat.categories
+        self.brands = self.brands.append(categories.difference(self.brands))
+        mapping = np.append(self.brands.get_indexer(categories), -1).astype(np.int32)
+        return mapping[brand.cat.codes.to_numpy()]
+
+    def sync(self, df, version=None):
+        # Scores for df in its row order; afterwards the state describes df
+        started = time.perf_counter()
+        keys = row_keys(df)
+        codes = self._codes(df["Brand"])
+        price = df["Price"].to_numpy(np.float32, na_value=np.nan)
+        rating = df["Rating"].to_numpy(np.float32, na_value=np.nan)
+        groups = effective_groups(codes, len(self.brands))
+
+        score = np.full(len(df), np.nan, np.float32)
+        positions = pc.index_in(keys, value_set=self.keys).fill_null(-1).to_numpy(zero_copy_only=False)
+        known = positions >= 0
+        old = positions[known]
+
+        # A listing needs a new score when it is new or changed, or when anything in its group changed
+        same = np.zeros(len(df), bool)
+        same[known] = ((codes[known] == self.codes[old]) & _equal(price[known], self.price[old])
+                       & _equal(rating[known], self.rating[old]))
+        old_groups = effective_groups(self.codes, len(self.brands))
+        moved = np.zeros(len(df), bool)
+        moved[known] = groups[known] != old_groups[old]
+        kept = np.zeros(len(self), bool)
+        kept[old] = same[known] & ~moved[known]
+        affected = np.unique(np.concatenate([groups[~same | moved], old_groups[~kept]]))
+
+        rescore = np.isin(groups, affected)
+        rows = np.flatnonzero(rescore)
+        reuse = np.flatnonzero(~rescore)
+        score[reuse] = self.score[positions[reuse]]
+        if len(rows):
+            score[rows] = combine(group_percentiles(price[rows], groups[rows]),
+                                  group_percentiles(rating[rows], groups[rows]))
+
+        self.keys, self.codes, self.price, self.rating, self.score = keys, codes, price, rating, score
+        self.version = version
+        self.totals["rows"] += len(df)
+        self.totals["rescored"] += len(rows)
+        self.totals["syncs"] += 1
+        self.totals["seconds"] += time.perf_counter() - started
+        return score
+
+    def save(self):
+        table = pa.table({
+            "key": self.keys,
+            "brand": pa.DictionaryArray.from_arrays(pa.array(self.codes, mask=self.codes < 0),
+                                                    pa.array(self.brands.to_numpy(dtype=object), pa.string())),
+            "price": self.price, "rating": self.rating, "score": self.score,
+        }).replace_schema_metadata({"version": self.version or ""})
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def _read(self, path):
+        table = pq.read_table(path)
+        self.version = table.schema.metadata.get(b"version", b"").decode() or None
+        self.keys = table.column("key").combine_chunks()
+        brand = table.column("brand").combine_chunks()
+        self.brands = pd.Index(brand.dictionary.to_pylist(), dtype=object)
+        self.codes = brand.indices.fill_null(-1).to_numpy(zero_copy_only=False).astype(np.int32)
+        self.price, self.rating, self.score = (table.column(name).to_numpy().astype(np.float32)
+                                               for name in ("price", "rating", "score"))
+
+
+def _equal(a, b):
+    return (a == b) | (np.isnan(a) & np.isnan(b))
+
+
+def load(df, version, path=None):
+    # Scores for this data version: from disk when already computed for it, otherwise by syncing
+    # the previous state, so a file where few listings changed only re-ranks their brands
+    path = path or state_path()
+    scorer = ValueScorer(path)
+    if scorer.version == version and len(scorer) == len(df):
+        return scorer.score
+    values = scorer.sync(df, version)
+    try:
+        scorer.save()
+    except OSError:
+        pass
+    return values
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Value-for-money scores for the cleaned data, best first")
+    parser.add_argument("--src", default=cleaned_data.CLEANED_CSV)
+    parser.add_argument("--artifact", default=cleaned_data.ARTIFACT)
+    parser.add_argument("--brand", default=None)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    df = cleaned_data.load(args.src, args.artifact)
+    started = time.perf_counter()
+    df[COLUMN] = load(df, cleaned_data.data_version(args.src, args.artifact), state_path(args.artifact))
+    elapsed = time.perf_counter() - started
+    if args.brand:
+        df = df[df["Brand"] == args.brand]
+    best = df.iloc[ranking(df[COLUMN].to_numpy())[:args.limit]]
+    print(best[["Product Name", "Brand", "Price", "Rating", COLUMN]].to_string(index=False))
+    print(f"✅ Scored {len(df):,} products in {elapsed:.2f}s")